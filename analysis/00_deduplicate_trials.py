@@ -0,0 +1,79 @@
+"""
+Deduplicate Trials Across Registries
+Creates registry_trial_index.csv (record -> canonical trial) and
+registry_trials_canonical.csv (one row per trial with every linked
+registry ID) from the exports in data/raw/ and the curated trial table
+
+Run from project root:
+python analysis/00_deduplicate_trials.py
+
+Run before trials_N11.csv is updated: a new registry record whose canonical
+trial is already in the table is another registration of a known trial, not
+a new trial. Curated trials that collapse into one are reported.
+"""
+
+import argparse
+from pathlib import Path
+
+from trial_dedup import deduplicate, load_registry_records
+
+parser = argparse.ArgumentParser(description="Cross-registry deduplication")
+parser.add_argument("--raw-dir", default="data/raw", help="raw registry exports")
+parser.add_argument(
+    "--trials",
+    default="data/processed/trials_N11.csv",
+    help="curated trial table checked against the raw records",
+)
+parser.add_argument(
+    "--output-dir", default="data/processed", help="where the CSVs are written"
+)
+args = parser.parse_args()
+
+print("=" * 70)
+print("DEDUPLICATING TRIALS ACROSS REGISTRIES")
+print("=" * 70)
+
+# Load records
+print("\n1. Loading registry records...")
+paths = sorted(Path(args.raw_dir).glob("*.csv"))
+if args.trials:
+    paths.append(Path(args.trials))
+records, skipped = load_registry_records(paths)
+print(f"   ✓ Loaded {len(records)} records from {len(paths) - len(skipped)} files")
+for name in skipped:
+    print(f"   ⚠ Skipped {name} (no trial identifier column)")
+
+# Link identifiers
+print("\n2. Linking registry identifiers...")
+index, trials = deduplicate(records)
+for registry, count in index["registry"].value_counts().sort_index().items():
+    print(f"   ✓ {registry}: {count} records")
+multi = trials[trials["registry_ids"].str.contains(";")]
+print(f"   ✓ {len(trials)} canonical trials ({len(multi)} with several registry IDs)")
+
+index_path = f"{args.output_dir}/registry_trial_index.csv"
+index.to_csv(index_path, index=False)
+print(f"   ✓ Saved to {index_path}")
+trials_path = f"{args.output_dir}/registry_trials_canonical.csv"
+trials.to_csv(trials_path, index=False)
+print(f"   ✓ Saved to {trials_path}")
+
+# Curated table check
+print("\n3. Checking curated trials...")
+curated = index[index["source"] == Path(args.trials).name] if args.trials else index[:0]
+duplicates = curated[curated.duplicated("canonical_id", keep=False)]
+for canonical_id, group in duplicates.groupby("canonical_id"):
+    print(f"   ⚠ {', '.join(group['record_id'])} are one trial ({canonical_id})")
+if len(curated) and duplicates.empty:
+    print(f"   ✓ {len(curated)} curated trials, no duplicates")
+
+# Summary
+print("\n4. SUMMARY:")
+print(f"   • Records: {len(index)}")
+print(f"   • Canonical trials: {len(trials)}")
+merged = (index["record_id"] != index["canonical_id"]).sum()
+print(f"   • Records merged into another registration: {merged}")
+
+print("\n" + "=" * 70)
+print("TRIAL DEDUPLICATION COMPLETE!")
+print("=" * 70)
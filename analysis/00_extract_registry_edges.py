@@ -0,0 +1,75 @@
+"""
+Extract Trial–Institution Edges from Raw Registry Records
+Creates registry_edges.csv (sponsor / collaboration / site edges) and
+registry_unresolved_names.csv from the exports in data/raw/
+
+Run from project root:
+python analysis/00_extract_registry_edges.py
+
+edges_N11.csv stays the curated edge list; this stage regenerates typed edges
+for any number of raw records so that the curated list can be checked and
+extended, and lists every name that did not match the institution table.
+"""
+
+import argparse
+
+import pandas as pd
+from registry_edges import extract_edges, load_raw_records
+
+parser = argparse.ArgumentParser(description="Registry edge extraction")
+parser.add_argument("--raw-dir", default="data/raw", help="raw registry exports")
+parser.add_argument(
+    "--institutions",
+    default="data/processed/institutions_N11.csv",
+    help="institution table used to resolve names",
+)
+parser.add_argument(
+    "--output-dir", default="data/processed", help="where the CSVs are written"
+)
+args = parser.parse_args()
+
+print("=" * 70)
+print("EXTRACTING REGISTRY EDGES FROM RAW RECORDS")
+print("=" * 70)
+
+# Load inputs
+print("\n1. Loading raw records and institutions...")
+records, skipped = load_raw_records(args.raw_dir)
+institutions = pd.read_csv(args.institutions)
+print(f"   ✓ Loaded {len(records)} raw records")
+for name in skipped:
+    print(f"   ⚠ Skipped {name} (no Sponsor/Collaborators/Locations columns)")
+print(f"   ✓ Loaded {len(institutions)} institutions")
+
+# Extract edges
+print("\n2. Resolving sponsors, collaborators and sites...")
+edges, unresolved = extract_edges(records, institutions)
+for role, count in edges["relationship_type"].value_counts().sort_index().items():
+    print(f"   ✓ {role}: {count} edges")
+
+edges_path = f"{args.output_dir}/registry_edges.csv"
+edges.to_csv(edges_path, index=False)
+print(f"   ✓ Saved to {edges_path}")
+
+# Unresolved names, reported together
+print("\n3. Unresolved names...")
+unresolved_path = f"{args.output_dir}/registry_unresolved_names.csv"
+unresolved.to_csv(unresolved_path, index=False)
+if len(unresolved):
+    print(f"   ⚠ {len(unresolved)} distinct names not in the institution table")
+    for role, count in (
+        unresolved["roles"].str.split(";").explode().value_counts().items()
+    ):
+        print(f"     - {role}: {count}")
+print(f"   ✓ Saved to {unresolved_path}")
+
+# Summary
+print("\n4. SUMMARY:")
+print(f"   • Trials with edges: {edges['trial_id'].nunique()}")
+print(f"   • Institutions linked: {edges['institution_id'].nunique()}")
+print(f"   • Edges: {len(edges)}")
+print(f"   • Unresolved names: {len(unresolved)}")
+
+print("\n" + "=" * 70)
+print("REGISTRY EDGE EXTRACTION COMPLETE!")
+print("=" * 70)
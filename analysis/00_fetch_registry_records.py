@@ -0,0 +1,163 @@
+"""
+Fetch Registry Records from ClinicalTrials.gov
+Runs the protocol search (one query per Sub-Saharan African country) through
+the concurrent API v2 client and writes each study to data/raw/registry/ in
+the ClinicalTrials.gov CSV export layout. The staging directory keeps fetched
+records apart from the curated exports in data/raw/; review them there, then
+pass it to the later stages or copy the records across:
+python analysis/00_screen_registry_records.py --raw-dir data/raw/registry
+
+Run from project root:
+python analysis/00_fetch_registry_records.py
+
+Incremental sync (only studies updated since the last complete sync; records
+whose content hash is unchanged are not rewritten):
+python analysis/00_fetch_registry_records.py --incremental
+
+Offline benchmark against the local stub server (writes to a temporary
+directory unless --output-dir is given):
+python analysis/00_fetch_registry_records.py --stub 5000 --rate-limit 60000
+
+rateLimit in web_interface/config/registry-config.json is read as requests
+per minute; --rate-limit overrides it.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from registry_client import (
+    DEFAULT_CONFIG,
+    SUB_SAHARAN_AFRICA,
+    fetch_to_raw,
+    load_registry_config,
+    protocol_queries,
+)
+from registry_sync import CURSOR_NAME, SyncCursor
+
+parser = argparse.ArgumentParser(description="ClinicalTrials.gov fetch")
+parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="registry config")
+parser.add_argument("--output-dir", default=None, help="default: data/raw/registry")
+parser.add_argument("--concurrency", type=int, default=8, help="open connections")
+parser.add_argument("--page-size", type=int, default=100, help="studies per page")
+parser.add_argument("--max-pages", type=int, default=None, help="pages per query")
+parser.add_argument(
+    "--rate-limit", type=float, default=None, help="requests per minute"
+)
+parser.add_argument(
+    "--countries", nargs="+", default=SUB_SAHARAN_AFRICA, help="query countries"
+)
+parser.add_argument(
+    "--incremental",
+    action="store_true",
+    help="fetch only the delta since the sync cursor in the output directory",
+)
+parser.add_argument(
+    "--stub",
+    type=int,
+    default=0,
+    metavar="N",
+    help="serve N synthetic studies locally and fetch from them",
+)
+parser.add_argument(
+    "--stub-revision",
+    type=int,
+    default=0,
+    metavar="R",
+    help="stub registry state R (each revision updates ~5%% of the studies)",
+)
+args = parser.parse_args()
+
+print("=" * 70)
+print("FETCHING REGISTRY RECORDS")
+print("=" * 70)
+
+print("\n1. Configuration...")
+config = load_registry_config(args.config)
+rate_limit = args.rate_limit or config.get("rateLimit")
+min_start = config.get("filters", {}).get("min_start_date")
+output_dir = args.output_dir or (
+    tempfile.mkdtemp(prefix="registry_stub_") if args.stub else "data/raw/registry"
+)
+cursor = None
+if args.incremental:
+    cursor_path = f"{output_dir}/{CURSOR_NAME}"
+    cursor = (
+        SyncCursor(cursor_path)
+        if os.path.exists(cursor_path)
+        else SyncCursor.from_raw_dir(output_dir)
+    )
+    print(
+        f"   ✓ Sync cursor: {len(cursor.studies)} studies, "
+        f"synced through {cursor.synced_through or 'never (full sync)'}"
+    )
+queries = protocol_queries(
+    args.countries,
+    min_start_date=min_start,
+    advanced=cursor.advanced_filter() if cursor else (),
+)
+print(f"   ✓ {len(queries)} queries, {args.concurrency} connections")
+print(
+    f"   ✓ Rate limit: {rate_limit:g} requests/min"
+    if rate_limit
+    else "   ✓ No rate limit"
+)
+
+
+async def run():
+    runner = None
+    base_url = config["baseUrl"]
+    if args.stub:
+        from registry_stub import create_app, start_stub
+
+        runner, base_url = await start_stub(
+            create_app(args.stub, revision=args.stub_revision)
+        )
+        print(f"   ✓ Stub server with {args.stub} studies at {base_url}")
+    try:
+        return await fetch_to_raw(
+            queries,
+            output_dir,
+            base_url,
+            rate_limit=rate_limit,
+            concurrency=args.concurrency,
+            page_size=args.page_size,
+            max_pages=args.max_pages,
+            cursor=cursor,
+        )
+    finally:
+        if runner:
+            await runner.cleanup()
+
+
+print("\n2. Fetching...")
+summary = asyncio.run(run())
+for params, error in summary["failed"]:
+    print(f"   ⚠ {params['query.loc']}: {error}")
+for params in summary["truncated"]:
+    print(f"   ⚠ {params['query.loc']}: stopped at --max-pages with pages left")
+print(f"   ✓ {summary['requests']} requests ({summary['retries']} retries)")
+print(f"   ✓ {summary['studies']} studies in {summary['pages']} pages")
+print(f"   ✓ {summary['distinct']} distinct studies")
+if cursor:
+    counts = cursor.counts
+    print(
+        f"   ✓ {counts['new']} new, {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged (skipped)"
+    )
+    # A partial sync keeps the old watermark so the next run re-asks for
+    # everything the failed or truncated queries missed
+    cursor.save(complete=not summary["failed"] and not summary["truncated"])
+    print(f"   ✓ Cursor saved (synced through {cursor.synced_through})")
+print(f"   ✓ Wrote {summary['written']} studies to {output_dir}")
+
+print("\n3. SUMMARY:")
+print(f"   • Elapsed: {summary['seconds']:.2f} s")
+print(f"   • Throughput: {summary['studies_per_second']:.0f} studies/s")
+print(f"   • Failed queries: {len(summary['failed'])}")
+print(f"   • Truncated queries: {len(summary['truncated'])}")
+
+print("\n" + "=" * 70)
+print("REGISTRY FETCH COMPLETE!")
+print("=" * 70)
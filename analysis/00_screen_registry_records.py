@@ -0,0 +1,69 @@
+"""
+Screen Raw Registry Records Against the Protocol Keywords
+Creates registry_screening.csv (one row per record: AI terms, diagnostic
+terms, African countries in Locations, eligible) and
+registry_screening_evidence.csv (every matched term per field with its hit
+count) from the exports in data/raw/
+
+Run from project root:
+python analysis/00_screen_registry_records.py
+
+Screening only shortlists records for the two-reviewer verification in
+docs/SUPPLEMENTARY_METHODS.md; it does not add trials to the dataset.
+"""
+
+import argparse
+import time
+
+from parallel import default_workers
+from registry_edges import load_raw_records
+from screening import screen_records
+
+parser = argparse.ArgumentParser(description="Registry keyword screening")
+parser.add_argument("--raw-dir", default="data/raw", help="raw registry exports")
+parser.add_argument(
+    "--output-dir", default="data/processed", help="where the CSVs are written"
+)
+parser.add_argument(
+    "--workers", type=int, default=None, help="worker processes (default: all CPUs)"
+)
+args = parser.parse_args()
+
+print("=" * 70)
+print("SCREENING REGISTRY RECORDS")
+print("=" * 70)
+
+# Load records
+print("\n1. Loading raw records...")
+records, skipped = load_raw_records(args.raw_dir)
+print(f"   ✓ Loaded {len(records)} raw records")
+for name in skipped:
+    print(f"   ⚠ Skipped {name} (not a ClinicalTrials.gov export)")
+
+# Screen
+print("\n2. Screening Brief Summary, Interventions, Conditions and Locations...")
+start = time.perf_counter()
+screened, evidence = screen_records(records, workers=args.workers)
+seconds = time.perf_counter() - start
+for column in ["ai_terms", "diagnostic_terms", "countries"]:
+    print(f"   ✓ {column}: {screened[column].notna().sum()} records")
+print(f"   ✓ {int(screened['eligible'].sum())} records meet all three criteria")
+
+screened_path = f"{args.output_dir}/registry_screening.csv"
+screened.to_csv(screened_path, index=False)
+print(f"   ✓ Saved to {screened_path}")
+evidence_path = f"{args.output_dir}/registry_screening_evidence.csv"
+evidence.to_csv(evidence_path, index=False)
+print(f"   ✓ Saved to {evidence_path}")
+
+# Summary
+print("\n3. SUMMARY:")
+print(f"   • Records screened: {len(screened)}")
+print(f"   • Eligible for verification: {int(screened['eligible'].sum())}")
+print(f"   • Evidence rows: {len(evidence)}")
+print(f"   • Workers: {args.workers or default_workers()}")
+print(f"   • Throughput: {len(screened) / max(seconds, 1e-9):.0f} records/s")
+
+print("\n" + "=" * 70)
+print("REGISTRY SCREENING COMPLETE!")
+print("=" * 70)
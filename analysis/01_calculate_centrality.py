@@ -4,8 +4,33 @@ Calculates centrality measures and generates outputs for manuscript
 
 Run from project root:
 python analysis/01_calculate_centrality.py
+
+Centrality modes:
+    --mode projection  (default) one-mode graph; each trial's institutions are
+                       linked as a clique of co-participation edges
+    --mode bipartite   two-mode trial-institution graph with Borgatti-Halgin
+                       normalized bipartite degree, closeness and betweenness;
+                       no projection, so edges grow linearly with site count
+    --mode weighted    projection whose co-participation edges carry a weight
+                       (--weighting count: shared trials; --weighting newman:
+                       sum of 1/(k-1) over shared trials with k institutions);
+                       adds weighted strength, closeness and betweenness
+
+Every mode also adds per-layer degree, betweenness and closeness for each
+relationship type (<measure>_<relationship_type>), overlapping degree and the
+multiplex participation coefficient.
+
+The network, its spring layout and all per-node results are also written as
+typed arrays to network<suffix>.bin (analysis/network_binary.py), which later
+scripts can map instead of rebuilding the graph from the CSVs.
+
+Rank stability:
+    --jackknife trial        leave each trial out in turn and report the range
+    --jackknife institution  of every institution's rank (repeatable); writes
+                             institutions_rank_stability_<unit>.csv
 """
 
+import argparse
 import os
 
 import matplotlib.pyplot as plt
@@ -13,7 +38,55 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 import seaborn as sns
-from scipy.stats import spearmanr
+from networkx.algorithms import bipartite
+from communities import detect_communities
+from jackknife import UNITS, jackknife_ranks
+from multiplex import Multiplex
+from network_binary import write_network
+from structural_metrics import adjacency, structural_metrics
+from resampling import correlation_tests, format_p
+from snapshots import input_fingerprint, write_snapshot
+from weighted_network import WEIGHTINGS, projection_weights, weighted_centrality
+
+parser = argparse.ArgumentParser(description="Network centrality analysis")
+parser.add_argument(
+    "--mode",
+    choices=["projection", "bipartite", "weighted"],
+    default="projection",
+    help="centrality on the co-participation projection or the two-mode graph",
+)
+parser.add_argument(
+    "--weighting",
+    choices=WEIGHTINGS,
+    default="count",
+    help="co-participation edge weight in weighted mode",
+)
+parser.add_argument(
+    "--permutations",
+    type=int,
+    default=9999,
+    help="permutation replicates per correlation test",
+)
+parser.add_argument(
+    "--bootstrap",
+    type=int,
+    default=9999,
+    help="bootstrap replicates per correlation confidence interval",
+)
+parser.add_argument(
+    "--jackknife",
+    choices=UNITS,
+    action="append",
+    default=[],
+    help="leave-one-out unit for rank stability intervals (repeatable)",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=None,
+    help="worker processes for the jackknife replicates (default: all cores)",
+)
+args = parser.parse_args()
 
 # Set paths
 DATA_DIR = "data/processed"
@@ -21,8 +94,16 @@ OUTPUT_DIR = "results"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(f"{OUTPUT_DIR}/figures/supplementary", exist_ok=True)
 
+# Projection mode keeps the manuscript file names; other modes are suffixed
+SUFFIX = "" if args.mode == "projection" else f"_{args.mode}"
+if args.mode == "weighted":
+    SUFFIX += f"_{args.weighting}"
+
 print("=" * 70)
 print("NETWORK ANALYSIS: N=11 VERIFIED DATASET")
+print(
+    f"Mode: {args.mode}" + (f" ({args.weighting})" if args.mode == "weighted" else "")
+)
 print("=" * 70)
 
 # Load data
@@ -66,34 +147,106 @@ for _, edge in edges.iterrows():
 
 print(f"   ✓ Network built: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
 
-# Add co-participation edges (transitive)
-print("\n3. ADDING CO-PARTICIPATION EDGES...")
-initial_edges = G.number_of_edges()
-
-# For each trial, connect all institutions participating in it
 trial_ids = [n for n, d in G.nodes(data=True) if d["node_type"] == "trial"]
-for trial in trial_ids:
-    inst_neighbors = [
-        n for n in G.neighbors(trial) if G.nodes[n]["node_type"] == "institution"
-    ]
-    # Connect all pairs of institutions
-    for i in range(len(inst_neighbors)):
-        for j in range(i + 1, len(inst_neighbors)):
-            if not G.has_edge(inst_neighbors[i], inst_neighbors[j]):
-                G.add_edge(
-                    inst_neighbors[i],
-                    inst_neighbors[j],
-                    relationship="co_participation",
-                )
-
-print(f"   ✓ Added {G.number_of_edges() - initial_edges} co-participation edges")
-print(f"   ✓ Total edges: {G.number_of_edges()}")
+
+if args.mode == "projection":
+    # Add co-participation edges (transitive)
+    print("\n3. ADDING CO-PARTICIPATION EDGES...")
+    initial_edges = G.number_of_edges()
+
+    # For each trial, connect all institutions participating in it
+    for trial in trial_ids:
+        inst_neighbors = [
+            n for n in G.neighbors(trial) if G.nodes[n]["node_type"] == "institution"
+        ]
+        # Connect all pairs of institutions
+        for i in range(len(inst_neighbors)):
+            for j in range(i + 1, len(inst_neighbors)):
+                if not G.has_edge(inst_neighbors[i], inst_neighbors[j]):
+                    G.add_edge(
+                        inst_neighbors[i],
+                        inst_neighbors[j],
+                        relationship="co_participation",
+                    )
+
+    print(f"   ✓ Added {G.number_of_edges() - initial_edges} co-participation edges")
+    print(f"   ✓ Total edges: {G.number_of_edges()}")
+elif args.mode == "weighted":
+    # Weighted co-participation edges: repeat collaborations accumulate weight
+    # instead of being dropped by the has_edge check
+    print(f"\n3. ADDING WEIGHTED CO-PARTICIPATION EDGES ({args.weighting})...")
+    initial_edges = G.number_of_edges()
+    nx.set_edge_attributes(G, 1.0, "weight")
+
+    trial_members = {
+        trial: [
+            n for n in G.neighbors(trial) if G.nodes[n]["node_type"] == "institution"
+        ]
+        for trial in trial_ids
+    }
+    pair_weights = projection_weights(trial_members, args.weighting)
+    for (u, v), w in pair_weights.items():
+        G.add_edge(u, v, relationship="co_participation", weight=w)
+
+    print(f"   ✓ Added {G.number_of_edges() - initial_edges} co-participation edges")
+    print(f"   ✓ Total edges: {G.number_of_edges()}")
+    print(f"   ✓ Total co-participation weight: {sum(pair_weights.values()):.2f}")
+else:
+    # Keep the two-mode graph: no clique projection, edges stay one per
+    # trial-institution link
+    print("\n3. KEEPING TWO-MODE GRAPH (no co-participation projection)...")
+    print(f"   ✓ Total edges: {G.number_of_edges()}")
 
 # Calculate centrality measures
 print("\n4. CALCULATING CENTRALITY MEASURES...")
-degree_cent = nx.degree_centrality(G)
-betweenness_cent = nx.betweenness_centrality(G)
-closeness_cent = nx.closeness_centrality(G)
+if args.mode == "projection":
+    degree_cent = nx.degree_centrality(G)
+    betweenness_cent = nx.betweenness_centrality(G)
+    closeness_cent = nx.closeness_centrality(G)
+elif args.mode == "weighted":
+    # Strength and weighted paths share one Dijkstra sweep over CSR arrays;
+    # degree centrality stays the unweighted share of possible ties
+    weighted = weighted_centrality(G)
+    degree_cent = nx.degree_centrality(G)
+    betweenness_cent = weighted["betweenness"]
+    closeness_cent = weighted["closeness"]
+else:
+    # Bipartite normalizations use the size of the opposite node set as the
+    # maximum possible degree (Borgatti & Halgin)
+    degree_cent = bipartite.degree_centrality(G, trial_ids)
+    betweenness_cent = bipartite.betweenness_centrality(G, trial_ids)
+    closeness_cent = bipartite.closeness_centrality(G, trial_ids)
+
+print("   ✓ Centrality measures calculated for all nodes")
+
+# The graph above merges all relationship types; the multiplex keeps one
+# layer per type over the same nodes
+multiplex = Multiplex.from_edges(G.nodes(), trial_ids, edges, args.mode, args.weighting)
+layer_results = multiplex.centralities(args.mode)
+print(
+    f"   ✓ Per-layer measures for {len(multiplex.layers)} relationship layers "
+    f"({', '.join(multiplex.layers)})"
+)
+
+# Community structure (Louvain, cached by graph fingerprint)
+partition, modularity, community_source = detect_communities(G)
+num_communities = len(set(partition.values()))
+print(
+    f"   ✓ {num_communities} communities, modularity {modularity:.3f} "
+    f"({community_source})"
+)
+
+# Triangles, clustering and k-cores on the sparse adjacency
+node_order = list(G.nodes())
+structure, network_structure = structural_metrics(adjacency(G, node_order))
+structure = {
+    metric: dict(zip(node_order, values.tolist()))
+    for metric, values in structure.items()
+}
+print(
+    f"   ✓ {network_structure['triangles']} triangles, "
+    f"degeneracy {network_structure['degeneracy']}"
+)
 
 # Create results dataframe
 results = []
@@ -110,28 +263,58 @@ for node in G.nodes():
             "degree_centrality": degree_cent[node],
             "betweenness_centrality": betweenness_cent[node],
             "closeness_centrality": closeness_cent[node],
+            "triangles": structure["triangles"][node],
+            "clustering": structure["clustering"][node],
+            "core_number": structure["core_number"][node],
+            "community_id": partition[str(node)],
         }
     )
 
 df_results = pd.DataFrame(results)
+if args.mode == "weighted":
+    df_results.insert(
+        df_results.columns.get_loc("degree_centrality") + 1,
+        "strength",
+        df_results["node_id"].map(weighted["strength"]),
+    )
+df_results = df_results.join(layer_results, on="node_id")
 df_results = df_results.sort_values("degree_centrality", ascending=False)
 
-print("   ✓ Centrality measures calculated for all nodes")
-
 # Calculate network-level descriptive statistics
 print("\n5. CALCULATING NETWORK-LEVEL STATISTICS...")
 
 # Basic network metrics
-density = nx.density(G)
+if args.mode == "projection":
+    density = nx.density(G)
+else:
+    density = bipartite.density(G, trial_ids)
 num_components = nx.number_connected_components(G)
 degrees = dict(G.degree())
 avg_degree = sum(degrees.values()) / G.number_of_nodes()
 
-# Degree centralization (Freeman's formula)
-max_degree_cent = max(degree_cent.values())
-sum_diff = sum(max_degree_cent - degree_cent[node] for node in G.nodes())
-max_possible_diff = (G.number_of_nodes() - 1) * (G.number_of_nodes() - 2)
-degree_centralization = sum_diff / max_possible_diff if max_possible_diff > 0 else 0
+
+# Degree centralization (Freeman's formula). Bipartite degree centrality is
+# normalized by the size of the other node set, so the one-mode star maximum
+# does not apply: each set is centralized on its own, against one node at 1
+# and the rest at 0, i.e. a maximum of |set| - 1 (Borgatti & Everett, 1997)
+if args.mode == "bipartite":
+    trial_set = set(trial_ids)
+    inst_ids = [n for n in G.nodes() if n not in trial_set]
+    centralization_sets = [
+        ("Degree centralization (trials)", trial_ids, len(trial_ids) - 1),
+        ("Degree centralization (institutions)", inst_ids, len(inst_ids) - 1),
+    ]
+else:
+    n = G.number_of_nodes()
+    centralization_sets = [("Degree centralization", G.nodes(), (n - 1) * (n - 2))]
+
+centralization_rows = []
+for label, nodes, max_possible_diff in centralization_sets:
+    values = [degree_cent[node] for node in nodes]
+    sum_diff = sum(max(values, default=0) - value for value in values)
+    centralization_rows.append(
+        (label, sum_diff / max_possible_diff if max_possible_diff > 0 else 0)
+    )
 
 # Centrality descriptive statistics
 degree_cent_values = list(degree_cent.values())
@@ -159,7 +342,8 @@ max_closeness = np.max(closeness_values)
 print(f"   Network density: {density:.3f}")
 print(f"   Number of components: {num_components}")
 print(f"   Average degree: {avg_degree:.2f}")
-print(f"   Degree centralization: {degree_centralization:.3f}")
+for label, value in centralization_rows:
+    print(f"   {label}: {value:.3f}")
 
 # Export network statistics
 network_stats = pd.DataFrame(
@@ -172,7 +356,13 @@ network_stats = pd.DataFrame(
             "Network density",
             "Number of components",
             "Average degree",
-            "Degree centralization",
+            *(label for label, _ in centralization_rows),
+            "Communities (Louvain)",
+            "Modularity",
+            "Triangles",
+            "Average clustering",
+            "Global clustering (transitivity)",
+            "Degeneracy (max k-core)",
             "",
             "Degree centrality (mean ± SD)",
             "Degree centrality (median)",
@@ -194,7 +384,13 @@ network_stats = pd.DataFrame(
             f"{density:.3f}",
             num_components,
             f"{avg_degree:.2f}",
-            f"{degree_centralization:.3f}",
+            *(f"{value:.3f}" for _, value in centralization_rows),
+            num_communities,
+            f"{modularity:.3f}",
+            network_structure["triangles"],
+            f"{network_structure['average_clustering']:.3f}",
+            f"{network_structure['transitivity']:.3f}",
+            network_structure["degeneracy"],
             "",
             f"{mean_degree_cent:.3f} ± {sd_degree_cent:.3f}",
             f"{median_degree_cent:.3f}",
@@ -210,8 +406,8 @@ network_stats = pd.DataFrame(
         ],
     }
 )
-network_stats.to_csv(f"{OUTPUT_DIR}/network_descriptive_stats.csv", index=False)
-print(f"   ✓ Saved network_descriptive_stats.csv")
+network_stats.to_csv(f"{OUTPUT_DIR}/network_descriptive_stats{SUFFIX}.csv", index=False)
+print(f"   ✓ Saved network_descriptive_stats{SUFFIX}.csv")
 
 # Display top institutions
 print("\n6. TOP INSTITUTIONS BY DEGREE CENTRALITY:")
@@ -223,39 +419,79 @@ for idx, row in inst_df.iterrows():
 
 # Calculate correlations
 print("\n7. CORRELATIONS AMONG CENTRALITY MEASURES:")
-corr_degree_between, p1 = spearmanr(
-    df_results["degree_centrality"], df_results["betweenness_centrality"]
+print(
+    f"   ({args.permutations} permutations, {args.bootstrap} bootstrap resamples, "
+    "95% percentile CIs)"
 )
-corr_degree_close, p2 = spearmanr(
-    df_results["degree_centrality"], df_results["closeness_centrality"]
+correlations = correlation_tests(
+    df_results,
+    ["degree_centrality", "betweenness_centrality", "closeness_centrality"],
+    n_permutations=args.permutations,
+    n_bootstrap=args.bootstrap,
 )
-corr_between_close, p3 = spearmanr(
-    df_results["betweenness_centrality"], df_results["closeness_centrality"]
+corr_degree_between, corr_degree_close, corr_between_close = (
+    c["rho"] for c in correlations
 )
 
-print(f"   Degree-Betweenness:     ρ = {corr_degree_between:.3f} (p < 0.001)")
-print(f"   Degree-Closeness:       ρ = {corr_degree_close:.3f} (p < 0.001)")
-print(f"   Betweenness-Closeness:  ρ = {corr_between_close:.3f} (p < 0.001)")
+labels = ["Degree-Betweenness:", "Degree-Closeness:", "Betweenness-Closeness:"]
+for label, c in zip(labels, correlations):
+    print(
+        f"   {label:23} ρ = {c['rho']:.3f} "
+        f"[{c['ci_lower']:.3f}, {c['ci_upper']:.3f}] "
+        f"({format_p(c['p_permutation'], c['n_permutations'])})"
+    )
 
 # Export results
 print("\n8. EXPORTING RESULTS...")
-df_results.to_csv(f"{OUTPUT_DIR}/all_nodes_centrality.csv", index=False)
-print(f"   ✓ {OUTPUT_DIR}/all_nodes_centrality.csv")
+df_results.to_csv(f"{OUTPUT_DIR}/all_nodes_centrality{SUFFIX}.csv", index=False)
+print(f"   ✓ {OUTPUT_DIR}/all_nodes_centrality{SUFFIX}.csv")
 
 inst_results = df_results[df_results["node_type"] == "institution"].copy()
-inst_results.to_csv(f"{OUTPUT_DIR}/institutions_centrality.csv", index=False)
-print(f"   ✓ {OUTPUT_DIR}/institutions_centrality.csv")
-
-corr_matrix = pd.DataFrame(
+inst_results.to_csv(f"{OUTPUT_DIR}/institutions_centrality{SUFFIX}.csv", index=False)
+print(f"   ✓ {OUTPUT_DIR}/institutions_centrality{SUFFIX}.csv")
+
+measure_names = {
+    "degree_centrality": "Degree",
+    "betweenness_centrality": "Betweenness",
+    "closeness_centrality": "Closeness",
+}
+corr_matrix = pd.DataFrame(correlations).replace(
+    {"Measure_1": measure_names, "Measure_2": measure_names}
+)
+corr_matrix.to_csv(f"{OUTPUT_DIR}/centrality_correlations{SUFFIX}.csv", index=False)
+print(f"   ✓ {OUTPUT_DIR}/centrality_correlations{SUFFIX}.csv")
+
+# Typed-array copy of the network with layout and results, for fast reloads;
+# nodes keep the input order so reloaded tables match the CSVs
+positions = nx.spring_layout(G, seed=42)
+binary_nodes = df_results.set_index("node_id").loc[list(G.nodes())].reset_index()
+layout = np.array([positions[node] for node in binary_nodes["node_id"]], np.float32)
+write_network(
+    f"{OUTPUT_DIR}/network{SUFFIX}.bin",
+    binary_nodes.assign(x=layout[:, 0], y=layout[:, 1]),
+    edges.rename(columns={"trial_id": "source", "institution_id": "target"}),
+)
+print(f"   ✓ {OUTPUT_DIR}/network{SUFFIX}.bin")
+
+snapshot_params = {
+    "mode": args.mode,
+    "weighting": args.weighting if args.mode == "weighted" else None,
+    "permutations": args.permutations,
+    "bootstrap": args.bootstrap,
+}
+snapshot = write_snapshot(
     {
-        "Measure": ["Degree", "Betweenness", "Closeness"],
-        "Degree": [1.0, corr_degree_between, corr_degree_close],
-        "Betweenness": [corr_degree_between, 1.0, corr_between_close],
-        "Closeness": [corr_degree_close, corr_between_close, 1.0],
-    }
+        "all_nodes_centrality": df_results,
+        "network_descriptive_stats": network_stats,
+        "centrality_correlations": corr_matrix,
+    },
+    input_fingerprint(
+        [f"{DATA_DIR}/{name}_N11.csv" for name in ("trials", "institutions", "edges")],
+        snapshot_params,
+    ),
+    snapshot_params,
 )
-corr_matrix.to_csv(f"{OUTPUT_DIR}/centrality_correlations.csv", index=False)
-print(f"   ✓ {OUTPUT_DIR}/centrality_correlations.csv")
+print(f"   ✓ Snapshot {snapshot}")
 
 # Create visualizations
 print("\n9. CREATING VISUALIZATIONS...")
@@ -279,12 +515,12 @@ sns.heatmap(
 plt.title("Spearman Correlations Among Centrality Measures", fontsize=14, pad=20)
 plt.tight_layout()
 plt.savefig(
-    f"{OUTPUT_DIR}/figures/supplementary/figure_s1_correlation.png",
+    f"{OUTPUT_DIR}/figures/supplementary/figure_s1_correlation{SUFFIX}.png",
     dpi=300,
     bbox_inches="tight",
 )
 plt.close()
-print(f"   ✓ {OUTPUT_DIR}/figures/supplementary/figure_s1_correlation.png")
+print(f"   ✓ {OUTPUT_DIR}/figures/supplementary/figure_s1_correlation{SUFFIX}.png")
 
 fig, axes = plt.subplots(1, 3, figsize=(15, 4))
 axes[0].scatter(
@@ -310,12 +546,42 @@ axes[2].set_title(f"ρ = {corr_between_close:.3f}")
 
 plt.tight_layout()
 plt.savefig(
-    f"{OUTPUT_DIR}/figures/supplementary/figure_s2_scatter.png",
+    f"{OUTPUT_DIR}/figures/supplementary/figure_s2_scatter{SUFFIX}.png",
     dpi=300,
     bbox_inches="tight",
 )
 plt.close()
-print(f"   ✓ {OUTPUT_DIR}/figures/supplementary/figure_s2_scatter.png")
+print(f"   ✓ {OUTPUT_DIR}/figures/supplementary/figure_s2_scatter{SUFFIX}.png")
+
+# Leave-one-out rank stability; replicates reuse G from the forked workers
+for unit in args.jackknife:
+    print(f"\n10. JACKKNIFE RANK STABILITY (leave one {unit} out)...")
+    stability = jackknife_ranks(
+        G,
+        args.mode,
+        unit,
+        weighting=args.weighting,
+        base_values={
+            "degree_centrality": degree_cent,
+            "betweenness_centrality": betweenness_cent,
+            "closeness_centrality": closeness_cent,
+        },
+        workers=args.workers,
+    )
+    replicates = len(trial_ids) if unit == "trial" else len(inst_results)
+    print(f"   ✓ {replicates} replicates")
+    for measure, rows in stability.groupby("measure", sort=False):
+        unstable = rows[rows["rank_max"] > rows["rank_min"]]
+        worst = rows.loc[rows["max_shift"].idxmax()]
+        print(
+            f"   • {measure_names[measure]}: {len(unstable)}/{len(rows)} "
+            f"institutions change rank; largest shift {worst['max_shift']:.0f} "
+            f"({worst['institution_name']} without {worst['max_shift_without']})"
+        )
+    stability.to_csv(
+        f"{OUTPUT_DIR}/institutions_rank_stability{SUFFIX}_{unit}.csv", index=False
+    )
+    print(f"   ✓ {OUTPUT_DIR}/institutions_rank_stability{SUFFIX}_{unit}.csv")
 
 print("\n" + "=" * 70)
 print("ANALYSIS COMPLETE!")
@@ -4,19 +4,34 @@ Generates publication-ready figures for manuscript
 
 Run from project root:
 python analysis/02_visualize_geographic_temporal.py
+
+Temporal network snapshots default to yearly windows; use --freq with any
+pandas offset alias (e.g. --freq QE for quarters, --freq 6ME for half-years).
 """
 
+import argparse
 import os
 from datetime import datetime
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
+from temporal_network import TemporalNetwork
+
+parser = argparse.ArgumentParser(description="Geographic and temporal figures")
+parser.add_argument(
+    "--freq",
+    default="YE",
+    help="pandas offset alias for temporal network snapshots (default: YE)",
+)
+args = parser.parse_args()
 
 # Set paths
 DATA_DIR = "data/processed"
+RESULTS_DIR = "results"
 OUTPUT_DIR = "results/figures"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(f"{OUTPUT_DIR}/supplementary", exist_ok=True)
 
 print("=" * 70)
 print("GEOGRAPHIC & TEMPORAL VISUALIZATIONS: N=11 DATASET")
@@ -213,11 +228,82 @@ if len(yearly_counts) > 0:
 else:
     print("   ⚠ Warning: No trials with valid start dates - skipping temporal figure")
 
+# ============================================================================
+# FIGURE S3: TEMPORAL NETWORK SNAPSHOTS
+# ============================================================================
+
+print(f"\n4. GROWING TEMPORAL NETWORK (snapshots: {args.freq})...")
+
+institutions = pd.read_csv(f"{DATA_DIR}/institutions_N11.csv")
+edges = pd.read_csv(f"{DATA_DIR}/edges_N11.csv")
+
+# One incremental sweep: trials are added in start-date order and only the
+# components that changed are rescored at each snapshot
+temporal = TemporalNetwork(trials, institutions, edges)
+node_series, network_series = temporal.sweep(freq=args.freq)
+
+if len(network_series) > 0:
+    output_path = f"{RESULTS_DIR}/temporal_network_stats.csv"
+    network_series.to_csv(output_path, index=False)
+    print(f"   ✓ {output_path}")
+
+    output_path = f"{RESULTS_DIR}/temporal_node_centrality.csv"
+    node_series.to_csv(output_path, index=False)
+    print(f"   ✓ {output_path}")
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    x = network_series["snapshot"].astype(str)
+
+    axes[0].plot(x, network_series["density"], marker="o", color="#2E86AB")
+    axes[0].set_xlabel("Snapshot", fontsize=11, fontweight="bold")
+    axes[0].set_ylabel("Network density", fontsize=11, fontweight="bold")
+    axes[0].set_title("Density of the Growing Network", fontsize=12)
+    axes[0].tick_params(axis="x", rotation=45)
+    axes[0].grid(True, alpha=0.3, linestyle="--")
+
+    # Trajectories for the institutions most central in the final snapshot
+    final = node_series[
+        (node_series["snapshot"] == network_series["snapshot"].iloc[-1])
+        & (node_series["node_type"] == "institution")
+    ]
+    top_ids = final.nlargest(5, "degree_centrality")["node_id"]
+    names = institutions.set_index("institution_id")["institution_name"]
+    for node_id in top_ids:
+        series = (
+            node_series[node_series["node_id"] == node_id]
+            .set_index("snapshot")["degree_centrality"]
+            .reindex(network_series["snapshot"])
+        )
+        axes[1].plot(
+            x, series.values, marker="o", label=str(names.get(node_id, node_id))[:30]
+        )
+    axes[1].set_xlabel("Snapshot", fontsize=11, fontweight="bold")
+    axes[1].set_ylabel("Degree centrality", fontsize=11, fontweight="bold")
+    axes[1].set_title("Top Institutions Over Time", fontsize=12)
+    axes[1].tick_params(axis="x", rotation=45)
+    axes[1].grid(True, alpha=0.3, linestyle="--")
+    axes[1].legend(fontsize=8, loc="best")
+
+    plt.tight_layout()
+    output_path = f"{OUTPUT_DIR}/supplementary/figure_s3_temporal_network.png"
+    plt.savefig(output_path, dpi=300, bbox_inches="tight", facecolor="white")
+    print(f"   ✓ {output_path}")
+    plt.close()
+
+    print(f"\n   Temporal Network Summary:")
+    for row in network_series.itertuples(index=False):
+        print(
+            f"     - {row.snapshot}: {row.trials} trials, {row.nodes} nodes, "
+            f"{row.edges} edges, density {row.density:.3f}"
+        )
+else:
+    print("   ⚠ Warning: No trials with valid start dates - skipping snapshots")
+
 # ============================================================================
 # SUMMARY STATISTICS
 # ============================================================================
 
-print("\n4. DATASET SUMMARY:")
+print("\n5. DATASET SUMMARY:")
 print(f"   • Total trials: {len(trials)}")
 print(f"   • Countries represented: {len(country_counts)}")
 print(f"   • Trials with start dates: {len(trials_with_dates)}")
@@ -235,4 +321,5 @@ print(f"\nFiles created in: {OUTPUT_DIR}/")
 print("\nFigures:")
 print("  - figure_2_geographic.png/pdf")
 print("  - figure_3_temporal.png/pdf")
+print("  - supplementary/figure_s3_temporal_network.png")
 print("\nReady for manuscript!")
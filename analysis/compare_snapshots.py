@@ -0,0 +1,113 @@
+"""
+Compare Two Result Snapshots
+Joins the centrality tables of two runs by node_id and reports rank changes
+and metric deltas, plus changed network statistics and correlations
+
+Run from project root (default: the two most recent runs):
+python analysis/compare_snapshots.py
+python analysis/compare_snapshots.py OLD NEW --output results/snapshot_diff.csv
+
+OLD and NEW are snapshot files, name or fingerprint prefixes, or indexes
+(-1 is the latest run). Snapshots are written to results/snapshots/ by
+01_calculate_centrality.py.
+"""
+
+import argparse
+import time
+
+from snapshots import SNAPSHOT_DIR, diff_tables, read_snapshot, resolve_snapshot
+
+parser = argparse.ArgumentParser(description="Snapshot comparison")
+parser.add_argument("old", nargs="?", default="-2", help="baseline snapshot")
+parser.add_argument("new", nargs="?", default="-1", help="snapshot to compare")
+parser.add_argument(
+    "--snapshot-dir", default=str(SNAPSHOT_DIR), help="where snapshots are stored"
+)
+parser.add_argument("--top", type=int, default=10, help="rank movers shown per metric")
+parser.add_argument("--output", default=None, help="write the node diff as CSV")
+args = parser.parse_args()
+
+start = time.perf_counter()
+paths = [resolve_snapshot(ref, args.snapshot_dir) for ref in (args.old, args.new)]
+(old_meta, old), (new_meta, new) = (read_snapshot(p) for p in paths)
+nodes, metrics = diff_tables(
+    old["all_nodes_centrality"],
+    new["all_nodes_centrality"],
+    "node_id",
+    labels=["node_name", "node_type"],
+)
+
+print("=" * 70)
+print("SNAPSHOT COMPARISON")
+print("=" * 70)
+
+print("\n1. Snapshots...")
+for label, path, meta in [("Old", paths[0], old_meta), ("New", paths[1], new_meta)]:
+    params = ", ".join(f"{k}={v}" for k, v in sorted(meta["params"].items()))
+    print(f"   ✓ {label}: {path.name} ({meta['created']}; {params})")
+if old_meta["fingerprint"] == new_meta["fingerprint"]:
+    print("   • Same input fingerprint")
+
+print("\n2. Nodes...")
+for status in ["kept", "added", "removed"]:
+    changed = nodes[nodes["status"] == status]
+    print(f"   ✓ {status}: {len(changed)}")
+    if status != "kept":
+        for _, row in changed.head(args.top).iterrows():
+            print(f"     - {row['node_id']} ({row['node_name']})")
+
+print("\n3. Rank changes (positive = moved up)...")
+kept = nodes[nodes["status"] == "kept"]
+for metric in metrics:
+    change = kept[f"{metric}_rank_change"]
+    moved = kept[change != 0]
+    print(f"   ✓ {metric}: {len(moved)} nodes changed rank")
+    top = moved.reindex(change[change != 0].abs().sort_values(ascending=False).index)
+    for _, row in top.head(args.top).iterrows():
+        print(
+            f"     {str(row['node_name'])[:40]:40} "
+            f"{row[f'{metric}_rank_old']:4.0f} → {row[f'{metric}_rank_new']:4.0f} "
+            f"({row[f'{metric}_rank_change']:+.0f})"
+        )
+
+print("\n4. Metric deltas...")
+for metric in metrics:
+    delta = kept[f"{metric}_delta"]
+    print(
+        f"   ✓ {metric}: {int((delta.abs() > 1e-12).sum())} changed, "
+        f"max |Δ| = {delta.abs().max():.4g}, mean Δ = {delta.mean():+.4g}"
+    )
+
+print("\n5. Network statistics...")
+stats = [
+    table["network_descriptive_stats"].dropna().set_index("Metric")["Value"]
+    for table in (old, new)
+]
+stats = stats[0].to_frame("old").join(stats[1].to_frame("new"), how="outer")
+changed = stats[stats["old"].astype(str) != stats["new"].astype(str)]
+for metric, row in changed.iterrows():
+    print(f"   • {metric}: {row['old']} → {row['new']}")
+if changed.empty:
+    print("   ✓ No changes")
+
+print("\n6. Correlations...")
+pairs = []
+for table in (old, new):
+    corr = table["centrality_correlations"].copy()
+    corr["pair"] = corr["Measure_1"] + "–" + corr["Measure_2"]
+    pairs.append(corr)
+correlations, _ = diff_tables(pairs[0], pairs[1], "pair", ranked=False)
+for _, row in correlations.iterrows():
+    print(
+        f"   • {row['pair']:24} ρ {row['rho_old']:.3f} → {row['rho_new']:.3f} "
+        f"(Δ {row['rho_delta']:+.3f})"
+    )
+
+if args.output:
+    nodes.to_csv(args.output, index=False)
+    print(f"\n   ✓ Saved node diff to {args.output}")
+
+print(f"\n   • Compared in {(time.perf_counter() - start) * 1000:.1f} ms")
+print("\n" + "=" * 70)
+print("SNAPSHOT COMPARISON COMPLETE!")
+print("=" * 70)
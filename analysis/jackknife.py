@@ -0,0 +1,169 @@
+"""
+Leave-one-out (jackknife) rank stability
+Removes each trial, or each institution, in turn and recomputes the
+institution centrality rankings
+
+The base graph and its trial memberships are held in a module global before
+the worker pool forks, so every worker reads them copy-on-write instead of
+reloading the CSVs. A replicate copies the base graph, drops one node and
+patches only the co-participation edges of the trials it touched: the pair
+weights of those trials are recomputed with and without the dropped node and
+the difference is applied to the copy (an edge disappears when no remaining
+trial supports it). Replicates are sent to the workers in chunks.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from networkx.algorithms import bipartite
+from parallel import parallel_map
+from weighted_network import projection_weights, weighted_centrality
+
+MEASURES = ["degree_centrality", "betweenness_centrality", "closeness_centrality"]
+UNITS = ("trial", "institution")
+
+# (G, trial_members, pair_support, mode, weighting, institutions) shared with
+# the forked workers
+_BASE = None
+
+
+def trial_members(G):
+    """trial_id -> institution ids of each trial node"""
+    return {
+        node: [n for n in G.neighbors(node) if G.nodes[n]["node_type"] == "institution"]
+        for node, data in G.nodes(data=True)
+        if data["node_type"] == "trial"
+    }
+
+
+def centralities(G, mode):
+    """{measure: {node: value}} as computed by 01_calculate_centrality.py"""
+    if mode == "projection":
+        return {
+            "degree_centrality": nx.degree_centrality(G),
+            "betweenness_centrality": nx.betweenness_centrality(G),
+            "closeness_centrality": nx.closeness_centrality(G),
+        }
+    if mode == "weighted":
+        weighted = weighted_centrality(G)
+        return {
+            "degree_centrality": nx.degree_centrality(G),
+            "betweenness_centrality": weighted["betweenness"],
+            "closeness_centrality": weighted["closeness"],
+        }
+    trials = [n for n, d in G.nodes(data=True) if d["node_type"] == "trial"]
+    return {
+        "degree_centrality": bipartite.degree_centrality(G, trials),
+        "betweenness_centrality": bipartite.betweenness_centrality(G, trials),
+        "closeness_centrality": bipartite.closeness_centrality(G, trials),
+    }
+
+
+def leave_one_out(G, members, support, mode, weighting, drop):
+    """Copy of G without node `drop`, projected edges updated
+
+    support holds the number of trials behind each co-participation pair of
+    the base graph.
+    """
+    H = G.copy()
+    H.remove_node(drop)
+    if mode == "bipartite":
+        return H
+
+    if drop in members:
+        before = {drop: members[drop]}
+        after = {}
+    else:
+        before = {t: m for t, m in members.items() if drop in m}
+        after = {t: [i for i in m if i != drop] for t, m in before.items()}
+    lost = projection_weights(before, "count")
+    kept = projection_weights(after, "count")
+    if mode == "weighted":
+        weight_before = projection_weights(before, weighting)
+        weight_after = projection_weights(after, weighting)
+
+    for (u, v), count in lost.items():
+        if not H.has_edge(u, v):
+            continue  # an endpoint was the dropped node
+        if support[(u, v)] - count + kept.get((u, v), 0) <= 0:
+            H.remove_edge(u, v)
+        elif mode == "weighted":
+            H[u][v]["weight"] += weight_after.get((u, v), 0.0) - weight_before[(u, v)]
+    return H
+
+
+def _ranks(values, institutions):
+    """Rank of each institution (1 = most central; NaN if absent)"""
+    series = pd.Series([values.get(i, np.nan) for i in institutions], dtype=float)
+    return series.rank(ascending=False, method="min").to_numpy()
+
+
+def _replicates(drops):
+    G, members, support, mode, weighting, institutions = _BASE
+    result = []
+    for drop in drops:
+        H = leave_one_out(G, members, support, mode, weighting, drop)
+        values = centralities(H, mode)
+        result.append(
+            np.column_stack([_ranks(values[m], institutions) for m in MEASURES])
+        )
+    return result
+
+
+def jackknife_ranks(
+    G, mode, unit, weighting="count", base_values=None, workers=None, chunk_size=8
+):
+    """Leave-one-`unit`-out institution rank stability
+
+    base_values are the full-data centralities ({measure: {node: value}}),
+    computed here if not given. Returns one row per institution and measure with the full-data value and
+    rank, the range, mean and jackknife standard error of the replicate
+    ranks, and the left-out trial or institution that moved it the most.
+    """
+    global _BASE
+    if unit not in UNITS:
+        raise ValueError(f"Unknown jackknife unit '{unit}', expected {UNITS}")
+    members = trial_members(G)
+    institutions = [n for n, d in G.nodes(data=True) if d["node_type"] == "institution"]
+    support = projection_weights(members, "count")
+    drops = sorted(members) if unit == "trial" else institutions
+
+    if base_values is None:
+        base_values = centralities(G, mode)
+    base_ranks = np.column_stack(
+        [_ranks(base_values[m], institutions) for m in MEASURES]
+    )
+    _BASE = (G, members, support, mode, weighting, institutions)
+    try:
+        chunks = [drops[i : i + chunk_size] for i in range(0, len(drops), chunk_size)]
+        ranks = np.stack(
+            [r for chunk in parallel_map(_replicates, chunks, workers) for r in chunk]
+        )  # replicates x institutions x measures
+    finally:
+        _BASE = None
+
+    n = len(drops)
+    mean = np.nanmean(ranks, axis=0)
+    se = np.sqrt((n - 1) / n * np.nansum((ranks - mean) ** 2, axis=0))
+    shift = np.nan_to_num(np.abs(ranks - base_ranks), nan=-1.0)
+    biggest = shift.argmax(axis=0)
+
+    rows = []
+    for i, institution in enumerate(institutions):
+        for j, measure in enumerate(MEASURES):
+            rows.append(
+                {
+                    "institution_id": institution,
+                    "institution_name": G.nodes[institution]["name"],
+                    "measure": measure,
+                    "value": base_values[measure][institution],
+                    "rank": base_ranks[i, j],
+                    "rank_min": np.nanmin(ranks[:, i, j]),
+                    "rank_max": np.nanmax(ranks[:, i, j]),
+                    "rank_mean": mean[i, j],
+                    "rank_se": se[i, j],
+                    "max_shift": shift[biggest[i, j], i, j],
+                    "max_shift_without": drops[biggest[i, j]],
+                }
+            )
+    return pd.DataFrame(rows)
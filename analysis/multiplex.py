@@ -0,0 +1,165 @@
+"""
+Multiplex trial-institution network
+One layer per relationship type (collaboration, funding, ...) over a shared
+node index, with per-layer and aggregated centralities
+
+Each layer is a symmetric CSR adjacency over the same node order as the full
+network, holding that relationship type's trial-institution links and, in the
+projected modes, the co-participation pairs of institutions tied to a trial
+through that type. Layers never copy the graph: measures run directly on
+their arrays (degree from the row pointers, closeness and betweenness from
+one Brandes sweep per layer) and are normalized the way the run's mode
+normalizes the full network. Aggregated measures combine the layers'
+degrees: overlapping degree (their sum) and the participation coefficient
+(1 when ties are spread evenly over all layers, 0 when they sit in one).
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from weighted_network import projection_weights, shortest_path_sweep
+
+
+class Multiplex:
+    """Relationship-type layers over one node index"""
+
+    def __init__(self, nodes, trials):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.is_trial = np.isin(self.nodes, list(trials))
+        self.layers = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add_layer(self, name, u, v, weight=None):
+        """Store the edges (u[i], v[i]) as layer `name`
+
+        Without weights the layer is binary; with weights, parallel edges add.
+        """
+        n = len(self.nodes)
+        rows = np.fromiter((self.index[x] for x in u), dtype=np.int64, count=len(u))
+        cols = np.fromiter((self.index[x] for x in v), dtype=np.int64, count=len(v))
+        data = np.ones(len(u)) if weight is None else np.asarray(weight, dtype=float)
+        A = sp.coo_array(
+            (np.concatenate([data, data]), (np.r_[rows, cols], np.r_[cols, rows])),
+            shape=(n, n),
+        ).tocsr()
+        A.setdiag(0)
+        A.eliminate_zeros()
+        if weight is None:
+            A.data[:] = 1.0
+        A.sort_indices()
+        self.layers[name] = A
+
+    @classmethod
+    def from_edges(cls, nodes, trials, edges, mode="projection", weighting="count"):
+        """Layers from the trial-institution edge table, one per relationship_type
+
+        mode follows 01_calculate_centrality.py: bipartite layers keep only
+        the trial-institution links; projection and weighted layers also link
+        the institutions of each trial within the layer (weighted by
+        `weighting` in weighted mode, trial-institution links weighing 1).
+        """
+        multiplex = cls(nodes, trials)
+        for relationship, layer in edges.groupby("relationship_type", sort=True):
+            u = layer["trial_id"].tolist()
+            v = layer["institution_id"].tolist()
+            weight = None if mode != "weighted" else [1.0] * len(u)
+            if mode != "bipartite":
+                members = layer.groupby("trial_id")["institution_id"].apply(list)
+                pairs = projection_weights(
+                    members.to_dict(), weighting if mode == "weighted" else "count"
+                )
+                u += [a for a, _ in pairs]
+                v += [b for _, b in pairs]
+                if weight is not None:
+                    weight += list(pairs.values())
+            multiplex.add_layer(relationship, u, v, weight)
+        return multiplex
+
+    def degrees(self):
+        """{layer: number of neighbours of each node}"""
+        return {name: np.diff(A.indptr) for name, A in self.layers.items()}
+
+    def layer_centrality(self, name, mode="projection"):
+        """Degree, betweenness and closeness centrality of every node in one
+        layer, normalized over the full node index as in `mode`"""
+        A = self.layers[name]
+        n = len(self.nodes)
+        degree = np.diff(A.indptr).astype(float)
+        totals, reach, raw = shortest_path_sweep(A.indptr, A.indices, 1.0 / A.data)
+        totals, reach, raw = np.array(totals), np.array(reach), np.array(raw)
+        connected = totals > 0
+
+        if mode != "bipartite":
+            closeness = np.zeros(n)
+            closeness[connected] = (
+                (reach[connected] - 1) ** 2 / totals[connected] / max(n - 1, 1)
+            )
+            return {
+                "degree_centrality": degree / max(n - 1, 1),
+                "betweenness_centrality": raw / ((n - 1) * (n - 2)) if n > 2 else raw,
+                "closeness_centrality": closeness,
+            }
+
+        # Borgatti-Halgin normalizations, as in networkx.algorithms.bipartite,
+        # with trials as the top set
+        top = self.is_trial
+        n_top, n_bottom = int(top.sum()), int((~top).sum())
+        degree = degree / np.where(top, n_bottom, n_top)
+        closeness = np.zeros(n)
+        best = np.where(top, n_bottom + 2 * (n_top - 1), n_top + 2 * (n_bottom - 1))
+        closeness[connected] = (
+            best[connected] / totals[connected] * (reach[connected] - 1) / (n - 1)
+        )
+        most = np.where(
+            top, _max_betweenness(n_top, n_bottom), _max_betweenness(n_bottom, n_top)
+        )
+        return {
+            "degree_centrality": degree,
+            "betweenness_centrality": raw / 2 / most,
+            "closeness_centrality": closeness,
+        }
+
+    def centralities(self, mode="projection"):
+        """Per-layer and aggregated measures, one row per node
+
+        Columns are <measure>_<layer> for every layer, then
+        overlapping_degree and participation_coefficient.
+        """
+        columns = {}
+        for name in self.layers:
+            for measure, values in self.layer_centrality(name, mode).items():
+                columns[f"{measure}_{name}"] = values
+        # One column per layer; no layers (an empty edge table) gives no columns
+        degree = np.column_stack(
+            [*self.degrees().values(), np.empty((len(self.nodes), 0), dtype=np.int64)]
+        )
+        overlapping = degree.sum(axis=1)
+        layers = degree.shape[1]
+        share = np.divide(
+            degree,
+            overlapping[:, None],
+            out=np.zeros(degree.shape),
+            where=overlapping[:, None] > 0,
+        )
+        participation = (
+            layers / (layers - 1) * (1 - (share**2).sum(axis=1))
+            if layers > 1
+            else np.zeros(len(overlapping))
+        )
+        columns["overlapping_degree"] = overlapping
+        columns["participation_coefficient"] = np.where(
+            overlapping > 0, participation, 0.0
+        )
+        return pd.DataFrame(columns, index=pd.Index(self.nodes, name="node_id"))
+
+
+def _max_betweenness(n, m):
+    """Largest possible betweenness of a node in the set of size n of a
+    bipartite graph whose other set has m nodes (Borgatti & Halgin)"""
+    s, t = divmod(n - 1, m)
+    return (
+        (m**2) * ((s + 1) ** 2) + m * (s + 1) * (2 * t - s - 1) - t * (2 * s - t + 3)
+    ) / 2.0
@@ -0,0 +1,256 @@
+"""
+Binary network format
+Nodes, edges, layout positions and centralities as typed little-endian
+arrays, read back zero-copy through a memory map
+
+Parsing CSV or JSON dominates loading a large network. In this format every
+column is a contiguous array, so reading it is a header parse followed by
+numpy views into the mapped file: nothing is copied or converted until a
+column is used, and the same bytes can be wrapped by JavaScript typed arrays.
+
+Layout (all integers little-endian; every section starts on an 8-byte
+boundary, so Float64Array/BigUint64Array views work without copying):
+
+    header   32 bytes   magic b"NETGRAPH", u16 version (1), u16 reserved,
+                        u32 section count, u64 node count, u64 edge count
+    table    88 bytes   per section: name (64 bytes, UTF-8, NUL padded),
+                        dtype (8 bytes, numpy type string such as "<f8",
+                        or "str"), u64 byte offset, u64 element count
+    data                the section arrays
+
+Sections:
+
+    node:<column>    one value per node; node:node_id holds the node ids
+    edge:source      u32 index of each edge's first node
+    edge:target      u32 index of each edge's second node
+    edge:<column>    one value per edge
+    strings:offsets  u64, string count + 1 byte offsets into strings:data
+    strings:data     UTF-8 bytes of all distinct strings, concatenated
+
+A "str" section stores u32 indexes into the string table, with 0xFFFFFFFF
+for a missing value. Numeric columns keep their own type (positions are
+written as float32, centralities as float64).
+"""
+
+import mmap
+import os
+import struct
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+MAGIC = b"NETGRAPH"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQ")
+SECTION = struct.Struct("<64s8sQQ")
+MISSING = np.uint32(0xFFFFFFFF)
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class _Strings:
+    """Interns strings into one shared table"""
+
+    def __init__(self):
+        self.index = {}
+
+    def encode(self, values):
+        codes = np.empty(len(values), dtype="<u4")
+        for i, value in enumerate(values):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                codes[i] = MISSING
+            else:
+                codes[i] = self.index.setdefault(str(value), len(self.index))
+        return codes
+
+    def sections(self):
+        data = [s.encode("utf-8") for s in self.index]
+        offsets = np.zeros(len(data) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in data], out=offsets[1:])
+        return {
+            "strings:offsets": ("<u8", offsets),
+            "strings:data": ("|u1", np.frombuffer(b"".join(data), dtype="|u1")),
+        }
+
+
+def _column(values, strings):
+    """(dtype code, array) for one DataFrame column"""
+    if pd.api.types.is_bool_dtype(values):
+        return "|b1", values.to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(values):
+        array = values.to_numpy()
+        return array.dtype.newbyteorder("<").str, array.astype(
+            array.dtype.newbyteorder("<"), copy=False
+        )
+    if pd.api.types.is_object_dtype(values) or isinstance(
+        values.dtype, (pd.StringDtype, pd.CategoricalDtype)
+    ):
+        return "str", strings.encode(values.astype(object).tolist())
+    raise TypeError(f"Column '{values.name}' has unsupported dtype {values.dtype}")
+
+
+def write_network(path, nodes, edges, source="source", target="target"):
+    """Write nodes and edges to path
+
+    nodes has a node_id column plus any per-node columns (types, names,
+    positions, centralities); edges has source and target columns holding
+    node ids plus any per-edge columns.
+    """
+    if "node_id" not in nodes:
+        raise ValueError("nodes needs a node_id column")
+    index = pd.Index(nodes["node_id"])
+    if not index.is_unique:
+        raise ValueError("node ids are not unique")
+    ends = [index.get_indexer(edges[source]), index.get_indexer(edges[target])]
+    if any((end < 0).any() for end in ends):
+        raise ValueError("edges refer to node ids that are not in nodes")
+
+    strings = _Strings()
+    sections = {}
+    for column in nodes.columns:
+        sections[f"node:{column}"] = _column(nodes[column], strings)
+    sections["edge:source"] = ("<u4", ends[0].astype("<u4"))
+    sections["edge:target"] = ("<u4", ends[1].astype("<u4"))
+    for column in edges.columns.drop([source, target]):
+        sections[f"edge:{column}"] = _column(edges[column], strings)
+    sections.update(strings.sections())
+
+    table, offset = [], _align(HEADER.size + SECTION.size * len(sections))
+    for name, (dtype, array) in sections.items():
+        encoded = name.encode("utf-8")
+        if len(encoded) > 64:
+            raise ValueError(f"Section name '{name}' is longer than 64 bytes")
+        table.append(SECTION.pack(encoded, dtype.encode(), offset, len(array)))
+        offset = _align(offset + array.nbytes)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(sections), len(nodes), len(edges)))
+        f.write(b"".join(table))
+        for dtype, array in sections.values():
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp, path)
+
+
+class BinaryNetwork:
+    """A network file mapped into memory
+
+    Arrays returned by `array` are read-only views into the mapping.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, self.node_count, self.edge_count = HEADER.unpack_from(
+            self._buffer, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary network file")
+        if version != VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+        self.sections = {}
+        for i in range(count):
+            name, dtype, offset, length = SECTION.unpack_from(
+                self._buffer, HEADER.size + i * SECTION.size
+            )
+            self.sections[name.rstrip(b"\0").decode("utf-8")] = (
+                dtype.rstrip(b"\0").decode(),
+                offset,
+                length,
+            )
+        self._offsets = self.array("strings:offsets")
+        self._data = self.array("strings:data")
+
+    @property
+    def node_columns(self):
+        return [n[5:] for n in self.sections if n.startswith("node:")]
+
+    @property
+    def edge_columns(self):
+        return [
+            n[5:]
+            for n in self.sections
+            if n.startswith("edge:") and n not in ("edge:source", "edge:target")
+        ]
+
+    def array(self, name):
+        """Zero-copy view of a section (string sections as u32 indexes)"""
+        dtype, offset, length = self.sections[name]
+        return np.frombuffer(
+            self._buffer,
+            dtype="<u4" if dtype == "str" else dtype,
+            count=length,
+            offset=offset,
+        )
+
+    def string(self, i):
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def column(self, name):
+        """Values of a section, string sections decoded to an object array"""
+        values = self.array(name)
+        if self.sections[name][0] != "str":
+            return values
+        codes, inverse = np.unique(values, return_inverse=True)
+        decoded = np.empty(len(codes), dtype=object)
+        decoded[:] = [None if c == MISSING else self.string(c) for c in codes]
+        return decoded[inverse]
+
+    def nodes(self):
+        """Node table (numeric columns share memory with the mapping)"""
+        return pd.DataFrame({c: self.column(f"node:{c}") for c in self.node_columns})
+
+    def edges(self):
+        """Edge table with source and target as node ids"""
+        ids = self.column("node:node_id")
+        return pd.DataFrame(
+            {
+                "source": ids[self.array("edge:source")],
+                "target": ids[self.array("edge:target")],
+                **{c: self.column(f"edge:{c}") for c in self.edge_columns},
+            }
+        )
+
+    def csr(self):
+        """(indptr, indices) of the undirected adjacency, by node index"""
+        u = self.array("edge:source").astype(np.int64)
+        v = self.array("edge:target").astype(np.int64)
+        rows, cols = np.r_[u, v], np.r_[v, u]
+        order = np.argsort(rows * self.node_count + cols)
+        indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.node_count), out=indptr[1:])
+        return indptr, cols[order]
+
+    def to_networkx(self):
+        """Undirected graph with every node and edge column as an attribute
+
+        Missing values (None, or NaN as pandas returns missing strings) are
+        left out rather than stored as attributes.
+        """
+        G = nx.Graph()
+        nodes = self.nodes()
+        attributes = nodes.drop(columns="node_id").to_dict("records")
+        G.add_nodes_from(
+            (node, {k: v for k, v in attrs.items() if not pd.isna(v)})
+            for node, attrs in zip(nodes["node_id"], attributes)
+        )
+        edges = self.edges()
+        G.add_edges_from(
+            (u, v, {k: val for k, val in attrs.items() if not pd.isna(val)})
+            for u, v, attrs in zip(
+                edges["source"],
+                edges["target"],
+                edges.drop(columns=["source", "target"]).to_dict("records"),
+            )
+        )
+        return G
+
+
+def read_network(path):
+    """Map a network file written by write_network"""
+    return BinaryNetwork(path)
@@ -0,0 +1,33 @@
+"""
+Process pool helper shared by the analysis stages
+
+The numbered analysis scripts run at module level without a __main__ guard,
+so worker processes must be forked rather than spawned (a spawned worker would
+re-run the whole calling script). Where fork is unavailable the work runs
+serially in the calling process.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    """Number of worker processes to use by default"""
+    return max(1, os.cpu_count() or 1)
+
+
+def parallel_map(func, jobs, workers=None):
+    """Map func over jobs across forked worker processes
+
+    Results are returned in job order. Falls back to a plain loop for a
+    single worker, a single job, or platforms without fork.
+    """
+    jobs = list(jobs)
+    workers = min(workers or default_workers(), len(jobs))
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [func(job) for job in jobs]
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(func, jobs))
@@ -0,0 +1,308 @@
+"""
+Bulk ingest of full registry dumps
+Reads study members straight out of ClinicalTrials.gov dump archives (the
+API v2 JSON zip, one study per member, or the legacy per-study XML zip)
+without extracting them
+
+Member names are listed once and split into batches; each worker process
+opens the archive once and keeps it open for all its batches (a ZipFile must
+not be shared across forked processes, and reopening it rereads the whole
+central directory), parses each batch into the raw CSV layout, screens it (screening.py) and
+writes the kept rows as a run file sorted by NCT Number. Runs are combined
+with a k-way merge, at most MERGE_FAN_IN at a time, keeping the most
+recently updated version of each study. Memory is bounded by one batch per
+worker plus one row per open run, whatever the size of the dump.
+"""
+
+import csv
+import heapq
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from parallel import parallel_map
+from registry_client import RAW_FIELDS, study_to_raw
+from screening import screen_records
+
+BATCH_SIZE = 2000
+MERGE_FAN_IN = 64
+
+# The raw study text fields can be far larger than the csv module's default
+csv.field_size_limit(2**31 - 1)
+
+
+def archive_members(path):
+    """Names of the study members (.json / .xml) in a dump archive"""
+    with zipfile.ZipFile(path) as archive:
+        return sorted(
+            name
+            for name in archive.namelist()
+            if name.lower().endswith((".json", ".xml"))
+            and Path(name).stem.upper().startswith("NCT")
+        )
+
+
+def _text(element, path):
+    found = element.find(path)
+    return " ".join(found.text.split()) if found is not None and found.text else ""
+
+
+def _texts(element, path):
+    return [" ".join(e.text.split()) for e in element.findall(path) if e.text]
+
+
+def _legacy_date(value):
+    """'May 1, 2021' -> '2021-05-01', 'May 2021' -> '2021-05'"""
+    for fmt, out in (("%B %d, %Y", "%Y-%m-%d"), ("%B %Y", "%Y-%m")):
+        try:
+            return datetime.strptime(value, fmt).strftime(out)
+        except ValueError:
+            pass
+    return value
+
+
+def _legacy_code(value):
+    """'Active, not recruiting' -> 'ACTIVE_NOT_RECRUITING' (v2 enum style)"""
+    return re.sub(r"[^A-Z0-9]+", "_", value.upper()).strip("_")
+
+
+def xml_study_to_raw(data):
+    """One legacy clinical_study XML document as a row of the raw CSV layout"""
+    root = ET.fromstring(data)
+    nct = _text(root, "id_info/nct_id")
+    design = root.find("study_design_info")
+    if design is not None:
+        study_design = "|".join(
+            f"{label}: {_legacy_code(_text(design, tag))}"
+            for label, tag in [
+                ("Allocation", "allocation"),
+                ("Intervention Model", "intervention_model"),
+                ("Masking", "masking"),
+                ("Primary Purpose", "primary_purpose"),
+            ]
+        )
+    else:
+        study_design = ""
+    outcomes = {
+        kind: "|".join(
+            ", ".join(
+                part
+                for part in (
+                    _text(o, "measure"),
+                    _text(o, "description"),
+                    _text(o, "time_frame"),
+                )
+                if part
+            )
+            for o in root.findall(f"{kind}_outcome")
+        )
+        for kind in ("primary", "secondary", "other")
+    }
+    locations = [
+        ", ".join(
+            part
+            for part in (
+                _text(loc, "facility/name"),
+                _text(loc, "facility/address/city"),
+                _text(loc, "facility/address/state"),
+                _text(loc, "facility/address/zip"),
+                _text(loc, "facility/address/country"),
+            )
+            if part
+        )
+        for loc in root.findall("location")
+    ]
+    phases = _text(root, "phase")
+    dates = {
+        tag: _legacy_date(_text(root, tag))
+        for tag in (
+            "start_date",
+            "primary_completion_date",
+            "completion_date",
+            "study_first_posted",
+            "results_first_posted",
+            "last_update_posted",
+        )
+    }
+    return {
+        "NCT Number": nct,
+        "Study Title": _text(root, "brief_title"),
+        "Study URL": f"https://clinicaltrials.gov/study/{nct}",
+        "Acronym": _text(root, "acronym"),
+        "Study Status": _legacy_code(_text(root, "overall_status")),
+        "Brief Summary": _text(root, "brief_summary/textblock"),
+        "Study Results": "YES" if root.find("clinical_results") is not None else "NO",
+        "Conditions": "|".join(_texts(root, "condition")),
+        "Interventions": "|".join(
+            f"{_legacy_code(_text(i, 'intervention_type'))}: "
+            f"{_text(i, 'intervention_name')}"
+            for i in root.findall("intervention")
+        ),
+        "Primary Outcome Measures": outcomes["primary"],
+        "Secondary Outcome Measures": outcomes["secondary"],
+        "Other Outcome Measures": outcomes["other"],
+        "Sponsor": _text(root, "sponsors/lead_sponsor/agency"),
+        "Collaborators": "|".join(_texts(root, "sponsors/collaborator/agency")),
+        "Sex": _legacy_code(_text(root, "eligibility/gender")),
+        "Age": "",
+        "Phases": "|".join(
+            _legacy_code(p).replace("_", "")
+            for p in phases.split("/")
+            if p and p != "N/A"
+        ),
+        "Enrollment": _text(root, "enrollment"),
+        "Funder Type": _legacy_code(_text(root, "sponsors/lead_sponsor/agency_class")),
+        "Study Type": _legacy_code(_text(root, "study_type")),
+        "Study Design": study_design,
+        "Other IDs": "|".join(
+            _texts(root, "id_info/org_study_id") + _texts(root, "id_info/secondary_id")
+        ),
+        "Start Date": dates["start_date"],
+        "Primary Completion Date": dates["primary_completion_date"],
+        "Completion Date": dates["completion_date"],
+        "First Posted": dates["study_first_posted"],
+        "Results First Posted": dates["results_first_posted"],
+        "Last Update Posted": dates["last_update_posted"],
+        "Locations": "|".join(locations),
+        "Study Documents": "",
+    }
+
+
+def parse_member(name, data):
+    """Raw row for one archive member (JSON v2 study or legacy XML)"""
+    if name.lower().endswith(".json"):
+        return study_to_raw(json.loads(data))
+    return xml_study_to_raw(data)
+
+
+_ARCHIVES = {}
+
+
+def _open_archive(path):
+    """ZipFile for path, opened once per process"""
+    pid, archive = _ARCHIVES.get(path, (None, None))
+    if pid != os.getpid():
+        archive = zipfile.ZipFile(path)
+        _ARCHIVES[path] = (os.getpid(), archive)
+    return archive
+
+
+def _write_run(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RAW_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def _read_run(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def _ingest_batch(job):
+    """Parse, screen and sort one batch of members into a run file"""
+    archive_path, names, run_path, screen = job
+    rows, errors = [], []
+    archive = _open_archive(archive_path)
+    for name in names:
+        try:
+            row = parse_member(name, archive.read(name))
+        except (ValueError, AttributeError, ET.ParseError) as exc:
+            errors.append((name, str(exc)))
+            continue
+        if row["NCT Number"]:
+            rows.append(row)
+    parsed = len(rows)
+    if screen and rows:
+        screened, _ = screen_records(pd.DataFrame(rows, columns=RAW_FIELDS), workers=1)
+        rows = [row for row, keep in zip(rows, screened["eligible"]) if keep]
+    rows.sort(key=lambda row: row["NCT Number"])
+    return _write_run(rows, run_path), parsed, len(rows), errors
+
+
+def merge_runs(runs, output, tmp_dir):
+    """k-way merge of sorted runs into one sorted CSV, one row per study
+
+    Where a study appears more than once the row with the latest `Last
+    Update Posted` wins (the later run on ties). Returns (written,
+    duplicates).
+    """
+    runs = list(runs)
+    level = 0
+    while len(runs) > MERGE_FAN_IN:
+        level += 1
+        merged = []
+        for i in range(0, len(runs), MERGE_FAN_IN):
+            path = Path(tmp_dir) / f"merge_{level}_{i // MERGE_FAN_IN:06d}.csv"
+            _merge(runs[i : i + MERGE_FAN_IN], path)
+            merged.append(path)
+        runs = merged
+    return _merge(runs, output)
+
+
+def _merge(runs, output):
+    written = duplicates = 0
+    streams = [
+        ((row["NCT Number"], order, row) for row in _read_run(run))
+        for order, run in enumerate(runs)
+    ]
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RAW_FIELDS)
+        writer.writeheader()
+        for _, group in itertools.groupby(
+            heapq.merge(*streams, key=lambda item: item[:2]), key=lambda item: item[0]
+        ):
+            versions = [row for _, _, row in group]
+            duplicates += len(versions) - 1
+            writer.writerow(
+                max(
+                    enumerate(versions),
+                    key=lambda v: (v[1]["Last Update Posted"], v[0]),
+                )[1]
+            )
+            written += 1
+    return written, duplicates
+
+
+def bulk_ingest(
+    archives, output, workers=None, screen=True, batch_size=BATCH_SIZE, tmp_dir=None
+):
+    """Ingest one or more dump archives into a single sorted raw CSV
+
+    Returns a summary with member, parsed, kept, written and duplicate
+    counts and the members that failed to parse.
+    """
+    work = Path(tempfile.mkdtemp(prefix="registry_bulk_", dir=tmp_dir))
+    try:
+        jobs = []
+        for archive in archives:
+            names = archive_members(archive)
+            for i in range(0, len(names), batch_size):
+                run_path = work / f"run_{len(jobs):06d}.csv"
+                jobs.append((str(archive), names[i : i + batch_size], run_path, screen))
+        results = parallel_map(_ingest_batch, jobs, workers)
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        written, duplicates = merge_runs([r[0] for r in results], output, work)
+    finally:
+        for _, archive in _ARCHIVES.values():
+            archive.close()
+        _ARCHIVES.clear()
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "members": sum(len(job[1]) for job in jobs),
+        "batches": len(jobs),
+        "parsed": sum(r[1] for r in results),
+        "kept": sum(r[2] for r in results),
+        "written": written,
+        "duplicates": duplicates,
+        "errors": [e for r in results for e in r[3]],
+    }
@@ -0,0 +1,430 @@
+"""
+Concurrent ClinicalTrials.gov (API v2) fetch client
+Pages through protocol searches and writes studies in the raw ingest format
+
+- One pooled aiohttp session (keep-alive connections, at most `concurrency`
+  open at a time) serves every request.
+- Pagination follows `nextPageToken`; the pages of one query are sequential,
+  while different queries (one per country, as in registry-monitor-n11.js)
+  run concurrently, bounded by a semaphore.
+- A shared token bucket enforces `rateLimit` from registry-config.json,
+  read as requests per minute.
+- 429/5xx responses and connection errors are retried with exponential
+  backoff and jitter, honouring Retry-After.
+- Each study is converted to the 30-column CSV layout of the ClinicalTrials.gov
+  export used in data/raw/ and written as `<NCT Number>.csv`.
+"""
+
+import asyncio
+import csv
+import json
+import random
+import time
+from pathlib import Path
+
+import aiohttp
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "web_interface" / "config"
+DEFAULT_CONFIG = CONFIG_DIR / "registry-config.json"
+
+# Column layout of the ClinicalTrials.gov CSV export (data/raw/)
+RAW_FIELDS = [
+    "NCT Number",
+    "Study Title",
+    "Study URL",
+    "Acronym",
+    "Study Status",
+    "Brief Summary",
+    "Study Results",
+    "Conditions",
+    "Interventions",
+    "Primary Outcome Measures",
+    "Secondary Outcome Measures",
+    "Other Outcome Measures",
+    "Sponsor",
+    "Collaborators",
+    "Sex",
+    "Age",
+    "Phases",
+    "Enrollment",
+    "Funder Type",
+    "Study Type",
+    "Study Design",
+    "Other IDs",
+    "Start Date",
+    "Primary Completion Date",
+    "Completion Date",
+    "First Posted",
+    "Results First Posted",
+    "Last Update Posted",
+    "Locations",
+    "Study Documents",
+]
+
+
+def load_protocol_countries(path=DEFAULT_CONFIG):
+    """Protocol country list (subSaharanAfrica in registry-config.json)"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["subSaharanAfrica"]
+
+
+# Search protocol countries; web_interface/countries.py reads the same list
+SUB_SAHARAN_AFRICA = load_protocol_countries()
+AI_DIAGNOSTIC_QUERY = (
+    "(artificial intelligence OR machine learning OR deep learning OR neural "
+    "network OR computer vision OR AI OR ML OR DL) AND (diagnostic OR diagnosis "
+    "OR screening OR detection OR test)"
+)
+SEARCH_STATUSES = (
+    "RECRUITING|ACTIVE_NOT_RECRUITING|COMPLETED|ENROLLING_BY_INVITATION"
+    "|NOT_YET_RECRUITING"
+)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+USER_AGENT = "AI-Trials-Africa-Monitor/1.0 (Academic Research)"
+
+
+class RegistryFetchError(RuntimeError):
+    """A request still failed after all retries"""
+
+
+def load_registry_config(path=DEFAULT_CONFIG):
+    """The clinicalTrials block of registry-config.json"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["registries"]["clinicalTrials"]
+
+
+def protocol_queries(countries=SUB_SAHARAN_AFRICA, min_start_date=None, advanced=()):
+    """Search parameters for one protocol query per country
+
+    advanced holds extra Essie expressions (e.g. a LastUpdatePostDate range)
+    combined with AND into filter.advanced.
+    """
+    terms = list(advanced)
+    if min_start_date:
+        terms.append(f"AREA[StartDate]RANGE[{min_start_date},MAX]")
+    queries = []
+    for country in countries:
+        params = {
+            "query.cond": f"{AI_DIAGNOSTIC_QUERY} AND {country}",
+            "query.loc": country,
+            "filter.overallStatus": SEARCH_STATUSES,
+        }
+        if terms:
+            params["filter.advanced"] = " AND ".join(terms)
+        queries.append(params)
+    return queries
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RegistryClient:
+    """Pooled, rate-limited ClinicalTrials.gov v2 client
+
+    Use as an async context manager. rate_limit is in requests per minute
+    (None disables the bucket).
+    """
+
+    def __init__(
+        self,
+        base_url,
+        rate_limit=None,
+        concurrency=8,
+        page_size=100,
+        max_retries=5,
+        timeout=30,
+    ):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.bucket = (
+            TokenBucket(rate_limit / 60.0, capacity=max(1, concurrency))
+            if rate_limit
+            else None
+        )
+        self.stats = {"requests": 0, "retries": 0, "pages": 0, "studies": 0}
+        # Queries stopped by max_pages with result pages still left
+        self.truncated = []
+        self._slots = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    async def fetch_page(self, params):
+        """One page of results, retried on throttling and transient errors"""
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                await self.bucket.acquire()
+            self.stats["requests"] += 1
+            delay = None
+            try:
+                async with self._slots:
+                    async with self._session.get(self.base_url, params=params) as r:
+                        if r.status == 200:
+                            return await r.json(content_type=None)
+                        if r.status not in RETRY_STATUSES:
+                            raise RegistryFetchError(
+                                f"HTTP {r.status} for {self.base_url}: "
+                                f"{(await r.text())[:200]}"
+                            )
+                        retry_after = r.headers.get("Retry-After", "")
+                        if retry_after.isdigit():
+                            delay = float(retry_after)
+                        error = f"HTTP {r.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt == self.max_retries:
+                break
+            self.stats["retries"] += 1
+            if delay is None:
+                delay = min(60.0, 0.5 * 2**attempt) * (0.5 + random.random())
+            await asyncio.sleep(delay)
+        raise RegistryFetchError(
+            f"{error} after {self.max_retries + 1} attempts ({params.get('query.loc', '')})"
+        )
+
+    async def iter_studies(self, params, max_pages=None):
+        """Studies of one search, following nextPageToken
+
+        A search cut short by max_pages while a page token is still left is
+        recorded in self.truncated.
+        """
+        query = params
+        params = {**params, "pageSize": self.page_size, "format": "json"}
+        pages = 0
+        while True:
+            data = await self.fetch_page(params)
+            pages += 1
+            self.stats["pages"] += 1
+            for study in data.get("studies", []):
+                self.stats["studies"] += 1
+                yield study
+            token = data.get("nextPageToken")
+            if not token:
+                return
+            if max_pages and pages >= max_pages:
+                self.truncated.append(query)
+                return
+            params = {**params, "pageToken": token}
+
+    async def fetch_all(self, queries, sink, max_pages=None):
+        """Run every query concurrently, passing each study to sink(study)
+
+        Returns a list of (query, error) pairs for queries that failed; the
+        others are unaffected.
+        """
+
+        async def run(params):
+            try:
+                async for study in self.iter_studies(params, max_pages):
+                    sink(study)
+            except RegistryFetchError as e:
+                return params, str(e)
+            return None
+
+        results = await asyncio.gather(*(run(q) for q in queries))
+        return [r for r in results if r is not None]
+
+
+def _get(data, *keys, default=None):
+    for key in keys:
+        if not isinstance(data, dict) or key not in data:
+            return default
+        data = data[key]
+    return data
+
+
+def _outcomes(items):
+    return "|".join(
+        ", ".join(
+            part
+            for part in (o.get("measure"), o.get("description"), o.get("timeFrame"))
+            if part
+        )
+        for o in items or []
+    )
+
+
+def study_to_raw(study):
+    """One v2 study record as a row of the raw CSV layout"""
+    p = study.get("protocolSection", {})
+    ident = p.get("identificationModule", {})
+    status = p.get("statusModule", {})
+    design = p.get("designModule", {})
+    sponsors = p.get("sponsorCollaboratorsModule", {})
+    outcomes = p.get("outcomesModule", {})
+    nct = ident.get("nctId", "")
+
+    info = design.get("designInfo", {})
+    if design.get("studyType") == "OBSERVATIONAL":
+        study_design = (
+            f"Observational Model: {info.get('observationalModel', '')}"
+            f"|Time Perspective: {info.get('timePerspective', '')}"
+        )
+    elif info:
+        study_design = "|".join(
+            [
+                f"Allocation: {info.get('allocation', '')}",
+                f"Intervention Model: {info.get('interventionModel', '')}",
+                f"Masking: {_get(info, 'maskingInfo', 'masking', default='')}",
+                f"Primary Purpose: {info.get('primaryPurpose', '')}",
+            ]
+        )
+    else:
+        study_design = ""
+
+    other_ids = [_get(ident, "orgStudyIdInfo", "id")] + [
+        s.get("id") for s in ident.get("secondaryIdInfos", [])
+    ]
+    locations = [
+        ", ".join(
+            str(loc[k])
+            for k in ("facility", "city", "state", "zip", "country")
+            if loc.get(k)
+        )
+        for loc in _get(p, "contactsLocationsModule", "locations", default=[])
+    ]
+    documents = [
+        f"{doc.get('label', '')}, https://cdn.clinicaltrials.gov/large-docs/"
+        f"{nct[-2:]}/{nct}/{doc.get('filename', '')}"
+        for doc in _get(
+            study, "documentSection", "largeDocumentModule", "largeDocs", default=[]
+        )
+    ]
+    enrollment = _get(design, "enrollmentInfo", "count")
+    return {
+        "NCT Number": nct,
+        "Study Title": ident.get("briefTitle", ""),
+        "Study URL": f"https://clinicaltrials.gov/study/{nct}",
+        "Acronym": ident.get("acronym", ""),
+        "Study Status": status.get("overallStatus", ""),
+        "Brief Summary": _get(p, "descriptionModule", "briefSummary", default=""),
+        "Study Results": "YES" if study.get("hasResults") else "NO",
+        "Conditions": "|".join(_get(p, "conditionsModule", "conditions", default=[])),
+        "Interventions": "|".join(
+            f"{i.get('type', '')}: {i.get('name', '')}"
+            for i in _get(p, "armsInterventionsModule", "interventions", default=[])
+        ),
+        "Primary Outcome Measures": _outcomes(outcomes.get("primaryOutcomes")),
+        "Secondary Outcome Measures": _outcomes(outcomes.get("secondaryOutcomes")),
+        "Other Outcome Measures": _outcomes(outcomes.get("otherOutcomes")),
+        "Sponsor": _get(sponsors, "leadSponsor", "name", default=""),
+        "Collaborators": "|".join(
+            c.get("name", "") for c in sponsors.get("collaborators", [])
+        ),
+        "Sex": _get(p, "eligibilityModule", "sex", default=""),
+        "Age": ", ".join(_get(p, "eligibilityModule", "stdAges", default=[])),
+        "Phases": "|".join(ph for ph in design.get("phases", []) if ph != "NA"),
+        "Enrollment": "" if enrollment is None else str(enrollment),
+        "Funder Type": _get(sponsors, "leadSponsor", "class", default=""),
+        "Study Type": design.get("studyType", ""),
+        "Study Design": study_design,
+        "Other IDs": "|".join(i for i in other_ids if i),
+        "Start Date": _get(status, "startDateStruct", "date", default=""),
+        "Primary Completion Date": _get(
+            status, "primaryCompletionDateStruct", "date", default=""
+        ),
+        "Completion Date": _get(status, "completionDateStruct", "date", default=""),
+        "First Posted": _get(status, "studyFirstPostDateStruct", "date", default=""),
+        "Results First Posted": _get(
+            status, "resultsFirstPostDateStruct", "date", default=""
+        ),
+        "Last Update Posted": _get(
+            status, "lastUpdatePostDateStruct", "date", default=""
+        ),
+        "Locations": "|".join(locations),
+        "Study Documents": "|".join(documents),
+    }
+
+
+def write_raw_record(row, output_dir):
+    """Write one study as data/raw-style `<NCT Number>.csv`"""
+    path = Path(output_dir) / f"{row['NCT Number']}.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RAW_FIELDS)
+        writer.writeheader()
+        writer.writerow(row)
+    return path
+
+
+async def fetch_to_raw(
+    queries,
+    output_dir,
+    base_url,
+    rate_limit=None,
+    concurrency=8,
+    page_size=100,
+    max_pages=None,
+    cursor=None,
+):
+    """Fetch every query and write each distinct study once
+
+    With a sync cursor (registry_sync.SyncCursor) records whose content is
+    unchanged since the last sync are not rewritten. Returns a summary dict
+    with request, study and throughput counts, the failed queries and the
+    queries truncated by max_pages.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    seen = set()
+    written = 0
+
+    def sink(study):
+        nonlocal written
+        row = study_to_raw(study)
+        if not row["NCT Number"] or row["NCT Number"] in seen:
+            return
+        seen.add(row["NCT Number"])
+        if cursor is None or cursor.accept(row):
+            write_raw_record(row, output_dir)
+            written += 1
+
+    start = time.perf_counter()
+    async with RegistryClient(
+        base_url, rate_limit, concurrency=concurrency, page_size=page_size
+    ) as client:
+        failed = await client.fetch_all(queries, sink, max_pages=max_pages)
+    elapsed = time.perf_counter() - start
+    return {
+        **client.stats,
+        "distinct": len(seen),
+        "written": written,
+        "failed": failed,
+        "truncated": client.truncated,
+        "seconds": elapsed,
+        "studies_per_second": client.stats["studies"] / elapsed if elapsed else 0.0,
+    }
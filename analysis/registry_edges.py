@@ -0,0 +1,173 @@
+"""
+Typed trial–institution edges from raw registry records
+
+Turns the ClinicalTrials.gov export fields `Sponsor`, `Collaborators`
+(pipe-separated) and `Locations` (pipe-separated "Facility, City, ...,
+Country") into `sponsor`, `collaboration` and `site` edges.
+
+All tokenizing and normalization runs as pandas string operations over the
+whole table. Names are resolved against a hash index (dict) of normalized
+institution names, built once from the institution table with extra keys for
+bracketed acronyms and names without them; keys claimed by more than one
+institution are dropped rather than guessed. Names that do not resolve are
+collected and returned together, one row per distinct name.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+RAW_COLUMNS = ["NCT Number", "Sponsor", "Collaborators", "Locations"]
+
+# Facility names can contain commas ("University of California, San
+# Francisco"); location prefixes up to this many comma-separated parts are
+# tried, longest match first
+MAX_FACILITY_PARTS = 3
+
+
+def normalize_names(names):
+    """Lower-case ASCII names with punctuation and extra whitespace removed
+
+    Registry names repeat heavily, so only distinct values are normalized.
+    """
+    names = pd.Series(names, dtype="string")
+    codes, uniques = pd.factorize(names)
+    keys = _normalize(pd.Series(uniques, dtype="string")).to_numpy()
+    result = pd.Series(pd.NA, index=names.index, dtype="string")
+    found = codes >= 0
+    result[found] = keys[codes[found]]
+    return result
+
+
+def _normalize(names):
+    return (
+        names.str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace("&", " and ", regex=False)
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def build_name_index(institutions):
+    """Hash index from normalized name keys to institution_id
+
+    Each institution is indexed under its full name, the name without a
+    bracketed part and the bracketed acronym itself ("National Cancer
+    Institute (NCI)" -> three keys). Ambiguous keys are left out.
+    """
+    names = institutions["institution_name"]
+    ids = institutions["institution_id"].to_numpy()
+    bracket = names.str.extract(r"\(([^)]+)\)\s*$", expand=False)
+    keys = pd.concat(
+        [
+            pd.DataFrame({"key": normalize_names(names), "id": ids}),
+            pd.DataFrame(
+                {
+                    "key": normalize_names(
+                        names.str.replace(r"\s*\([^)]*\)\s*$", "", regex=True)
+                    ),
+                    "id": ids,
+                }
+            ),
+            pd.DataFrame({"key": normalize_names(bracket), "id": ids}),
+        ]
+    ).dropna()
+    keys = keys[keys["key"] != ""].drop_duplicates()
+    unique = keys.groupby("key")["id"].transform("nunique") == 1
+    return dict(zip(keys.loc[unique, "key"], keys.loc[unique, "id"]))
+
+
+def load_raw_records(raw_dir):
+    """Concatenate raw registry exports that carry the edge fields
+
+    Returns (records, skipped file names).
+    """
+    frames, skipped = [], []
+    for path in sorted(Path(raw_dir).glob("*.csv")):
+        frame = pd.read_csv(path, dtype=str)
+        if set(RAW_COLUMNS) <= set(frame.columns):
+            frames.append(frame)
+        else:
+            skipped.append(path.name)
+    records = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return records, skipped
+
+
+def _tokens(records, column, role):
+    """One row per (trial, name) from a pipe-separated field"""
+    tokens = (
+        records[["NCT Number", column]]
+        .rename(columns={"NCT Number": "trial_id", column: "source_name"})
+        .assign(source_name=lambda d: d["source_name"].str.split("|"))
+        .explode("source_name")
+    )
+    tokens["source_name"] = tokens["source_name"].str.strip()
+    tokens = tokens[tokens["source_name"].fillna("") != ""]
+    return tokens.assign(relationship_type=role)
+
+
+def _resolve_sites(sites, index):
+    """Longest facility prefix of each location that is in the index"""
+    codes, locations = pd.factorize(sites["source_name"])
+    name = pd.Series(locations, dtype="string")
+    resolved = pd.Series(pd.NA, index=name.index, dtype="object")
+    for parts in range(MAX_FACILITY_PARTS, 0, -1):
+        prefix = name.str.extract(
+            r"^(" + r",".join([r"[^,]+"] * parts) + r")", expand=False
+        )
+        hit = normalize_names(prefix).map(index)
+        resolved = resolved.fillna(hit)
+    facility = name.str.extract(r"^([^,]+)", expand=False).str.strip()
+    return resolved.to_numpy()[codes], facility.to_numpy()[codes]
+
+
+def extract_edges(records, institutions):
+    """Typed edges and unresolved names for any number of raw records
+
+    Returns (edges, unresolved). edges has trial_id, institution_id,
+    relationship_type (sponsor/collaboration/site) and source_name;
+    unresolved has one row per distinct normalized name with its roles,
+    occurrence count and trials.
+    """
+    index = build_name_index(institutions)
+    parts = [
+        _tokens(records, "Sponsor", "sponsor"),
+        _tokens(records, "Collaborators", "collaboration"),
+    ]
+    named = pd.concat(parts, ignore_index=True)
+    named["institution_id"] = normalize_names(named["source_name"]).map(index)
+
+    sites = _tokens(records, "Locations", "site").reset_index(drop=True)
+    sites["institution_id"], facility = _resolve_sites(sites, index)
+    # Unresolved sites are reported by facility, not the full address
+    unmatched = sites["institution_id"].isna()
+    sites.loc[unmatched, "source_name"] = facility[unmatched.to_numpy()]
+
+    tokens = pd.concat([named, sites], ignore_index=True)
+    found = tokens["institution_id"].notna()
+
+    edges = (
+        tokens.loc[found, ["trial_id", "institution_id", "relationship_type"]]
+        .assign(source_name=tokens.loc[found, "source_name"])
+        .drop_duplicates(["trial_id", "institution_id", "relationship_type"])
+        .sort_values(["trial_id", "relationship_type", "institution_id"])
+        .reset_index(drop=True)
+    )
+
+    missing = tokens.loc[~found].assign(key=lambda d: normalize_names(d["source_name"]))
+    unresolved = (
+        missing.groupby("key", sort=False)
+        .agg(
+            name=("source_name", "first"),
+            roles=("relationship_type", lambda s: ";".join(sorted(set(s)))),
+            occurrences=("trial_id", "size"),
+            trials=("trial_id", lambda s: ";".join(sorted(set(s)))),
+        )
+        .reset_index(drop=True)
+        .sort_values(["occurrences", "name"], ascending=[False, True])
+        .reset_index(drop=True)
+    )
+    return edges, unresolved
@@ -0,0 +1,151 @@
+"""
+Local stand-in for the ClinicalTrials.gov v2 studies endpoint
+Serves deterministic synthetic studies so the fetch client can be exercised
+and benchmarked offline
+
+Supports the parameters the client sends: query.loc (country), pageSize,
+pageToken and filter.advanced ranges on LastUpdatePostDate / StartDate.
+Optional per-request latency and injected 429 responses (with Retry-After)
+exercise pooling, concurrency and the retry path.
+"""
+
+import asyncio
+import random
+import re
+from datetime import date, timedelta
+
+from aiohttp import web
+from registry_client import SUB_SAHARAN_AFRICA
+
+RANGE = re.compile(r"AREA\[(\w+)\]RANGE\[([^,\]]+),([^\]]+)\]")
+REVISED_FRACTION = 0.05
+
+
+def synthetic_study(i, seed=0, revision=0):
+    """A v2-shaped study record; study i is fully determined by (i, seed)
+
+    revision > 0 simulates later registry states: in each revision about
+    REVISED_FRACTION of the studies are edited and posted as updated today.
+    """
+    rng = random.Random(seed * 1_000_003 + i)
+    nct = f"NCT{90_000_000 + i:08d}"
+    countries = rng.sample(SUB_SAHARAN_AFRICA, rng.choice([1, 1, 1, 2, 3]))
+    start = date(2018, 1, 1) + timedelta(days=rng.randrange(2500))
+    updated = start + timedelta(days=rng.randrange(1, 900))
+    title = f"AI-assisted screening study {i}"
+    for r in range(1, revision + 1):
+        if random.Random(f"{seed}:{i}:{r}").random() < REVISED_FRACTION:
+            updated = date.today()
+            title = f"AI-assisted screening study {i} (revision {r})"
+    return {
+        "protocolSection": {
+            "identificationModule": {
+                "nctId": nct,
+                "briefTitle": title,
+                "orgStudyIdInfo": {"id": f"ORG-{i}"},
+            },
+            "statusModule": {
+                "overallStatus": rng.choice(["RECRUITING", "COMPLETED"]),
+                "startDateStruct": {"date": start.isoformat()},
+                "studyFirstPostDateStruct": {"date": start.isoformat()},
+                "lastUpdatePostDateStruct": {"date": updated.isoformat()},
+            },
+            "sponsorCollaboratorsModule": {
+                "leadSponsor": {"name": f"Sponsor {i % 97}", "class": "OTHER"},
+                "collaborators": [
+                    {"name": f"Partner {rng.randrange(200)}"}
+                    for _ in range(rng.randrange(3))
+                ],
+            },
+            "descriptionModule": {
+                "briefSummary": "Deep learning analysis of chest radiographs "
+                "for tuberculosis screening."
+            },
+            "conditionsModule": {"conditions": ["Tuberculosis"]},
+            "designModule": {
+                "studyType": "INTERVENTIONAL",
+                "phases": ["NA"],
+                "enrollmentInfo": {"count": rng.randrange(50, 5000)},
+                "designInfo": {
+                    "allocation": "NA",
+                    "interventionModel": "SINGLE_GROUP",
+                    "primaryPurpose": "DIAGNOSTIC",
+                    "maskingInfo": {"masking": "NONE"},
+                },
+            },
+            "armsInterventionsModule": {
+                "interventions": [{"type": "DEVICE", "name": "CAD software"}]
+            },
+            "contactsLocationsModule": {
+                "locations": [
+                    {"facility": f"Site {i}-{k}", "city": "City", "country": c}
+                    for k, c in enumerate(countries)
+                ]
+            },
+        },
+        "hasResults": False,
+    }
+
+
+def _matches(study, filters):
+    status = study["protocolSection"]["statusModule"]
+    fields = {
+        "LastUpdatePostDate": status["lastUpdatePostDateStruct"]["date"],
+        "StartDate": status["startDateStruct"]["date"],
+    }
+    for area, low, high in filters:
+        value = fields.get(area)
+        if value is None:
+            continue
+        if low != "MIN" and value < low:
+            return False
+        if high != "MAX" and value > high:
+            return False
+    return True
+
+
+def create_app(n_studies, seed=0, revision=0, latency=0.0, throttle_every=0):
+    """aiohttp application serving n_studies at /api/v2/studies
+
+    throttle_every > 0 answers about one request in throttle_every with 429
+    and Retry-After: 0 (at random, so no query is singled out).
+    """
+    studies = [synthetic_study(i, seed, revision) for i in range(n_studies)]
+    by_country = {}
+    for study in studies:
+        for loc in study["protocolSection"]["contactsLocationsModule"]["locations"]:
+            by_country.setdefault(loc["country"], []).append(study)
+    counter = {"requests": 0}
+    throttle = random.Random(seed)
+
+    async def handle(request):
+        counter["requests"] += 1
+        if throttle_every and throttle.random() < 1 / throttle_every:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if latency:
+            await asyncio.sleep(latency)
+        q = request.query
+        pool = by_country.get(q["query.loc"], []) if "query.loc" in q else studies
+        filters = RANGE.findall(q.get("filter.advanced", ""))
+        if filters:
+            pool = [s for s in pool if _matches(s, filters)]
+        size = int(q.get("pageSize", 10))
+        offset = int(q.get("pageToken", 0))
+        body = {"studies": pool[offset : offset + size]}
+        if offset + size < len(pool):
+            body["nextPageToken"] = str(offset + size)
+        return web.json_response(body)
+
+    app = web.Application()
+    app.router.add_get("/api/v2/studies", handle)
+    app["counter"] = counter
+    return app
+
+
+async def start_stub(app, host="127.0.0.1", port=0):
+    """Start the app; returns (runner, studies endpoint URL)"""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}/api/v2/studies"
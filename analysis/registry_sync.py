@@ -0,0 +1,98 @@
+"""
+Incremental registry sync cursor
+Per-study `Last Update Posted` and content hash, plus the date of the last
+complete sync
+
+A sync asks the registry only for studies whose LastUpdatePostDate is on or
+after the last complete sync (inclusive, because the API dates have day
+resolution) and skips any returned record whose content hash matches the
+cursor, so a daily run transfers and writes only the delta. The watermark is
+advanced only when every query succeeded and was read to its last page (not
+cut short by --max-pages); per-study entries are saved either way.
+"""
+
+import csv
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from registry_client import RAW_FIELDS
+
+CURSOR_NAME = ".registry-cursor.json"
+
+
+def content_hash(row):
+    """SHA-256 of a raw record's field values in column order"""
+    h = hashlib.sha256()
+    for field in RAW_FIELDS:
+        h.update((row.get(field) or "").encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+class SyncCursor:
+    """Per-study sync state stored as JSON next to the raw records"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.synced_through = None
+        self.studies = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.synced_through = data.get("synced_through")
+            self.studies = data.get("studies", {})
+        self.started = datetime.now(timezone.utc).date().isoformat()
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0}
+
+    @classmethod
+    def from_raw_dir(cls, raw_dir, path=None):
+        """Cursor seeded from the raw records already on disk
+
+        No watermark is set, so the first sync is a full one; unchanged
+        records are still skipped by hash.
+        """
+        cursor = cls(path or Path(raw_dir) / CURSOR_NAME)
+        for record in sorted(Path(raw_dir).glob("*.csv")):
+            with open(record, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            if len(rows) == 1 and rows[0].get("NCT Number"):
+                cursor._store(rows[0])
+        return cursor
+
+    def advanced_filter(self):
+        """filter.advanced terms restricting a search to the delta"""
+        if not self.synced_through:
+            return []
+        return [f"AREA[LastUpdatePostDate]RANGE[{self.synced_through},MAX]"]
+
+    def _store(self, row):
+        self.studies[row["NCT Number"]] = {
+            "last_update": row.get("Last Update Posted", ""),
+            "hash": content_hash(row),
+        }
+
+    def accept(self, row):
+        """True (and the cursor updated) if the record is new or changed"""
+        entry = self.studies.get(row["NCT Number"])
+        if entry and entry["hash"] == content_hash(row):
+            self.counts["unchanged"] += 1
+            return False
+        self.counts["changed" if entry else "new"] += 1
+        self._store(row)
+        return True
+
+    def save(self, complete=True):
+        """Write the cursor; the watermark moves only after a complete sync"""
+        if complete:
+            self.synced_through = self.started
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"synced_through": self.synced_through, "studies": self.studies},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        tmp.replace(self.path)
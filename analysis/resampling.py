@@ -0,0 +1,165 @@
+"""
+Resampling tests for Spearman correlations among centrality measures
+Permutation p-values and bootstrap confidence intervals, batched in NumPy
+
+The centrality matrix is rank-transformed once; Spearman's rho is then the
+Pearson correlation of the standardized ranks, so a batch of permutation
+replicates is a single matrix product. Ranks are invariant under permutation,
+so the permutation test reuses them directly. Bootstrap resamples duplicate
+rows and change the ties, so each batch is re-ranked (vectorized along the
+replicate axis). Replicates are split into chunks with independent seeds and
+run across worker processes.
+"""
+
+import math
+from itertools import combinations, permutations
+
+import numpy as np
+from parallel import default_workers, parallel_map
+from scipy.stats import rankdata, spearmanr
+
+# Replicates per vectorized batch; bounds memory at BATCH x n floats
+BATCH = 1000
+
+
+def _standardize(ranks, axis=-1):
+    """Center and scale ranks so that a mean product gives Pearson r"""
+    centered = ranks - ranks.mean(axis=axis, keepdims=True)
+    scale = np.sqrt((centered**2).mean(axis=axis, keepdims=True))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return centered / scale
+
+
+def _permutation_chunk(args):
+    x, y, n_reps, seed, exact = args
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    if exact:
+        perms = np.array(list(permutations(range(n))))
+        return (y[perms] @ x) / n
+    rhos = []
+    done = 0
+    while done < n_reps:
+        size = min(BATCH, n_reps - done)
+        idx = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        rhos.append((y[idx] @ x) / n)
+        done += size
+    return np.concatenate(rhos) if rhos else np.empty(0)
+
+
+def _bootstrap_chunk(args):
+    a, b, n_reps, seed = args
+    rng = np.random.default_rng(seed)
+    n = len(a)
+    rhos = []
+    done = 0
+    while done < n_reps:
+        size = min(BATCH, n_reps - done)
+        idx = rng.integers(0, n, size=(size, n))
+        ra = _standardize(rankdata(a[idx], axis=1))
+        rb = _standardize(rankdata(b[idx], axis=1))
+        rhos.append((ra * rb).mean(axis=1))
+        done += size
+    return np.concatenate(rhos) if rhos else np.empty(0)
+
+
+def _split(total, parts):
+    base, extra = divmod(total, parts)
+    return [base + (i < extra) for i in range(parts)]
+
+
+def correlation_tests(
+    data,
+    columns,
+    n_permutations=9999,
+    n_bootstrap=9999,
+    confidence=0.95,
+    seed=42,
+    workers=None,
+):
+    """Spearman rho with permutation p-values and bootstrap CIs for all pairs
+
+    data is a DataFrame holding the centrality columns. Returns one dict per
+    column pair with rho, the asymptotic p-value, the two-sided permutation
+    p-value ((hits + 1) / (reps + 1), or the exact enumeration when n! does not
+    exceed n_permutations) and the percentile bootstrap interval. Pairs with a
+    constant column yield NaN.
+    """
+    values = data[list(columns)].to_numpy(dtype=float)
+    n = len(values)
+    workers = workers or default_workers()
+    ranks = _standardize(rankdata(values, axis=0), axis=0)
+    exact = n < 13 and math.factorial(n) <= n_permutations
+
+    pairs = [
+        (i, j)
+        for i, j in combinations(range(len(columns)), 2)
+        if np.isfinite(ranks[:, i]).all() and np.isfinite(ranks[:, j]).all()
+    ]
+
+    # One pool pass for every pair's permutation and bootstrap chunks
+    seeds = iter(np.random.SeedSequence(seed).spawn(2 * len(pairs) * workers))
+    perm_jobs, boot_jobs = [], []
+    for i, j in pairs:
+        for reps in _split(0 if exact else n_permutations, workers):
+            perm_jobs.append((ranks[:, i], ranks[:, j], reps, next(seeds), False))
+        for reps in _split(n_bootstrap, workers):
+            boot_jobs.append((values[:, i], values[:, j], reps, next(seeds)))
+    perm_out = parallel_map(_permutation_chunk, perm_jobs, workers)
+    boot_out = parallel_map(_bootstrap_chunk, boot_jobs, workers)
+
+    alpha = (1 - confidence) / 2
+    results = []
+    for i, j in combinations(range(len(columns)), 2):
+        row = {
+            "Measure_1": columns[i],
+            "Measure_2": columns[j],
+            "rho": np.nan,
+            "ci_lower": np.nan,
+            "ci_upper": np.nan,
+            "p_asymptotic": np.nan,
+            "p_permutation": np.nan,
+            "n_permutations": 0,
+            "n_bootstrap": 0,
+        }
+        if (i, j) not in pairs:
+            results.append(row)
+            continue
+
+        k = pairs.index((i, j))
+        x, y = ranks[:, i], ranks[:, j]
+        rho = float((x @ y) / n)
+        _, p_asym = spearmanr(values[:, i], values[:, j])
+
+        if exact:
+            null = _permutation_chunk((x, y, 0, None, True))
+        else:
+            null = np.concatenate(perm_out[k * workers : (k + 1) * workers])
+        hits = int(np.sum(np.abs(null) >= abs(rho) - 1e-12))
+        p_perm = hits / len(null) if exact else (hits + 1) / (len(null) + 1)
+
+        boot = np.concatenate(boot_out[k * workers : (k + 1) * workers])
+        # Resamples where one measure is constant have no defined rho
+        boot = boot[np.isfinite(boot)]
+        if len(boot):
+            row["ci_lower"], row["ci_upper"] = np.quantile(boot, [alpha, 1 - alpha])
+
+        row.update(
+            rho=rho,
+            p_asymptotic=float(p_asym),
+            p_permutation=p_perm,
+            n_permutations=len(null),
+            n_bootstrap=len(boot),
+        )
+        results.append(row)
+    return results
+
+
+def format_p(p, n_reps):
+    """Report a p-value, bounded by the resolution of the resampling test"""
+    if not np.isfinite(p):
+        return "p = NA"
+    floor = 1 / (n_reps + 1)
+    if p <= floor:
+        return f"p ≤ {floor:.1g}" if floor < 0.001 else f"p ≤ {floor:.4f}"
+    return f"p = {p:.3f}" if p >= 0.001 else f"p = {p:.1e}"
@@ -0,0 +1,182 @@
+"""
+Network robustness under node removal
+Largest-component curves for targeted (degree, betweenness, sector) and
+random removal of institutions from the co-participation network
+
+A removal order is evaluated in reverse: starting from an empty network the
+institutions are inserted from the last removed to the first, each joined to
+its already inserted neighbours with a union-find, and the largest component
+after every insertion is the largest component before the matching removal.
+A full curve costs one pass over the edges instead of a connected-components
+call per step. Targeted orders rank institutions once on the intact network.
+Random orders are split across forked workers that share the CSR arrays.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from parallel import default_workers, parallel_map
+from weighted_network import projection_weights, to_csr
+
+STRATEGIES = ("degree", "betweenness", "sector", "random")
+
+# Adjacency lists (indptr, indices) shared with the forked workers
+_ADJACENCY = None
+
+
+def institution_graph(institutions, edges):
+    """Co-participation projection over all institutions (isolates kept)"""
+    members = edges.groupby("trial_id")["institution_id"].apply(list).to_dict()
+    G = nx.Graph()
+    for row in institutions.itertuples(index=False):
+        G.add_node(
+            row.institution_id,
+            name=row.institution_name,
+            sector=row.sector,
+            country=row.country,
+        )
+    G.add_edges_from(projection_weights(members, "count"))
+    return G
+
+
+def targeted_order(G, strategy, sector=None):
+    """Nodes in removal order, highest score first (ties keep node order)
+
+    The sector strategy removes the institutions of `sector` first, by
+    degree, then the rest by degree.
+    """
+    degree = dict(G.degree())
+    if strategy == "degree":
+        key = lambda n: -degree[n]
+    elif strategy == "betweenness":
+        betweenness = nx.betweenness_centrality(G)
+        key = lambda n: (-betweenness[n], -degree[n])
+    elif strategy == "sector":
+        key = lambda n: (G.nodes[n]["sector"] != sector, -degree[n])
+    else:
+        raise ValueError(f"Unknown targeted strategy '{strategy}'")
+    return sorted(G.nodes(), key=key)
+
+
+def largest_component_curve(order, indptr, indices):
+    """curve[k] = largest component size after removing order[:k]
+
+    order holds node indexes; indptr/indices are the adjacency lists.
+    """
+    n = len(order)
+    parent = [-1] * n  # -1: not inserted yet
+    size = [0] * n
+    curve = [0] * (n + 1)
+    largest = 0
+    for k in range(n - 1, -1, -1):
+        v = order[k]
+        parent[v] = v
+        size[v] = 1
+        root = v
+        for u in indices[indptr[v] : indptr[v + 1]]:
+            if parent[u] < 0:
+                continue
+            while parent[u] != u:
+                parent[u] = parent[parent[u]]
+                u = parent[u]
+            if u == root:
+                continue
+            if size[u] > size[root]:
+                root, u = u, root
+            parent[u] = root
+            size[root] += size[u]
+        if size[root] > largest:
+            largest = size[root]
+        curve[k] = largest
+    return curve
+
+
+def _random_curves(job):
+    seed, count = job
+    indptr, indices = _ADJACENCY
+    rng = np.random.default_rng(seed)
+    n = len(indptr) - 1
+    return np.array(
+        [
+            largest_component_curve(rng.permutation(n).tolist(), indptr, indices)
+            for _ in range(count)
+        ]
+    )
+
+
+def random_curves(G, orders, seed=42, workers=None):
+    """(orders x nodes+1) largest-component curves for random removal orders"""
+    global _ADJACENCY
+    _, indptr, indices, _ = to_csr(G)
+    workers = workers or default_workers()
+    chunks = min(orders, workers * 4)
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+    jobs = [(s, orders // chunks + (i < orders % chunks)) for i, s in enumerate(seeds)]
+    _ADJACENCY = (indptr.tolist(), indices.tolist())
+    try:
+        return np.vstack(parallel_map(_random_curves, jobs, workers))
+    finally:
+        _ADJACENCY = None
+
+
+def robustness_index(curve, n):
+    """Schneider et al. R: mean largest-component share over all removals"""
+    return float(np.sum(curve[1:]) / (n * n))
+
+
+def robustness_curves(
+    G, strategies=STRATEGIES, sector="Funder", orders=1000, seed=42, workers=None
+):
+    """Removal curves and a per-strategy summary
+
+    curves has one row per strategy and number of removed institutions, with
+    the largest component as a share of all institutions (for random removal
+    the mean with a 95% percentile band over the orders). summary has the
+    robustness index R, the share removed before the largest component drops
+    below half its intact size, and the first institutions removed.
+    """
+    nodes, indptr, indices, _ = to_csr(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    adjacency = (indptr.tolist(), indices.tolist())
+    removed = np.arange(n + 1)
+
+    curves, summary = [], []
+    for strategy in strategies:
+        if strategy == "random":
+            sampled = random_curves(G, orders, seed, workers)
+            curve = sampled.mean(axis=0)
+            low, high = np.percentile(sampled, [2.5, 97.5], axis=0)
+            first = ""
+        else:
+            order = targeted_order(G, strategy, sector)
+            curve = np.array(
+                largest_component_curve([index[v] for v in order], *adjacency)
+            )
+            low = high = curve
+            first = "; ".join(G.nodes[v]["name"] for v in order[:3])
+        label = f"sector:{sector}" if strategy == "sector" else strategy
+        curves.append(
+            pd.DataFrame(
+                {
+                    "strategy": label,
+                    "removed": removed,
+                    "fraction_removed": removed / n,
+                    "largest_component": curve,
+                    "largest_component_fraction": curve / n,
+                    "lower": low / n,
+                    "upper": high / n,
+                }
+            )
+        )
+        halved = np.flatnonzero(curve < curve[0] / 2)
+        summary.append(
+            {
+                "strategy": label,
+                "orders": orders if strategy == "random" else 1,
+                "robustness_index": robustness_index(curve, n),
+                "critical_fraction": halved[0] / n if len(halved) else np.nan,
+                "first_removed": first,
+            }
+        )
+    return pd.concat(curves, ignore_index=True), pd.DataFrame(summary)
@@ -36,6 +36,7 @@ def main():
     scripts = [
         "analysis/01_calculate_centrality.py",
         "analysis/02_visualize_geographic_temporal.py",
+        "analysis/03_network_robustness.py",
     ]
 
     print("=" * 70)
@@ -0,0 +1,268 @@
+"""
+Keyword screening of registry records against the protocol criteria
+AI technology terms, diagnostic terms and Sub-Saharan African countries
+
+All terms (and country aliases) are compiled into one Aho–Corasick automaton
+that is built once. Text and patterns are reduced to lower-case ASCII words
+separated by single-character spaces (a length-preserving byte translation)
+and every pattern is padded with a space on each side, so the automaton only
+reports whole-word matches. Each screened field is scanned as one joined
+string per chunk of records; the hits come back as integer arrays and the
+remaining rules are applied with NumPy: a match inside a longer match is
+dropped ("Niger" in "Niger State" stays, "Sudan" in "South Sudan" goes), the
+short acronyms (AI, ML, DL) must match in upper case, and non-African names
+that contain a country ("Papua New Guinea") are compiled in as blockers.
+
+A record is flagged when it has an AI term and a diagnostic term in its text
+fields and an African country in its locations, as in
+`isAIDiagnosticTrial()` of web_interface/scripts/registry-monitor-n11.js.
+"""
+
+import ahocorasick
+import numpy as np
+import pandas as pd
+from parallel import parallel_map
+from registry_client import SUB_SAHARAN_AFRICA
+
+SCREEN_FIELDS = ["Brief Summary", "Interventions", "Conditions", "Locations"]
+TEXT_FIELDS = ["Brief Summary", "Interventions", "Conditions"]
+
+# Technology keywords from docs/SUPPLEMENTARY_METHODS.md; acronyms are matched
+# case-sensitively
+AI_TERMS = {
+    "artificial intelligence": "artificial intelligence",
+    "machine learning": "machine learning",
+    "deep learning": "deep learning",
+    "neural network": "neural network",
+    "neural networks": "neural network",
+    "computer vision": "computer vision",
+    "natural language processing": "natural language processing",
+    "AI": "AI",
+    "ML": "ML",
+    "DL": "DL",
+}
+DIAGNOSTIC_TERMS = {
+    "diagnostic": "diagnostic",
+    "diagnostics": "diagnostic",
+    "diagnosis": "diagnosis",
+    "screening": "screening",
+    "detection": "detection",
+    "test": "test",
+    "tests": "test",
+    "testing": "test",
+}
+# Registry spellings of countries in SUB_SAHARAN_AFRICA
+COUNTRY_ALIASES = {
+    "Côte d'Ivoire": "Ivory Coast",
+    "Cote d'Ivoire": "Ivory Coast",
+    "Cote D'Ivoire": "Ivory Coast",
+    "Eswatini": "Swaziland",
+    "Cabo Verde": "Cape Verde",
+    "Congo, The Democratic Republic of the": "Democratic Republic of the Congo",
+    "DR Congo": "Democratic Republic of the Congo",
+    "Republic of the Congo": "Congo",
+    "Tanzania, United Republic of": "Tanzania",
+    "The Gambia": "Gambia",
+}
+# Names containing a listed country that are not that country
+BLOCKERS = ["Papua New Guinea", "Guinea pig", "Guinea pigs", "New Guinea"]
+
+
+# Bytes -> lower-case letters and digits, everything else a space
+WORD_BYTES = bytes(
+    c + 32 if 65 <= c <= 90 else c if 97 <= c <= 122 or 48 <= c <= 57 else 32
+    for c in range(256)
+)
+
+
+def screening_terms():
+    """(pattern, category, term) for every pattern in the automaton"""
+    terms = [(p, "ai", t) for p, t in AI_TERMS.items()]
+    terms += [(p, "diagnostic", t) for p, t in DIAGNOSTIC_TERMS.items()]
+    terms += [(c, "country", c) for c in SUB_SAHARAN_AFRICA]
+    terms += [(p, "country", c) for p, c in COUNTRY_ALIASES.items()]
+    terms += [(p, None, None) for p in BLOCKERS]
+    return terms
+
+
+def _words(text):
+    """Length-preserving reduction of text to lower-case ASCII words"""
+    return text.encode("ascii", "replace").translate(WORD_BYTES).decode("ascii")
+
+
+def _upper_counts(raw):
+    """Running count of upper-case ASCII letters in raw bytes (leading 0)"""
+    codes = np.frombuffer(raw, dtype=np.uint8)
+    counts = np.zeros(len(codes) + 1, dtype=np.int64)
+    np.cumsum((codes >= 65) & (codes <= 90), out=counts[1:])
+    return counts
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over padded, word-normalized patterns
+
+    categories and terms are the distinct labels; scan() reports codes into
+    them. Acronym patterns (upper case, at most three letters) must also match
+    the original text in upper case: upper[p] is the number of letters of
+    pattern p that must be upper case (0 for all other patterns).
+    """
+
+    def __init__(self, terms=None):
+        terms = terms or screening_terms()
+        self.categories = sorted({c for _, c, _ in terms if c})
+        self.terms = sorted({t for _, _, t in terms if t})
+        automaton = ahocorasick.Automaton()
+        length, category, term, upper = [], [], [], []
+        for pattern, cat, label in terms:
+            key = f" {_words(pattern).strip()} "
+            if automaton.exists(key):
+                continue
+            automaton.add_word(key, len(length))
+            length.append(len(key))
+            category.append(self.categories.index(cat) if cat else -1)
+            term.append(self.terms.index(label) if label else -1)
+            acronym = pattern.isupper() and len(pattern) <= 3
+            upper.append(sum(c.isalpha() for c in pattern) if acronym else 0)
+        automaton.make_automaton()
+        self.automaton = automaton
+        self.length = np.array(length)
+        self.category = np.array(category)
+        self.term = np.array(term)
+        self.upper = np.array(upper)
+
+    def scan(self, values):
+        """Matches in a list of strings as (value positions, category codes,
+        term codes)"""
+        values = ["" if v is None or v != v else str(v) for v in values]
+        raw = (" " + "\0".join(values) + " ").encode("ascii", "replace")
+        starts = np.cumsum([1] + [len(v) + 1 for v in values[:-1]])
+        found = np.array(
+            list(self.automaton.iter(raw.translate(WORD_BYTES).decode("ascii"))),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        pattern = found[:, 1]
+        end = found[:, 0]  # the padding space after the match
+        start = end - self.length[pattern] + 2  # the first matched character
+
+        # Leftmost-longest: drop matches contained in an earlier, longer one
+        order = np.lexsort((-end, start))
+        start, end, pattern = start[order], end[order], pattern[order]
+        reach = np.maximum.accumulate(end)
+        keep = np.ones(len(end), dtype=bool)
+        keep[1:] = end[1:] > reach[:-1]
+        keep &= self.category[pattern] >= 0
+        # Acronyms: the matched letters line up with the pattern's, so every
+        # one is upper case when the slice holds as many upper-case letters
+        upper = self.upper[pattern]
+        if upper.any():
+            counts = _upper_counts(raw)
+            span = counts[end] - counts[start]
+            keep &= (upper == 0) | (span == upper)
+        start, pattern = start[keep], pattern[keep]
+
+        positions = np.searchsorted(starts, start, "right") - 1
+        return positions, self.category[pattern], self.term[pattern]
+
+
+_AUTOMATON = None
+
+
+def _screen_chunk(job):
+    global _AUTOMATON
+    if _AUTOMATON is None:
+        _AUTOMATON = KeywordAutomaton()
+    offset, columns = job
+    frames = []
+    for field, values in columns.items():
+        positions, categories, terms = _AUTOMATON.scan(values)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "record": positions + offset,
+                    "field": SCREEN_FIELDS.index(field),
+                    "category": categories,
+                    "term": terms,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def _joined_terms(evidence, mask, labels, n_records):
+    """Distinct term labels per record joined with ';' (NaN where none)
+
+    Each record's terms become a bit mask (a category has fewer than 64
+    terms), so the string is built once per distinct combination.
+    """
+    pairs = evidence.loc[mask, ["record", "term"]].to_numpy()
+    codes, bit = np.unique(pairs[:, 1], return_inverse=True)
+    bits = np.zeros(n_records, dtype=np.uint64)
+    np.bitwise_or.at(
+        bits, pairs[:, 0], np.left_shift(np.uint64(1), bit.astype(np.uint64))
+    )
+    combos, inverse = np.unique(bits, return_inverse=True)
+    names = [
+        ";".join(labels[c] for i, c in enumerate(codes) if int(combo) >> i & 1)
+        or np.nan
+        for combo in combos
+    ]
+    return np.asarray(names, dtype=object)[inverse]
+
+
+def screen_records(records, fields=SCREEN_FIELDS, workers=None, chunk_size=10000):
+    """Screen raw records; returns (screened, evidence)
+
+    screened has one row per record (NCT Number, matched AI and diagnostic
+    terms, countries found in Locations, eligible); evidence has one row per
+    (trial, field, category, term) with the number of hits.
+    """
+    global _AUTOMATON
+    if _AUTOMATON is None:
+        _AUTOMATON = KeywordAutomaton()  # built before the workers fork
+    records = records.reset_index(drop=True)
+    fields = [f for f in fields if f in records.columns]
+    jobs = [
+        (
+            start,
+            {f: records[f].iloc[start : start + chunk_size].tolist() for f in fields},
+        )
+        for start in range(0, len(records), chunk_size)
+    ]
+    found = parallel_map(_screen_chunk, jobs, workers)
+    evidence = pd.concat(
+        found or [pd.DataFrame(columns=["record", "field", "category", "term"])],
+        ignore_index=True,
+    ).astype(np.int64)
+    evidence = (
+        evidence.groupby(["record", "field", "category", "term"], sort=True)
+        .size()
+        .rename("hits")
+        .reset_index()
+    )
+
+    category = _AUTOMATON.categories
+    text = evidence["field"].isin([SCREEN_FIELDS.index(f) for f in TEXT_FIELDS])
+    locations = evidence["field"] == SCREEN_FIELDS.index("Locations")
+    screened = pd.DataFrame({"trial_id": records["NCT Number"]})
+    for column, mask in [
+        ("ai_terms", text & (evidence["category"] == category.index("ai"))),
+        (
+            "diagnostic_terms",
+            text & (evidence["category"] == category.index("diagnostic")),
+        ),
+        ("countries", locations & (evidence["category"] == category.index("country"))),
+    ]:
+        screened[column] = _joined_terms(evidence, mask, _AUTOMATON.terms, len(records))
+    screened["eligible"] = (
+        screened[["ai_terms", "diagnostic_terms", "countries"]].notna().all(axis=1)
+    )
+
+    return screened, pd.DataFrame(
+        {
+            "trial_id": records["NCT Number"].to_numpy()[evidence["record"]],
+            "field": np.asarray(SCREEN_FIELDS)[evidence["field"]],
+            "category": np.asarray(category)[evidence["category"]],
+            "term": np.asarray(_AUTOMATON.terms)[evidence["term"]],
+            "hits": evidence["hits"],
+        }
+    )
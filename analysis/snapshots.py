@@ -0,0 +1,186 @@
+"""
+Versioned result snapshots
+Each pipeline run stores its result tables in one columnar file tagged with
+the fingerprint of its inputs, so any two runs can be compared later
+
+A snapshot is an uncompressed .npz under results/snapshots/ holding one
+array per table column ("table/column") and a JSON metadata entry (input
+fingerprint, parameters, creation time, column dtypes). Loading reads only
+the arrays of the tables asked for. Snapshots are named
+<UTC timestamp>_<fingerprint prefix>, so they sort by run time.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = Path("results/snapshots")
+META_KEY = "__meta__"
+
+
+def input_fingerprint(paths, params=None):
+    """SHA-256 over the input files' contents and the run parameters"""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(Path(path).name.encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        h.update(b"\1")
+    h.update(json.dumps(params or {}, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def write_snapshot(tables, fingerprint, params=None, snapshot_dir=SNAPSHOT_DIR):
+    """Store {name: DataFrame} as a new snapshot; returns its path"""
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    created = datetime.now(timezone.utc)
+    arrays, columns = {}, {}
+    for name, table in tables.items():
+        columns[name] = []
+        for column in table.columns:
+            values = table[column]
+            key = f"{name}/{column}"
+            if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(
+                values
+            ):
+                arrays[key] = values.to_numpy()
+                kind = "numeric"
+            else:
+                missing = values.isna().to_numpy()
+                arrays[key] = values.astype(object).where(~missing, "").to_numpy(str)
+                if missing.any():
+                    arrays[f"{key}/missing"] = missing
+                kind = "string"
+            columns[name].append([column, kind])
+    meta = {
+        "fingerprint": fingerprint,
+        "params": params or {},
+        "created": created.isoformat(timespec="seconds"),
+        "columns": columns,
+    }
+    arrays[META_KEY] = np.array(json.dumps(meta))
+    path = snapshot_dir / f"{created:%Y%m%dT%H%M%SZ}_{fingerprint[:12]}.npz"
+    np.savez(path, **arrays)
+    return path
+
+
+def read_snapshot(path, tables=None):
+    """(metadata, {name: DataFrame}) for the requested tables (default all)"""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data[META_KEY]))
+        result = {}
+        for name, columns in meta["columns"].items():
+            if tables is not None and name not in tables:
+                continue
+            frame = {}
+            for column, kind in columns:
+                key = f"{name}/{column}"
+                values = data[key]
+                if kind == "string":
+                    values = pd.Series(values, dtype=object)
+                    if f"{key}/missing" in data.files:
+                        values[data[f"{key}/missing"]] = np.nan
+                frame[column] = values
+            result[name] = pd.DataFrame(frame)
+    return meta, result
+
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    """Snapshot paths, oldest first"""
+    return sorted(Path(snapshot_dir).glob("*.npz"))
+
+
+def resolve_snapshot(ref, snapshot_dir=SNAPSHOT_DIR):
+    """Snapshot path from a path, a name prefix, a fingerprint prefix or a
+    negative index (-1 is the latest run)"""
+    if Path(ref).is_file():
+        return Path(ref)
+    snapshots = list_snapshots(snapshot_dir)
+    try:
+        return snapshots[int(ref)]
+    except (ValueError, IndexError):
+        pass
+    matches = [
+        p
+        for p in snapshots
+        if p.stem.startswith(ref) or p.stem.split("_", 1)[-1].startswith(ref)
+    ]
+    if not matches:
+        raise FileNotFoundError(f"no snapshot matches {ref!r} in {snapshot_dir}")
+    return matches[-1]
+
+
+def _take(values, positions):
+    """values[positions] with NaN where a position is -1 (key not present)"""
+    values = np.asarray(values)
+    if values.dtype.kind in "biuf":
+        values = values.astype(float)
+    else:
+        values = values.astype(object)
+    result = values[positions]
+    result[positions < 0] = np.nan
+    return result
+
+
+def _rank(values):
+    """Rank by value, 1 = highest; ties share the best rank"""
+    values = np.asarray(values, dtype=float)
+    distinct, inverse, counts = np.unique(
+        -values, return_inverse=True, return_counts=True
+    )
+    ranks = (np.cumsum(counts) - counts + 1).astype(float)[inverse]
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def diff_tables(old, new, key, labels=(), ranked=True):
+    """Outer join of two versions of a table on key
+
+    For every numeric column shared by both versions (identifier columns
+    ending in _id excluded) the result has <column>_old, <column>_new and
+    <column>_delta, and when ranked also <column>_rank_old, _rank_new and
+    _rank_change (positive = moved up). `status` is added, removed or kept.
+    Rows are aligned through hash indexes on key rather than a merge.
+    Returns (result, compared columns).
+    """
+    metrics = [
+        c
+        for c in old.columns
+        if c in new.columns
+        and c != key
+        and not c.endswith("_id")
+        and pd.api.types.is_numeric_dtype(old[c])
+        and pd.api.types.is_numeric_dtype(new[c])
+        and not pd.api.types.is_bool_dtype(old[c])
+    ]
+    old_keys, new_keys = pd.Index(old[key]), pd.Index(new[key])
+    keys = old_keys.append(new_keys).unique()
+    at_old, at_new = old_keys.get_indexer(keys), new_keys.get_indexer(keys)
+
+    result = {key: keys}
+    for label in labels:
+        result[label] = np.where(
+            at_new >= 0, _take(new[label], at_new), _take(old[label], at_old)
+        )
+    result["status"] = np.select(
+        [at_old < 0, at_new < 0], ["added", "removed"], default="kept"
+    )
+    for metric in metrics:
+        before, after = _take(old[metric], at_old), _take(new[metric], at_new)
+        result[f"{metric}_old"] = before
+        result[f"{metric}_new"] = after
+        result[f"{metric}_delta"] = after - before
+        if ranked:
+            rank_old = _take(_rank(old[metric]), at_old)
+            rank_new = _take(_rank(new[metric]), at_new)
+            result[f"{metric}_rank_old"] = rank_old
+            result[f"{metric}_rank_new"] = rank_new
+            result[f"{metric}_rank_change"] = rank_old - rank_new
+    result = pd.DataFrame(result)
+    return result, metrics
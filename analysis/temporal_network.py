@@ -0,0 +1,264 @@
+"""
+Incremental temporal network snapshots
+Grows the trial-institution network in start-date order and emits centrality
+and density time series in a single sweep
+
+Trials are added one at a time (trial node, its institution edges and the
+co-participation edges between its institutions) to one graph that is never
+rebuilt. Connected components are tracked with a union-find. Each node keeps
+its raw betweenness (shortest-path pair counts within its component) and the
+sum of its distances to the rest of the component; snapshots only rescale
+these for the current network size, so a component that gained no edges is
+never rescored.
+
+Most trials reach an existing component through at most one institution
+already in the network. That institution is then a cut vertex between the
+component C and the new nodes H, and every new shortest path is a C-path to
+the cut vertex followed by an H-path from it, so the scores are updated
+exactly from one Brandes pass out of the cut vertex (O(m)) plus the small
+new part. Trials that touch two or more existing institutions (closing
+cycles or merging components) mark the merged component for a full
+rescore at the next snapshot.
+"""
+
+import networkx as nx
+import pandas as pd
+from union_find import UnionFind
+
+
+class TemporalNetwork:
+    """Co-participation network that grows trial by trial"""
+
+    def __init__(self, trials, institutions, edges):
+        self.G = nx.Graph()
+        self.components = UnionFind()
+        self._dirty = set()
+        self._raw_betweenness = {}
+        self._distance_sum = {}
+
+        self._inst_attrs = {
+            row.institution_id: {
+                "node_type": "institution",
+                "name": row.institution_name,
+                "sector": row.sector,
+                "country": row.country,
+            }
+            for row in institutions.itertuples(index=False)
+        }
+        # An institution can have several relationship rows on one trial
+        # (e.g. sponsor and collaborator); it is one member of that trial
+        self._members = edges.groupby("trial_id")["institution_id"].apply(
+            lambda ids: list(dict.fromkeys(ids))
+        )
+
+        dated = trials.assign(
+            start_date_parsed=pd.to_datetime(trials["start_date"], errors="coerce")
+        )
+        self.undated = dated[dated["start_date_parsed"].isna()]
+        self.trials = dated.dropna(subset=["start_date_parsed"]).sort_values(
+            ["start_date_parsed", "trial_id"], kind="stable"
+        )
+        self._cursor = 0
+
+    def _add_node(self, node, **attrs):
+        if node not in self.G:
+            self.G.add_node(node, **attrs)
+            self.components.add(node)
+            self._dirty.add(node)
+
+    def _add_edge(self, u, v, **attrs):
+        if u == v or self.G.has_edge(u, v):
+            return
+        self.G.add_edge(u, v, **attrs)
+        self._dirty.add(self.components.union(u, v))
+
+    def add_trial(self, trial):
+        """Add one trial with its institution and co-participation edges"""
+        insts = self._members.get(trial.trial_id, [])
+        attached = [inst for inst in insts if inst in self.G]
+        cut, dirty = None, set(self._dirty)
+        if len(attached) == 1 and trial.trial_id not in self.G:
+            dirty_roots = {self.components.find(node) for node in dirty}
+            if self.components.find(attached[0]) not in dirty_roots:
+                cut = attached[0]
+
+        self._add_node(
+            trial.trial_id,
+            node_type="trial",
+            name=trial.title,
+            country=trial.country,
+        )
+        for inst in insts:
+            self._add_node(
+                inst, **self._inst_attrs.get(inst, {"node_type": "institution"})
+            )
+            self._add_edge(trial.trial_id, inst)
+        for i in range(len(insts)):
+            for j in range(i + 1, len(insts)):
+                self._add_edge(insts[i], insts[j], relationship="co_participation")
+
+        if cut is not None:
+            self._attach(cut, [trial.trial_id] + [i for i in insts if i != cut])
+            self._dirty = dirty
+
+    def _attach(self, cut, new_nodes):
+        """Update scores after new_nodes joined the component through cut
+
+        C is the old component of cut (r nodes), H the new nodes plus cut.
+        Pairs inside C are unchanged; a pair (x in C, y in H) runs x -> cut
+        -> y, so C-nodes gain h * dependency(cut) pairs and H-nodes gain
+        (r - 1) * their dependency from cut within H.
+        """
+        new = set(new_nodes)
+        members = self.components.members[self.components.find(cut)]
+        old = [node for node in members if node not in new]
+        r, h = len(old), len(new)
+        H = self.G.subgraph(new | {cut})
+
+        distance, dependency = _single_source_dependency(self.G, cut, exclude=new)
+        h_distance, h_dependency = _single_source_dependency(H, cut)
+        h_between = nx.betweenness_centrality(H, normalized=False)
+        h_sum = sum(h_distance.values())
+        cut_sum = self._distance_sum[cut]
+
+        for node in old:
+            if node != cut:
+                self._raw_betweenness[node] += h * dependency[node]
+            self._distance_sum[node] += h * distance[node] + h_sum
+        self._raw_betweenness[cut] += (r - 1) * h + h_between[cut]
+        for node in new:
+            self._raw_betweenness[node] = h_between[node] + (r - 1) * h_dependency[node]
+            self._distance_sum[node] = (
+                sum(nx.single_source_shortest_path_length(H, node).values())
+                + (r - 1) * h_distance[node]
+                + cut_sum
+            )
+
+    def advance_to(self, cutoff):
+        """Add every trial starting on or before cutoff"""
+        trials = self.trials
+        while (
+            self._cursor < len(trials)
+            and trials["start_date_parsed"].iat[self._cursor] <= cutoff
+        ):
+            self.add_trial(trials.iloc[self._cursor])
+            self._cursor += 1
+
+    def _refresh_dirty_components(self):
+        # Searches never leave a component, so they run on G itself (a
+        # subgraph view filters every neighbour lookup)
+        roots = {self.components.find(node) for node in self._dirty}
+        for root in roots:
+            nodes = self.components.members[root]
+            between = dict.fromkeys(nodes, 0.0)
+            for source in nodes:
+                distance, dependency = _single_source_dependency(self.G, source)
+                self._distance_sum[source] = sum(distance.values())
+                for node, value in dependency.items():
+                    if node != source:
+                        between[node] += value
+            for node in nodes:
+                # Each pair was counted from both ends
+                self._raw_betweenness[node] = between[node] / 2
+        self._dirty.clear()
+
+    def snapshot(self, label):
+        """Node and network metrics for the current state of the graph"""
+        self._refresh_dirty_components()
+        G = self.G
+        n = G.number_of_nodes()
+        m = G.number_of_edges()
+        between_scale = 2.0 / ((n - 1) * (n - 2)) if n > 2 else 0.0
+        close_scale = 1.0 / (n - 1) if n > 1 else 0.0
+
+        def closeness(node):
+            # Wasserman-Faust: (r-1)/sum of distances, scaled by (r-1)/(n-1)
+            total = self._distance_sum[node]
+            r = self.components.size(node)
+            return (r - 1) ** 2 / total * close_scale if total else 0.0
+
+        nodes = [
+            {
+                "snapshot": label,
+                "node_id": node,
+                "node_type": data["node_type"],
+                "degree": G.degree(node),
+                "degree_centrality": G.degree(node) / (n - 1) if n > 1 else 0.0,
+                "betweenness_centrality": self._raw_betweenness[node] * between_scale,
+                "closeness_centrality": closeness(node),
+            }
+            for node, data in G.nodes(data=True)
+        ]
+        stats = {
+            "snapshot": label,
+            "trials": self._cursor,
+            "nodes": n,
+            "edges": m,
+            "density": 2.0 * m / (n * (n - 1)) if n > 1 else 0.0,
+            "components": len(self.components.roots()),
+            "largest_component": max(
+                (len(v) for v in self.components.members.values()), default=0
+            ),
+            "average_degree": 2.0 * m / n if n else 0.0,
+        }
+        return nodes, stats
+
+    def sweep(self, freq="YE", start=None, end=None):
+        """Grow the network across window boundaries and collect time series
+
+        freq is any pandas offset alias ("YE" yearly, "QE" quarterly, "6ME",
+        ...); start/end default to the first and last trial start dates.
+        Returns (node_series, network_series) DataFrames.
+        """
+        dates = self.trials["start_date_parsed"]
+        if dates.empty:
+            return pd.DataFrame(), pd.DataFrame()
+        start = pd.Timestamp(start) if start is not None else dates.min()
+        end = pd.Timestamp(end) if end is not None else dates.max()
+        boundaries = pd.date_range(start, end, freq=freq)
+        if len(boundaries) == 0 or boundaries[-1] < end:
+            boundaries = boundaries.append(pd.DatetimeIndex([end]))
+
+        node_rows, stat_rows = [], []
+        for cutoff in boundaries:
+            self.advance_to(cutoff)
+            label = cutoff.year if freq.upper().startswith("Y") else cutoff.date()
+            nodes, stats = self.snapshot(label)
+            node_rows.extend(nodes)
+            stat_rows.append(stats)
+        return pd.DataFrame(node_rows), pd.DataFrame(stat_rows)
+
+
+def _single_source_dependency(G, source, exclude=()):
+    """Distances from source and Brandes dependencies on source
+
+    dependency[v] is the number of (source, t) shortest-path pairs through v,
+    counting fractional shares where there are several shortest paths.
+    Nodes in exclude are treated as absent.
+    """
+    distance = {source: 0}
+    sigma = {source: 1}
+    predecessors = {source: []}
+    order = []
+    frontier = [source]
+    while frontier:
+        nxt = []
+        for v in frontier:
+            order.append(v)
+            for w in G[v]:
+                if w in exclude:
+                    continue
+                if w not in distance:
+                    distance[w] = distance[v] + 1
+                    sigma[w] = 0
+                    predecessors[w] = []
+                    nxt.append(w)
+                if distance[w] == distance[v] + 1:
+                    sigma[w] += sigma[v]
+                    predecessors[w].append(v)
+        frontier = nxt
+    dependency = dict.fromkeys(order, 0.0)
+    for w in reversed(order):
+        for v in predecessors[w]:
+            dependency[v] += sigma[v] / sigma[w] * (1 + dependency[w])
+    return distance, dependency
@@ -0,0 +1,65 @@
+"""
+Tests for structural_metrics (run with pytest)
+"""
+
+import time
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from structural_metrics import adjacency, core_numbers, structural_metrics
+
+
+def _chain_with_core(length):
+    """Long path with a 10-clique hanging off one end"""
+    G = nx.path_graph(length)
+    nx.add_path(G, [length - 1, length])
+    G.add_edges_from(nx.complete_graph(range(length, length + 10)).edges())
+    return G
+
+
+GRAPHS = [
+    nx.karate_club_graph(),
+    nx.les_miserables_graph(),
+    nx.powerlaw_cluster_graph(2000, 4, 0.3, seed=1),
+    nx.gnm_random_graph(3000, 15000, seed=2),
+    nx.ladder_graph(500),
+    _chain_with_core(1000),
+    nx.empty_graph(5),
+]
+
+
+@pytest.mark.parametrize("G", GRAPHS)
+def test_matches_networkx(G):
+    nodes, network = structural_metrics(adjacency(G))
+    order = list(G.nodes())
+    core = nx.core_number(G)
+    triangles = nx.triangles(G)
+    assert nodes["core_number"].tolist() == [core[v] for v in order]
+    assert nodes["triangles"].tolist() == [triangles[v] for v in order]
+    assert network["degeneracy"] == max(core.values())
+    assert network["transitivity"] == pytest.approx(nx.transitivity(G))
+
+
+def _core_seconds(G):
+    A = adjacency(G)
+    start = time.perf_counter()
+    core = core_numbers(A)
+    elapsed = time.perf_counter() - start
+    assert core.max() == (9 if len(G) > 10 else 0)
+    return elapsed
+
+
+def test_core_numbers_linear_on_long_chains():
+    # Chains peel a couple of nodes per round, so any per-round O(n) step
+    # makes the decomposition quadratic: 4x the length would take ~16x as long
+    short = min(_core_seconds(_chain_with_core(25_000)) for _ in range(3))
+    long = min(_core_seconds(_chain_with_core(100_000)) for _ in range(3))
+    assert long < 8 * short + 0.05
+
+
+def test_core_numbers_chain_values():
+    core = core_numbers(adjacency(_chain_with_core(50_000)))
+    assert np.all(core[:50_000] == 1)
+    assert np.all(core[50_000:] == 9)
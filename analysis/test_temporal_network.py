@@ -0,0 +1,133 @@
+"""
+Tests for temporal_network (run with pytest)
+"""
+
+import random
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+from temporal_network import TemporalNetwork
+
+TRIALS = pd.DataFrame(
+    {
+        "trial_id": ["T1", "T2", "T3", "T4", "T5"],
+        "title": ["One", "Two", "Three", "Four", "Five"],
+        "country": ["Kenya", "Kenya", "Uganda", "Uganda", "Rwanda"],
+        "start_date": [
+            "2019-03-01",
+            "2019-06-01",
+            "2020-06-01",
+            "2021-01-15",
+            "2021-02-01",
+        ],
+    }
+)
+INSTITUTIONS = pd.DataFrame(
+    {
+        "institution_id": ["A", "B", "C", "D", "E"],
+        "institution_name": ["Inst A", "Inst B", "Inst C", "Inst D", "Inst E"],
+        "sector": ["Academic", "Government", "Industry", "Academic", "NGO"],
+        "country": ["Kenya", "Kenya", "Uganda", "Uganda", "Rwanda"],
+    }
+)
+# A appears twice on T1 (sponsor and collaborator rows). 2019 ends with two
+# components; T3 attaches D through B, T4 merges the components through A
+# and C, T5 starts a new component
+EDGES = pd.DataFrame(
+    {
+        "trial_id": ["T1", "T1", "T1", "T2", "T3", "T3", "T4", "T4", "T5"],
+        "institution_id": ["A", "A", "B", "C", "B", "D", "A", "C", "E"],
+        "relationship_type": [
+            "sponsor",
+            "collaborator",
+            "collaborator",
+            "sponsor",
+            "sponsor",
+            "collaborator",
+            "sponsor",
+            "collaborator",
+            "sponsor",
+        ],
+    }
+)
+
+
+def _rebuild(trials, edges):
+    """Naive graph of the given trials, built from scratch"""
+    G = nx.Graph()
+    for trial in trials["trial_id"]:
+        G.add_node(trial)
+        members = list(
+            dict.fromkeys(edges[edges["trial_id"] == trial]["institution_id"])
+        )
+        G.add_edges_from((trial, inst) for inst in members)
+        G.add_edges_from(
+            (a, b) for i, a in enumerate(members) for b in members[i + 1 :]
+        )
+    return G
+
+
+def _assert_matches_networkx(network, edges, freq="YE"):
+    """Every snapshot of a sweep agrees with networkx on a rebuilt graph"""
+    node_series, stats = network.sweep(freq=freq)
+    for snapshot in stats.itertuples():
+        G = _rebuild(network.trials.iloc[: snapshot.trials], edges)
+        nodes = node_series[node_series["snapshot"] == snapshot.snapshot]
+        nodes = nodes.set_index("node_id")
+        assert set(nodes.index) == set(G)
+        assert snapshot.components == nx.number_connected_components(G)
+        betweenness = nx.betweenness_centrality(G)
+        closeness = nx.closeness_centrality(G)
+        for node in G:
+            label = (snapshot.snapshot, node)
+            assert nodes.at[node, "degree"] == G.degree(node), label
+            assert nodes.at[node, "betweenness_centrality"] == pytest.approx(
+                betweenness[node]
+            ), label
+            assert nodes.at[node, "closeness_centrality"] == pytest.approx(
+                closeness[node]
+            ), label
+    return stats
+
+
+def test_repeated_memberships_add_no_self_loops():
+    network = TemporalNetwork(TRIALS, INSTITUTIONS, EDGES)
+    network.advance_to(pd.Timestamp("2019-12-31"))
+    assert nx.number_of_selfloops(network.G) == 0
+    assert network.G.degree("A") == 2
+
+
+def test_sweep_matches_networkx_at_every_snapshot():
+    network = TemporalNetwork(TRIALS, INSTITUTIONS, EDGES)
+    stats = _assert_matches_networkx(network, EDGES)
+    assert stats["trials"].tolist() == [2, 3, 5]
+    assert stats["components"].tolist() == [2, 2, 2]
+
+
+def test_random_growth_matches_networkx():
+    rng = random.Random(7)
+    institutions = [f"I{i}" for i in range(60)]
+    rows, trials = [], []
+    for t in range(80):
+        trial = f"T{t}"
+        # Mostly one known institution plus new ones (cut-vertex attaches),
+        # sometimes several known ones (cycles and merges)
+        members = rng.sample(institutions, rng.choice([1, 1, 2, 3]))
+        rows += [(trial, inst) for inst in members]
+        trials.append((trial, f"Trial {t}", "Kenya", f"{2000 + t // 4}-01-01"))
+    edges = pd.DataFrame(rows, columns=["trial_id", "institution_id"])
+    network = TemporalNetwork(
+        pd.DataFrame(trials, columns=["trial_id", "title", "country", "start_date"]),
+        pd.DataFrame(
+            {
+                "institution_id": institutions,
+                "institution_name": institutions,
+                "sector": "Academic",
+                "country": "Kenya",
+            }
+        ),
+        edges,
+    )
+    _assert_matches_networkx(network, edges)
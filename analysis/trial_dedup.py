@@ -0,0 +1,179 @@
+"""
+Cross-registry trial deduplication
+One canonical trial per set of registry records that share an identifier
+
+Trials are registered on ClinicalTrials.gov (NCT), ISRCTN and PACTR, often in
+more than one place, and the secondary-ID fields (`Other IDs` in the
+ClinicalTrials.gov export, `SecondaryIDs` in ICTRP exports) cross-reference
+the other registrations. Registry identifiers are extracted from primary and
+secondary fields with a single compiled pattern, normalized ("NCT 0466-6311" ->
+"NCT04666311"), hashed to integer codes, and records are merged with a
+union-find over the linked codes; the whole index is near-linear in the
+number of records.
+
+Sponsor study numbers and grant numbers in the secondary fields are kept
+out of the linking: the same grant routinely funds several trials, so only
+registry-shaped identifiers are treated as the same trial.
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from union_find import UnionFind
+
+# Registry -> (prefix, pattern of the part after it); the normalized
+# identifier is the prefix followed by the matched digits
+REGISTRY_PATTERNS = {
+    "ClinicalTrials.gov": ("NCT", r"NCT[\s-]*(?P<g0>\d{8})(?!\d)"),
+    "PACTR": ("PACTR", r"PACTR[\s-]*(?P<g1>\d{15})(?!\d)"),
+    "ISRCTN": ("ISRCTN", r"ISRCTN[\s-]*(?P<g2>\d{8})(?!\d)"),
+    "EudraCT": ("", r"(?<!\d)(?P<g3>\d{4}-\d{6}-\d{2})(?!\d)"),
+}
+# All patterns in one alternation, so each value is scanned once
+REGISTRY_ID = re.compile("|".join(p for _, p in REGISTRY_PATTERNS.values()))
+GROUPS = {
+    f"g{i}": (registry, prefix)
+    for i, (registry, (prefix, _)) in enumerate(REGISTRY_PATTERNS.items())
+}
+
+# Registry whose record becomes the canonical trial, most preferred first
+REGISTRY_PRIORITY = ["ClinicalTrials.gov", "PACTR", "ISRCTN", "EudraCT", "Other"]
+
+# Primary / secondary identifier columns of the supported export layouts
+SOURCE_LAYOUTS = [
+    ("NCT Number", "Other IDs"),
+    ("TrialID", "SecondaryIDs"),
+    ("trial_id", None),
+    ("Registry", None),
+]
+
+
+def registry_ids(text):
+    """Normalized registry identifiers found in each value of a Series
+
+    Returns a DataFrame with the Series index in `row` plus `registry` and
+    `registry_id`, one row per identifier found.
+    """
+    text = pd.Series(text, dtype="string").fillna("").str.upper()
+    found = [
+        (row, *_normalized(m))
+        for row, value in zip(text.index, text.to_numpy())
+        if value
+        for m in REGISTRY_ID.finditer(value)
+    ]
+    return pd.DataFrame(found, columns=["row", "registry", "registry_id"])
+
+
+def _normalized(match):
+    registry, prefix = GROUPS[match.lastgroup]
+    return registry, prefix + match[match.lastgroup]
+
+
+def load_registry_records(paths):
+    """Primary and secondary identifiers from every readable export
+
+    Returns (records, skipped file names); records has record_id,
+    secondary_ids and source.
+    """
+    frames, skipped = [], []
+    for path in paths:
+        header = pd.read_csv(path, nrows=0).columns
+        layout = next((l for l in SOURCE_LAYOUTS if l[0] in header), None)
+        if layout is None:
+            skipped.append(Path(path).name)
+            continue
+        primary, secondary = layout
+        columns = [primary] + ([secondary] if secondary in header else [])
+        frame = pd.read_csv(path, dtype=str, usecols=columns)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "record_id": frame[primary].str.strip(),
+                    "secondary_ids": frame.get(secondary),
+                    "source": Path(path).name,
+                }
+            )
+        )
+    records = (
+        pd.concat(frames, ignore_index=True)
+        if frames
+        else pd.DataFrame(columns=["record_id", "secondary_ids", "source"])
+    )
+    records = records[records["record_id"].fillna("") != ""]
+    return records.reset_index(drop=True), skipped
+
+
+def deduplicate(records):
+    """Collapse records that share a registry identifier
+
+    records needs `record_id` and `secondary_ids`. Returns (index, trials):
+    index has one row per record with its registry and canonical_id; trials
+    has one row per canonical trial with every linked identifier.
+    """
+    records = records.reset_index(drop=True)
+    primary = registry_ids(records["record_id"]).drop_duplicates("row")
+    registry = pd.Series("Other", index=records.index, dtype=object)
+    registry[primary["row"].to_numpy()] = primary["registry"].to_numpy()
+    key = records["record_id"].str.strip().str.upper()
+    key[primary["row"].to_numpy()] = primary["registry_id"].to_numpy()
+
+    secondary = registry_ids(records["secondary_ids"].fillna(""))
+    codes, ids = pd.factorize(
+        pd.concat([key, secondary["registry_id"]], ignore_index=True)
+    )
+    record_code, secondary_code = codes[: len(key)], codes[len(key) :]
+
+    uf = UnionFind()
+    for code in record_code:
+        uf.add(code)
+    for row, code in zip(secondary["row"].to_numpy(), secondary_code):
+        uf.add(code)
+        uf.union(record_code[row], code)
+    cluster = [uf.find(code) for code in record_code]
+
+    index = pd.DataFrame(
+        {
+            "record_id": key,
+            "registry": registry,
+            "source": records.get("source"),
+            "cluster": cluster,
+            "rank": registry.map(REGISTRY_PRIORITY.index),
+        }
+    )
+    canonical = (
+        index.sort_values(["rank", "record_id"])
+        .drop_duplicates("cluster")
+        .set_index("cluster")
+    )
+    index["canonical_id"] = index["cluster"].map(canonical["record_id"])
+
+    # Every identifier belongs to a record's cluster; join them per cluster
+    linked = pd.DataFrame(
+        {
+            "cluster": [uf.find(code) for code in range(len(ids))],
+            "registry_id": ids,
+        }
+    ).sort_values(["cluster", "registry_id"])
+    starts = np.flatnonzero(np.diff(linked["cluster"].to_numpy())) + 1
+    groups = np.split(linked["registry_id"].to_numpy(dtype=object), starts)
+    trials = pd.DataFrame(
+        {
+            "canonical_id": canonical["record_id"],
+            "registry_source": canonical["registry"],
+            "registry_ids": pd.Series(
+                [";".join(g) for g in groups],
+                index=linked["cluster"].to_numpy()[np.r_[0, starts]],
+            ),
+            "records": index.groupby("cluster").size(),
+        }
+    )
+    trials = trials.sort_values("canonical_id").reset_index(drop=True)
+    index = (
+        index.drop(columns=["cluster", "rank"])
+        .sort_values(["canonical_id", "record_id"])
+        .drop_duplicates(["record_id", "source"])
+        .reset_index(drop=True)
+    )
+    return index, trials
@@ -0,0 +1,51 @@
+"""
+Disjoint-set (union-find) with member lists
+Used to track connected components as a network grows edge by edge
+"""
+
+
+class UnionFind:
+    """Union by size with path halving; keeps the members of each root"""
+
+    def __init__(self):
+        self.parent = {}
+        self.members = {}
+
+    def __contains__(self, item):
+        return item in self.parent
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self, item):
+        """Add item as a singleton set (no-op if already present)"""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.members[item] = [item]
+
+    def find(self, item):
+        """Root of the set containing item"""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merge the sets of a and b; returns the surviving root"""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if len(self.members[ra]) < len(self.members[rb]):
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.members[ra].extend(self.members.pop(rb))
+        return ra
+
+    def size(self, item):
+        """Size of the set containing item"""
+        return len(self.members[self.find(item)])
+
+    def roots(self):
+        """Current set representatives"""
+        return self.members.keys()
@@ -63,5 +63,5 @@ echo "  - cumulative_trials_N11.png"
 echo ""
 echo "Next steps:"
 echo "  1. Review output files for manuscript tables and figures"
-echo "  2. Compare N=11 results with previous N=12 results (if needed)"
+echo "  2. Compare with an earlier run (if needed): python analysis/compare_snapshots.py"
 echo "  3. Update manuscript text with new network statistics"
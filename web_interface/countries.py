@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Country name normalization
+
+Node country fields are free text ("Kenya", "kenya ", "Kenya; Uganda",
+"Côte d'Ivoire", "Korea, Republic of"). normalize_country maps a name to one
+canonical key so that a country is looked up by exact match instead of a
+substring scan; this also stops "Niger" from matching "Nigeria".
+
+split_countries only splits a field when it is not itself a known country,
+so names such as "Sao Tome and Principe" stay whole.
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+# Alternative spellings mapped onto the canonical key
+COUNTRY_ALIASES = {
+    'ivory coast': 'cote d\'ivoire',
+    'drc': 'democratic republic of the congo',
+    'dr congo': 'democratic republic of the congo',
+    'congo, democratic republic of the': 'democratic republic of the congo',
+    'congo (kinshasa)': 'democratic republic of the congo',
+    'congo (brazzaville)': 'congo',
+    'republic of the congo': 'congo',
+    'swaziland': 'eswatini',
+    'cape verde': 'cabo verde',
+    'united republic of tanzania': 'tanzania',
+    'tanzania, united republic of': 'tanzania',
+    'the gambia': 'gambia',
+    'usa': 'united states',
+    'united states of america': 'united states',
+    'uk': 'united kingdom',
+    'great britain': 'united kingdom',
+    'the netherlands': 'netherlands',
+    'czech republic': 'czechia',
+    'turkiye': 'turkey',
+    'republic of korea': 'south korea',
+    'korea': 'south korea',
+    'democratic people\'s republic of korea': 'north korea',
+    'islamic republic of iran': 'iran',
+    'russian federation': 'russia',
+    'viet nam': 'vietnam',
+    'syrian arab republic': 'syria',
+    'lao people\'s democratic republic': 'laos',
+    'republic of moldova': 'moldova',
+    'plurinational state of bolivia': 'bolivia',
+    'bolivarian republic of venezuela': 'venezuela',
+    'sao tome & principe': 'sao tome and principe',
+    'trinidad & tobago': 'trinidad and tobago',
+    'bosnia & herzegovina': 'bosnia and herzegovina',
+    'antigua & barbuda': 'antigua and barbuda',
+}
+
+# Separators between countries in multi-country fields. Commas and "and"
+# also separate countries, but only when every part is a known country.
+_SEPARATORS = re.compile(r'\s*[;|/]\s*')
+_LIST_SEPARATORS = [re.compile(r'\s*,\s*'), re.compile(r'\s+and\s+'),
+                    re.compile(r'\s*,\s*(?:and\s+)?|\s+and\s+')]
+
+
+def _clean(name):
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', text.replace('’', '\'')).strip().lower()
+
+
+def normalize_country(name):
+    """Canonical lower-case key for a country name ('' for missing values)"""
+    if name is None or name != name:
+        return ''
+    text = _clean(name)
+    if text in COUNTRY_ALIASES:
+        return COUNTRY_ALIASES[text]
+    # ISO-style inverted names: "Korea, Republic of", "Gambia, The"
+    head, comma, tail = text.partition(', ')
+    if comma and ',' not in tail:
+        inverted = f'{tail} {head}'
+        inverted = COUNTRY_ALIASES.get(inverted, inverted)
+        if inverted in COUNTRIES:
+            return inverted
+    return text
+
+
+def _split_known(key, separator):
+    """Parts of key split on separator if every part is a known country"""
+    parts = [normalize_country(p) for p in separator.split(key)]
+    if len(parts) > 1 and all(p in COUNTRIES for p in parts):
+        return parts
+    return None
+
+
+def split_countries(value):
+    """Canonical keys of every country named in a (possibly multi-country) field"""
+    if value is None or value != value:
+        return []
+    keys = []
+    for part in _SEPARATORS.split(str(value)):
+        # Whole names are resolved first, so "Sao Tome and Principe" and
+        # "Congo, Democratic Republic of the" stay whole while
+        # "Kenya, Uganda" and "Lesotho and South Africa" are split
+        key = normalize_country(part)
+        if key in COUNTRIES:
+            candidates = [key]
+        else:
+            candidates = next(
+                (p for p in (_split_known(key, sep) for sep in _LIST_SEPARATORS)
+                 if p), [key])
+        keys.extend(k for k in candidates if k and k not in keys)
+    return keys
+
+
+# Countries outside Sub-Saharan Africa, as canonical keys
+_OTHER_COUNTRIES = [
+    'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Antigua and Barbuda',
+    'Argentina', 'Armenia', 'Australia', 'Austria', 'Azerbaijan', 'Bahamas',
+    'Bahrain', 'Bangladesh', 'Barbados', 'Belarus', 'Belgium', 'Belize',
+    'Bhutan', 'Bolivia', 'Bosnia and Herzegovina', 'Brazil', 'Brunei',
+    'Bulgaria', 'Cambodia', 'Canada', 'Chile', 'China', 'Colombia',
+    'Costa Rica', 'Croatia', 'Cuba', 'Cyprus', 'Czechia', 'Denmark',
+    'Dominica', 'Dominican Republic', 'Ecuador', 'Egypt', 'El Salvador',
+    'Estonia', 'Fiji', 'Finland', 'France', 'Georgia', 'Germany', 'Greece',
+    'Grenada', 'Guatemala', 'Guyana', 'Haiti', 'Honduras', 'Hong Kong',
+    'Hungary', 'Iceland', 'India', 'Indonesia', 'Iran', 'Iraq', 'Ireland',
+    'Israel', 'Italy', 'Jamaica', 'Japan', 'Jordan', 'Kazakhstan', 'Kiribati',
+    'Kosovo', 'Kuwait', 'Kyrgyzstan', 'Laos', 'Latvia', 'Lebanon', 'Libya',
+    'Liechtenstein', 'Lithuania', 'Luxembourg', 'Malaysia', 'Maldives',
+    'Malta', 'Marshall Islands', 'Mexico', 'Micronesia', 'Moldova', 'Monaco',
+    'Mongolia', 'Montenegro', 'Morocco', 'Myanmar', 'Nauru', 'Nepal',
+    'Netherlands', 'New Zealand', 'Nicaragua', 'North Korea',
+    'North Macedonia', 'Norway', 'Oman', 'Pakistan', 'Palau', 'Palestine',
+    'Panama', 'Papua New Guinea', 'Paraguay', 'Peru', 'Philippines',
+    'Poland', 'Portugal', 'Qatar', 'Romania', 'Russia', 'Saint Kitts and Nevis',
+    'Saint Lucia', 'Saint Vincent and the Grenadines', 'Samoa', 'San Marino',
+    'Saudi Arabia', 'Serbia', 'Singapore', 'Slovakia', 'Slovenia',
+    'Solomon Islands', 'South Korea', 'Spain', 'Sri Lanka', 'Suriname',
+    'Sweden', 'Switzerland', 'Syria', 'Taiwan', 'Tajikistan', 'Thailand',
+    'Timor-Leste', 'Tonga', 'Trinidad and Tobago', 'Tunisia', 'Turkey',
+    'Turkmenistan', 'Tuvalu', 'Ukraine', 'United Arab Emirates',
+    'United Kingdom', 'United States', 'Uruguay', 'Uzbekistan', 'Vanuatu',
+    'Vatican City', 'Venezuela', 'Vietnam', 'Yemen',
+]
+
+# Sub-Saharan African countries, as canonical keys. The list is the search
+# protocol's, shared with the registry client through registry-config.json
+with open(Path(__file__).parent / 'config' / 'registry-config.json',
+          encoding='utf-8') as _f:
+    SUB_SAHARAN_AFRICA = frozenset(
+        normalize_country(c) for c in json.load(_f)['subSaharanAfrica'])
+
+# Every known country, as canonical keys
+COUNTRIES = SUB_SAHARAN_AFRICA | frozenset(
+    normalize_country(c) for c in _OTHER_COUNTRIES)
+
+
+def is_sub_saharan(name):
+    """True if name is a Sub-Saharan African country (any spelling)"""
+    return normalize_country(name) in SUB_SAHARAN_AFRICA
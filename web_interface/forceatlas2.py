@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ForceAtlas2 layout with vectorized Barnes-Hut repulsion
+
+nx.spring_layout evaluates every node pair on every iteration, which stops
+being usable past a few thousand nodes. This engine follows ForceAtlas2
+(Jacomy et al., 2014): degree-weighted linear repulsion, linear attraction
+along edges, gravity towards the origin and adaptive global/local speeds.
+
+Repulsion uses a Barnes-Hut quadtree built and traversed level by level with
+NumPy. Nodes are sorted by Morton code so every quadtree cell is a contiguous
+run; cell masses and centres of mass come from bincounts. Traversal keeps an
+array of (node, cell) pairs: pairs far enough away (cell size / distance <
+theta) are applied as one aggregated force, the rest are replaced by the
+cell's children on the next level.
+
+Large graphs are laid out multilevel: a handshake matching coarsens the graph
+repeatedly, the coarsest graph gets the full iteration budget and each finer
+level starts from its parent's positions and is only refined. A 100k-node
+graph lays out in under a minute.
+
+Usage (adds normalized layout coordinates to the web network JSON; run by
+npm run data:update after process-sqlite-data-n11.js, and the sharded export
+in scripts/export-network-shards.py adds the same coordinates to its nodes):
+    python forceatlas2.py [src/data/network-data.json]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Deepest quadtree level; finer cells are treated as point masses
+MAX_DEPTH = 16
+# Graphs above this size are laid out multilevel by default
+MULTILEVEL_MIN = 5000
+# Coarsening stops at this many nodes
+COARSEST = 1000
+# Share of the iterations spent refining each finer level
+REFINE_FRACTION = 0.2
+
+
+def _morton(ix, iy):
+    """Interleave the bits of two uint64 grid coordinates"""
+    def spread(v):
+        v = v & np.uint64(0xFFFFFFFF)
+        for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                            (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                            (1, 0x5555555555555555)):
+            v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+        return v
+    return spread(ix) | (spread(iy) << np.uint64(1))
+
+
+def _expand_ranges(starts, lengths):
+    """Concatenate arange(s, s + l) for every (s, l) pair"""
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(int(lengths.sum()))
+
+
+def _quadtree_codes(P, depth):
+    """Morton code of each node's finest cell and the root cell size"""
+    lo = P.min(axis=0)
+    size = max(float((P.max(axis=0) - lo).max()), 1e-9)
+    grid = np.uint64(1 << depth)
+    cells = np.minimum(((P - lo) / size * float(grid)).astype(np.uint64),
+                       grid - np.uint64(1))
+    return _morton(cells[:, 0], cells[:, 1]), size
+
+
+def _build_tree(P, mass, code, size, depth):
+    """Per level: each node's cell, cell masses, centres and child ranges"""
+    levels = []
+    for level in range(depth + 1):
+        ids = code >> np.uint64(2 * (depth - level))
+        unique, node_cell = np.unique(ids, return_inverse=True)
+        m = np.bincount(node_cell, weights=mass, minlength=len(unique))
+        cx = np.bincount(node_cell, weights=mass * P[:, 0], minlength=len(unique))
+        cy = np.bincount(node_cell, weights=mass * P[:, 1], minlength=len(unique))
+        levels.append({
+            'ids': unique,
+            'node_cell': node_cell,
+            'mass': m,
+            'x': cx / m,
+            'y': cy / m,
+            'size': size / (1 << level),
+        })
+    # Children of a cell at level L are a contiguous run at level L + 1
+    for parent, child in zip(levels[:-1], levels[1:]):
+        owner = child['ids'] >> np.uint64(2)
+        parent['child_start'] = np.searchsorted(owner, parent['ids'], 'left')
+        parent['child_end'] = np.searchsorted(owner, parent['ids'], 'right')
+    return levels
+
+
+def _children(tree, nodes, cells):
+    """Expand (node, cell) pairs into (node, child cell) pairs"""
+    starts = tree['child_start'][cells]
+    counts = tree['child_end'][cells] - starts
+    return np.repeat(nodes, counts), _expand_ranges(starts, counts)
+
+
+def _repulsion(P, mass, scaling, theta, depth):
+    """Barnes-Hut approximation of sum_j k_r * m_i * m_j / d_ij
+
+    Only pairs of a node with a cell that does not contain it are carried
+    between levels; at each level the node's own cell contributes its other
+    children, so no per-pair membership test is needed.
+    """
+    n = len(P)
+    # Work in Morton order so that gathers over cells stay local in memory
+    code, size = _quadtree_codes(P, depth)
+    order = np.argsort(code, kind='stable')
+    P, mass, code = P[order], mass[order], code[order]
+    levels = _build_tree(P, mass, code, size, depth)
+    force = np.zeros_like(P)
+    theta2 = theta * theta
+    everyone = np.arange(n)
+
+    nodes = np.empty(0, dtype=np.int64)
+    cells = np.empty(0, dtype=np.int64)
+    for level, tree in enumerate(levels):
+        if level > 0:
+            # Siblings of each node's own cell become new candidate cells
+            parent = levels[level - 1]
+            own = parent['node_cell']
+            split = (parent['child_end'] - parent['child_start'])[own] > 1
+            sib_nodes, sib_cells = _children(parent, everyone[split],
+                                             own[split])
+            other = sib_cells != tree['node_cell'][sib_nodes]
+            nodes = np.concatenate([nodes, sib_nodes[other]])
+            cells = np.concatenate([cells, sib_cells[other]])
+        if len(nodes) == 0:
+            continue
+
+        dx = P[nodes, 0] - tree['x'][cells]
+        dy = P[nodes, 1] - tree['y'][cells]
+        d2 = dx * dx + dy * dy
+        if level < depth:
+            far = d2 * theta2 > tree['size'] ** 2
+            d2[~far] = np.inf
+        d2[d2 < 1e-18] = np.inf
+        f = scaling * mass[nodes] * tree['mass'][cells] / d2
+        force[:, 0] += np.bincount(nodes, weights=dx * f, minlength=n)
+        force[:, 1] += np.bincount(nodes, weights=dy * f, minlength=n)
+
+        if level < depth:
+            near = np.flatnonzero(~far)
+            nodes, cells = _children(tree, nodes[near], cells[near])
+
+    # Nodes sharing a finest cell (contiguous in Morton order) interact
+    # directly
+    counts = np.bincount(levels[-1]['node_cell'])
+    crowded = np.flatnonzero(counts > 1)
+    if len(crowded):
+        starts = (np.cumsum(counts) - counts)[crowded]
+        sizes = counts[crowded]
+        i = np.repeat(_expand_ranges(starts, sizes), np.repeat(sizes, sizes))
+        j = _expand_ranges(np.repeat(starts, sizes), np.repeat(sizes, sizes))
+        dx = P[i, 0] - P[j, 0]
+        dy = P[i, 1] - P[j, 1]
+        d2 = dx * dx + dy * dy
+        d2[d2 < 1e-18] = np.inf
+        f = scaling * mass[i] * mass[j] / d2
+        force[:, 0] += np.bincount(i, weights=dx * f, minlength=n)
+        force[:, 1] += np.bincount(i, weights=dy * f, minlength=n)
+    unsorted = np.empty_like(force)
+    unsorted[order] = force
+    return unsorted
+
+
+def _coarsen(n, sources, targets, mass, rng, rounds=3):
+    """Collapse a handshake matching of the graph into a coarser graph
+
+    Every free node proposes to a random free neighbour; mutual proposals
+    are matched, and nodes left over join a matched neighbour. Returns (fine -> coarse map, coarse size, coarse edges,
+    coarse masses).
+    """
+    u = np.concatenate([sources, targets])
+    v = np.concatenate([targets, sources])
+    key = rng.random(len(u))
+    match = np.full(n, -1, dtype=np.int64)
+    for _ in range(rounds):
+        free = (match[u] < 0) & (match[v] < 0) & (u != v)
+        if not free.any():
+            break
+        fu, fv = u[free], v[free]
+        order = np.lexsort((key[free], fu))
+        first = order[np.r_[True, fu[order][1:] != fu[order][:-1]]]
+        proposal = np.full(n, -1, dtype=np.int64)
+        proposal[fu[first]] = fv[first]
+        proposers = np.flatnonzero(proposal >= 0)
+        mutual = proposers[proposal[proposal[proposers]] == proposers]
+        match[mutual] = proposal[mutual]
+
+    nodes = np.arange(n)
+    rep = np.where(match >= 0, np.minimum(nodes, match), nodes)
+    # Nodes left unmatched (e.g. the leaves around a hub) join the group of
+    # a random matched neighbour
+    lonely = (match[u] < 0) & (match[v] >= 0)
+    if lonely.any():
+        lu, lv = u[lonely], v[lonely]
+        order = np.lexsort((key[lonely], lu))
+        first = order[np.r_[True, lu[order][1:] != lu[order][:-1]]]
+        rep[lu[first]] = rep[lv[first]]
+    _, coarse = np.unique(rep, return_inverse=True)
+    size = int(coarse.max()) + 1
+    cu, cv = coarse[sources], coarse[targets]
+    keep = cu != cv
+    lo = np.minimum(cu[keep], cv[keep])
+    hi = np.maximum(cu[keep], cv[keep])
+    pairs = np.unique(lo * size + hi)
+    return (coarse, size, pairs // size, pairs % size,
+            np.bincount(coarse, weights=mass, minlength=size))
+
+
+def _run(P, sources, targets, mass, iterations, scaling, gravity, theta,
+         jitter_tolerance, depth):
+    """ForceAtlas2 iterations from the positions P (updated in place)"""
+    n = len(P)
+    speed, speed_efficiency = 1.0, 1.0
+    previous = np.zeros_like(P)
+    for _ in range(iterations):
+        force = _repulsion(P, mass, scaling, theta, depth)
+
+        # Linear attraction along edges
+        delta = P[sources] - P[targets]
+        for axis in (0, 1):
+            force[:, axis] -= np.bincount(sources, weights=delta[:, axis],
+                                          minlength=n)
+            force[:, axis] += np.bincount(targets, weights=delta[:, axis],
+                                          minlength=n)
+
+        # Gravity towards the origin, scaled by mass
+        dist = np.maximum(np.hypot(P[:, 0], P[:, 1]), 1e-9)
+        force -= (gravity * mass / dist)[:, None] * P
+
+        # Adaptive speed (Jacomy et al., 2014)
+        swinging = mass * np.hypot(*(force - previous).T)
+        traction = mass * np.hypot(*(force + previous).T) / 2
+        total_swing, total_traction = swinging.sum(), traction.sum()
+
+        estimated = 0.05 * np.sqrt(n)
+        jt = jitter_tolerance * max(np.sqrt(estimated), min(
+            10.0, estimated * total_traction / (n * n)))
+        if total_traction > 0 and total_swing / total_traction > 2.0:
+            if speed_efficiency > 0.05:
+                speed_efficiency *= 0.5
+            jt = max(jt, jitter_tolerance)
+        target = (jt * speed_efficiency * total_traction / total_swing
+                  if total_swing > 0 else speed)
+        if total_swing > jt * total_traction:
+            if speed_efficiency > 0.05:
+                speed_efficiency *= 0.7
+        elif speed < 1000:
+            speed_efficiency *= 1.3
+        speed += min(target - speed, 0.5 * speed)
+
+        factor = speed / (1.0 + np.sqrt(speed * swinging))
+        P += force * factor[:, None]
+        previous = force
+    return P
+
+
+def _depth(n):
+    """Quadtree depth giving about one node per finest cell"""
+    return min(MAX_DEPTH, max(4, int(np.ceil(np.log2(max(n, 2)) / 2)) + 2))
+
+
+def forceatlas2(n, sources, targets, pos=None, iterations=100, scaling=None,
+                gravity=1.0, theta=1.2, jitter_tolerance=1.0, seed=42,
+                multilevel=None):
+    """ForceAtlas2 positions for an edge list over nodes 0..n-1
+
+    Returns an (n, 2) array. pos may hold initial positions. multilevel
+    (default: on above MULTILEVEL_MIN nodes without initial positions) lays
+    out a hierarchy of coarsened graphs first and refines each finer level
+    with REFINE_FRACTION of the iterations.
+    """
+    rng = np.random.default_rng(seed)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if n < 2:
+        return np.zeros((n, 2)) if pos is None else np.array(pos, dtype=float)
+
+    degree = np.bincount(sources, minlength=n) + np.bincount(targets, minlength=n)
+    mass = degree + 1.0
+    scaling = scaling if scaling is not None else (10.0 if n < 100 else 2.0)
+    params = dict(scaling=scaling, gravity=gravity, theta=theta,
+                  jitter_tolerance=jitter_tolerance)
+    if multilevel is None:
+        multilevel = pos is None and n > MULTILEVEL_MIN
+
+    if pos is not None:
+        P = np.array(pos, dtype=float)
+        return _run(P, sources, targets, mass, iterations, depth=_depth(n),
+                    **params)
+    if not multilevel:
+        P = rng.uniform(-1, 1, size=(n, 2)) * np.sqrt(n)
+        return _run(P, sources, targets, mass, iterations, depth=_depth(n),
+                    **params)
+
+    hierarchy = []
+    size, edges, weights = n, (sources, targets), mass
+    while size > COARSEST:
+        coarse, smaller, cu, cv, coarse_mass = _coarsen(size, *edges, weights,
+                                                        rng)
+        if smaller > 0.9 * size:
+            break
+        hierarchy.append((coarse, edges, weights))
+        size, edges, weights = smaller, (cu, cv), coarse_mass
+
+    P = rng.uniform(-1, 1, size=(size, 2)) * np.sqrt(size)
+    P = _run(P, *edges, weights, iterations, depth=_depth(size), **params)
+    refine = max(1, int(iterations * REFINE_FRACTION))
+    for coarse, edges, weights in reversed(hierarchy):
+        # Matched pairs start at their parent's position, slightly apart
+        spread = 0.01 * float(np.ptp(P, axis=0).max()) / np.sqrt(len(P))
+        P = P[coarse] + rng.normal(0, spread, size=(len(coarse), 2))
+        P = _run(P, *edges, weights, refine, depth=_depth(len(P)), **params)
+    return P
+
+
+def forceatlas2_layout(G, pos=None, iterations=100, seed=42, **kwargs):
+    """ForceAtlas2 layout of a networkx graph, rescaled to [-1, 1]
+
+    pos may give initial positions for some or all nodes.
+    """
+    nodes = list(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v],
+                     dtype=np.int64).reshape(-1, 2)
+    initial = None
+    if pos:
+        rng = np.random.default_rng(seed)
+        initial = rng.uniform(-1, 1, size=(len(nodes), 2))
+        for node, xy in pos.items():
+            if node in index:
+                initial[index[node]] = xy
+    P = forceatlas2(len(nodes), edges[:, 0], edges[:, 1], pos=initial,
+                    iterations=iterations, seed=seed, **kwargs)
+    return dict(zip(nodes, rescale(P)))
+
+
+def rescale(P, scale=1.0):
+    """Centre positions and scale the largest extent to [-scale, scale]"""
+    if len(P) == 0:
+        return P
+    P = P - P.mean(axis=0)
+    extent = np.abs(P).max()
+    return P * (scale / extent) if extent > 0 else P
+
+
+def node_layouts(count, pairs, iterations=100, seed=42):
+    """Layout records {"x": .., "y": ..} in [0, 1] for nodes 0..count-1
+
+    pairs are (source, target) node indexes. The web exports store these as
+    each node's "layout", ready to scale to the canvas in the front end.
+    """
+    edges = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    P = rescale(forceatlas2(count, edges[:, 0], edges[:, 1],
+                            iterations=iterations, seed=seed))
+    return [{'x': round(float(x), 5), 'y': round(float(y), 5)}
+            for x, y in (P + 1) / 2]
+
+
+def annotate_network_json(path, iterations=100, seed=42):
+    """Add normalized layout coordinates to every node of a network JSON"""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    ids = [node['id'] for node in data['nodes']]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    pairs = [(index[link['source']], index[link['target']])
+             for link in data['links']
+             if link['source'] in index and link['target'] in index]
+
+    layouts = node_layouts(len(ids), pairs, iterations=iterations, seed=seed)
+    for node, layout in zip(data['nodes'], layouts):
+        node['layout'] = layout
+    data.setdefault('metadata', {})['layout'] = 'forceatlas2'
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return len(ids)
+
+
+if __name__ == '__main__':
+    target = (sys.argv[1] if len(sys.argv) > 1
+              else Path(__file__).parent / 'src' / 'data' / 'network-data.json')
+    count = annotate_network_json(target)
+    print(f'Added ForceAtlas2 layout for {count} nodes to {target}')
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Memoized network metrics shared by the figure and summary functions
+
+MetricGraph is a networkx Graph that counts mutations. Metrics requested
+through G.metric() are computed at most once per graph version and
+recomputed only after nodes or edges are added or removed, or a node or edge
+attribute is changed (G.nodes[n]['country'] = ... included). Subgraph views
+inherit the class and follow their parent's version, so a country subgraph
+has its own cache that is invalidated when the full graph changes.
+"""
+
+import networkx as nx
+
+from countries import normalize_country, split_countries
+
+
+def country_index(G):
+    """Map of normalized country name -> nodes whose country field names it"""
+    index = {}
+    for node, value in G.nodes(data='country'):
+        for country in split_countries(value):
+            index.setdefault(country, []).append(node)
+    return index
+
+
+# Named metrics available through MetricGraph.metric()
+METRICS = {
+    'degree_centrality': nx.degree_centrality,
+    'betweenness_centrality': nx.betweenness_centrality,
+    'closeness_centrality': nx.closeness_centrality,
+    'density': nx.density,
+    'country_index': country_index,
+}
+
+
+def _mutates(method):
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._version += 1
+        return result
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class _AttributeDict(dict):
+    """Node or edge attribute dict that bumps its graph's version on writes"""
+
+    def _changed(self):
+        graph = self.__dict__.get('graph')
+        if graph is not None:
+            # copy/pickle refill the dict before the graph's state is restored
+            graph.__dict__['_version'] = graph.__dict__.get('_version', 0) + 1
+
+
+def _writes(method):
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+for _name in ('__setitem__', '__delitem__', '__ior__', 'update', 'pop',
+              'popitem', 'clear', 'setdefault'):
+    setattr(_AttributeDict, _name, _writes(getattr(dict, _name)))
+
+
+class MetricGraph(nx.Graph):
+    """Undirected graph with a per-version metric cache"""
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self._version = 0
+        self._metric_cache = {}
+        # networkx keeps instance-level factories, so attribute dicts created
+        # for this graph report their writes to it
+        self.node_attr_dict_factory = self._attribute_dict
+        self.edge_attr_dict_factory = self._attribute_dict
+        super().__init__(incoming_graph_data, **attr)
+
+    def _attribute_dict(self):
+        attributes = _AttributeDict()
+        attributes.graph = self
+        return attributes
+
+    add_node = _mutates(nx.Graph.add_node)
+    add_nodes_from = _mutates(nx.Graph.add_nodes_from)
+    remove_node = _mutates(nx.Graph.remove_node)
+    remove_nodes_from = _mutates(nx.Graph.remove_nodes_from)
+    add_edge = _mutates(nx.Graph.add_edge)
+    add_edges_from = _mutates(nx.Graph.add_edges_from)
+    remove_edge = _mutates(nx.Graph.remove_edge)
+    remove_edges_from = _mutates(nx.Graph.remove_edges_from)
+    clear = _mutates(nx.Graph.clear)
+    clear_edges = _mutates(nx.Graph.clear_edges)
+
+    @property
+    def version(self):
+        """Mutation count, including the parent graph's for subgraph views"""
+        parent = getattr(self, '_graph', None)
+        own = self.__dict__.get('_version', 0)
+        return own + (parent.version if isinstance(parent, MetricGraph) else 0)
+
+    def metric(self, name, **kwargs):
+        """Value of a named metric, computed once per graph version"""
+        cache = self.__dict__.setdefault('_metric_cache', {})
+        key = (name, tuple(sorted(kwargs.items())))
+        version = self.version
+        hit = cache.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        value = METRICS[name](self, **kwargs)
+        cache[key] = (version, value)
+        return value
+
+    def top_nodes(self, name, n=10):
+        """The n highest-scoring (node, value) pairs for a node-level metric"""
+        scores = self.metric(name)
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:n]
+
+    def country_nodes(self, country):
+        """Nodes located in a country, from the memoized country index"""
+        return self.metric('country_index').get(normalize_country(country), [])
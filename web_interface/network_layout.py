@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cached and incremental graph layouts for the network figures
+
+Layouts are stored as JSON keyed by a fingerprint of the graph and the layout
+parameters, so re-rendering an unchanged graph skips the force simulation.
+When the graph has changed, the last layout stored under the same name seeds
+every node it already knows; only the new nodes are placed (next to their
+neighbours) and relaxed, so existing nodes do not move between renders.
+Large graphs are laid out with the vectorized ForceAtlas2 engine instead of
+nx.spring_layout.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+from forceatlas2 import forceatlas2_layout
+
+LAYOUT_CACHE_DIR = Path(__file__).parent / '.layout_cache'
+
+# method='auto' switches from nx.spring_layout to ForceAtlas2 above this size
+FORCEATLAS2_MIN_NODES = 2000
+
+# New nodes relaxed per vectorized block (bounds memory at CHUNK x n x 2)
+CHUNK = 256
+
+
+def graph_fingerprint(G, **params):
+    """SHA-256 over sorted nodes, sorted edges and the layout parameters"""
+    h = hashlib.sha256()
+    for node in sorted(map(str, G.nodes())):
+        h.update(node.encode('utf-8') + b'\0')
+    h.update(b'\1')
+    edges = sorted(tuple(sorted((str(u), str(v)))) for u, v in G.edges())
+    for u, v in edges:
+        h.update(f'{u}\0{v}\n'.encode('utf-8'))
+    h.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _read_positions(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return {node: np.array(xy) for node, xy in json.load(f).items()}
+
+
+def _write_positions(path, pos):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    data = {str(node): [float(x), float(y)] for node, (x, y) in pos.items()}
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    tmp.replace(path)
+
+
+def _seed_new_nodes(G, known, seed):
+    """Initial positions: known nodes as stored, new nodes near their neighbours"""
+    rng = np.random.default_rng(seed)
+    coords = np.array(list(known.values())) if known else np.zeros((1, 2))
+    spread = max(float(np.ptp(coords, axis=0).max()), 1e-3)
+    jitter = 0.05 * spread
+
+    pos = {node: known[str(node)] for node in G if str(node) in known}
+    pending = [node for node in G if str(node) not in known]
+    # Place nodes touching already placed ones first so chains of new nodes
+    # grow outwards from the existing layout
+    for _ in range(len(pending)):
+        if not pending:
+            break
+        placed = []
+        for node in pending:
+            anchors = [pos[n] for n in G.neighbors(node) if n in pos]
+            if anchors:
+                pos[node] = np.mean(anchors, axis=0) + rng.normal(0, jitter, 2)
+                placed.append(node)
+        if not placed:
+            break
+        pending = [node for node in pending if node not in pos]
+    centre = coords.mean(axis=0)
+    for node in pending:
+        pos[node] = centre + rng.uniform(-spread / 2, spread / 2, 2)
+    return pos
+
+
+def _relax_new_nodes(G, pos, movable, iterations):
+    """Fruchterman-Reingold steps that move only the new nodes
+
+    The spring length is the median edge length of the stored layout and
+    repulsion is cut off beyond two spring lengths, so a new node settles
+    next to its neighbours instead of being pushed to the rim.
+    """
+    nodes = list(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    P = np.array([pos[node] for node in nodes], dtype=float)
+    moving = set(movable)
+    mv = np.array([index[node] for node in movable], dtype=int)
+    neighbours = [np.array([index[n] for n in G.neighbors(node)], dtype=int)
+                  for node in movable]
+
+    lengths = [np.linalg.norm(pos[u] - pos[v]) for u, v in G.edges()
+               if u not in moving and v not in moving and u != v]
+    spread = max(float(np.ptp(P, axis=0).max()), 1e-3)
+    k = float(np.median(lengths)) if lengths else 0.1 * spread
+    k = max(k, 1e-3 * spread)
+
+    temperature = 0.1 * spread
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        for start in range(0, len(mv), CHUNK):
+            block = mv[start:start + CHUNK]
+            delta = P[block, None, :] - P[None, :, :]
+            dist = np.linalg.norm(delta, axis=-1)
+            np.clip(dist, 0.01 * k, None, out=dist)
+            repulse = np.where(dist < 2 * k, k * k / dist**2, 0.0)
+            force = (delta * repulse[..., None]).sum(axis=1)
+            for row, nbrs in enumerate(neighbours[start:start + CHUNK]):
+                if len(nbrs):
+                    d = P[block[row]] - P[nbrs]
+                    force[row] -= (d * np.linalg.norm(d, axis=1)[:, None] / k).sum(0)
+            size = np.maximum(np.linalg.norm(force, axis=1), 1e-9)
+            step = np.minimum(size, temperature)
+            P[block] += force / size[:, None] * step[:, None]
+        temperature -= cooling
+    return {node: P[index[node]] for node in nodes}
+
+
+def cached_layout(G, name, k=None, iterations=100, seed=42,
+                  incremental=True, cache_dir=None, method='auto'):
+    """Force-directed layout with a fingerprint cache and incremental updates
+
+    name identifies the figure (e.g. 'main', 'country_Kenya'); its most
+    recent layout seeds the next one when incremental is True. method is
+    'spring' (nx.spring_layout), 'forceatlas2' or 'auto', which picks
+    ForceAtlas2 for graphs of FORCEATLAS2_MIN_NODES nodes or more.
+    """
+    if method == 'auto':
+        method = ('forceatlas2' if G.number_of_nodes() >= FORCEATLAS2_MIN_NODES
+                  else 'spring')
+    if method not in ('spring', 'forceatlas2'):
+        raise ValueError(f'Unknown layout method: {method}')
+
+    cache_dir = Path(cache_dir) if cache_dir else LAYOUT_CACHE_DIR
+    params = dict(k=k, iterations=iterations, seed=seed)
+    if method != 'spring':
+        params['method'] = method
+    fingerprint = graph_fingerprint(G, **params)
+    cached = cache_dir / f'{fingerprint}.json'
+    latest = cache_dir / f'{name}.latest.json'
+
+    if cached.exists():
+        stored = _read_positions(cached)
+        pos = {node: stored[str(node)] for node in G}
+        _write_positions(latest, pos)
+        return pos
+
+    known = {}
+    if incremental and latest.exists():
+        previous = _read_positions(latest)
+        known = {str(n): previous[str(n)] for n in G if str(n) in previous}
+
+    if known:
+        pos = _seed_new_nodes(G, known, seed)
+        new = [node for node in G if str(node) not in known]
+        if new:
+            pos = _relax_new_nodes(G, pos, new, min(iterations, 50))
+    elif method == 'forceatlas2':
+        pos = forceatlas2_layout(G, iterations=iterations, seed=seed)
+    else:
+        pos = nx.spring_layout(G, k=k, iterations=iterations, seed=seed)
+
+    _write_positions(cached, pos)
+    _write_positions(latest, pos)
+    return pos
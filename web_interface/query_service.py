@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Read-only HTTP query service over network.db
+
+Serves the same resources as the Next.js API routes (trials, institutions,
+funders, network, stats) as JSON from a small aiohttp server:
+
+    python query_service.py --db data/network.db --port 8765
+    python query_service.py --load-test --requests 5000 --concurrency 32
+
+SQLite work runs on a thread pool whose threads borrow connections from a
+fixed set opened with mode=ro, so the database is never written and never
+reopened per request. Encoded responses are kept in an LRU cache keyed by
+path and query string and carry an ETag; a request whose If-None-Match
+matches gets 304 without touching SQLite. The database file is stat()ed on
+every request: when it is replaced (create-database-n11.py deletes and
+rewrites it) the cache is emptied and the pooled connections, which would
+still read the old file, are closed and reopened.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from aiohttp import ClientSession, TCPConnector, web
+
+from countries import is_sub_saharan
+
+DB_PATH = Path(__file__).parent / 'data' / 'network.db'
+POOL_SIZE = 4
+CACHE_SIZE = 256
+
+
+def database_version(path):
+    """Identity of the database file; changes when it is rewritten or swapped"""
+    st = os.stat(path)
+    return f'{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}'
+
+
+class ConnectionPool:
+    """Fixed set of read-only SQLite connections shared by worker threads
+
+    reset() retires every connection: idle ones are closed at once and busy
+    ones when they are returned.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = Path(path)
+        self.size = size
+        self.generation = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        uri = f'{self.path.resolve().as_uri()}?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA query_only = ON')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            generation = self.generation
+        try:
+            conn_generation, conn = self._idle.get_nowait()
+            if conn_generation != generation:
+                conn.close()
+                conn = self._connect()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if generation == self.generation and self._idle.qsize() < self.size:
+                self._idle.put((generation, conn))
+            else:
+                conn.close()
+
+    def reset(self):
+        with self._lock:
+            self.generation += 1
+        self.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait()[1].close()
+            except queue.Empty:
+                return
+
+
+class ResponseCache:
+    """LRU map of request key -> (etag, encoded body), tagged with the
+    database version it was built from"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def validate(self, version):
+        """Drop everything if the database version changed; True if it did"""
+        with self._lock:
+            if version == self.version:
+                return False
+            changed = self.version is not None
+            self.version = version
+            self._entries.clear()
+            self.invalidations += changed
+            return changed
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, body):
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = (etag, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return etag, body
+
+
+# --- Queries -----------------------------------------------------------------
+
+def _tables(conn):
+    return {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _rows(conn, sql, params=()):
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def _filtered(conn, table, order, query, filters):
+    """SELECT * from table with equality filters taken from the query string
+
+    Filters on columns the table lacks (older schemas) are ignored.
+    """
+    columns = _columns(conn, table)
+    clauses, params = [], []
+    for name in filters:
+        if name in query and name in columns:
+            clauses.append(f'{name} = ?')
+            params.append(query[name])
+    where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+    data = _rows(conn, f'SELECT * FROM {table}{where} ORDER BY {order}', params)
+    return {'data': data, 'count': len(data)}
+
+
+def query_trials(conn, query):
+    return _filtered(conn, 'clinical_trials', 'start_date DESC', query,
+                     ['country', 'status'])
+
+
+def query_institutions(conn, query):
+    return _filtered(conn, 'institutions', 'name', query, ['country', 'sector'])
+
+
+def query_funders(conn, query):
+    if 'funding_sources' not in _tables(conn):
+        return {'data': [], 'count': 0}
+    return _filtered(conn, 'funding_sources', 'name', query, [])
+
+
+def query_network(conn, query):
+    """Nodes and links in the layout of /api/network
+
+    Links come from every relationship type plus funding_relationships.
+    """
+    tables = _tables(conn)
+    nodes, links, ids = [], [], {}
+
+    def add_node(kind, original, **fields):
+        ids[(kind, original)] = f'N{len(ids) + 1}'
+        nodes.append({'id': ids[(kind, original)], 'originalId': original,
+                      'type': kind, **fields})
+
+    # Rows as dicts: optional columns differ between the database schemas
+    for row in _rows(conn, 'SELECT * FROM institutions'):
+        add_node('institution', row['institution_id'], title=row['name'],
+                 country=row['country'], category=row['type'],
+                 sector=row.get('sector'))
+    if 'funding_sources' in tables:
+        for row in _rows(conn, 'SELECT * FROM funding_sources'):
+            add_node('funder', row['funding_id'], title=row['name'],
+                     country=row['headquarters_country'] or '',
+                     category=row.get('funder_type') or row.get('type')
+                     or 'Funder')
+    for row in _rows(conn, 'SELECT * FROM clinical_trials'):
+        start = row['start_date'] or ''
+        add_node('clinical_trial', row['trial_id'], title=row['title'],
+                 country=row['country'],
+                 year=int(start[:4]) if start[:4].isdigit() else None,
+                 category=row['phase'] or 'Not Specified',
+                 status=row['status'], condition=row['target_condition'],
+                 technology=row['technology_type'],
+                 sampleSize=row['sample_size'] or 0)
+
+    if 'funding_relationships' in tables:
+        for row in conn.execute('SELECT funder_id, recipient_id, funding_type '
+                                'FROM funding_relationships'):
+            source = ids.get(('funder', row['funder_id']))
+            target = ids.get(('clinical_trial', row['recipient_id']))
+            if source and target:
+                links.append({'source': source, 'target': target,
+                              'type': 'funding', 'strength': 'strong',
+                              'fundingType': row['funding_type']
+                              or 'Research Grant'})
+    for row in conn.execute('SELECT entity1_type, entity1_id, entity2_type, '
+                            'entity2_id, relationship_type, strength '
+                            'FROM relationships'):
+        source = ids.get((row['entity1_type'], row['entity1_id']))
+        target = ids.get((row['entity2_type'], row['entity2_id']))
+        if source and target:
+            links.append({'source': source, 'target': target,
+                          'type': row['relationship_type'],
+                          'strength': row['strength'] or 'medium'})
+
+    types = Counter(n['type'] for n in nodes)
+    countries = sorted({n['country'] for n in nodes if n.get('country')})
+    metadata = {
+        'totalNodes': len(nodes),
+        'totalLinks': len(links),
+        'nodeTypes': {'institutions': types['institution'],
+                      'trials': types['clinical_trial'],
+                      'funders': types['funder']},
+        'countries': countries,
+        'subSaharanCountries': sum(map(is_sub_saharan, countries)),
+        'avgConnections': len(links) * 2 / len(nodes) if nodes else 0,
+    }
+    return {'nodes': nodes, 'links': links, 'metadata': metadata}
+
+
+def query_stats(conn, query):
+    tables = _tables(conn)
+
+    def count(table):
+        if table not in tables:
+            return 0
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    breakdown = {'trials': count('clinical_trials'),
+                 'institutions': count('institutions'),
+                 'companies': count('companies'),
+                 'fundingSources': count('funding_sources')}
+    entities = sum(breakdown.values())
+    connections = count('relationships')
+    connection_types = _rows(conn, """
+        SELECT relationship_type AS type, COUNT(*) AS count
+        FROM relationships
+        GROUP BY relationship_type
+        ORDER BY count DESC
+    """)
+    # Either end of a relationship may be the trial; UNION ALL keeps both
+    # lookups on the entity indexes instead of an OR join
+    top = conn.execute("""
+        SELECT t.title, COUNT(*) AS connections
+        FROM (SELECT entity1_id AS id FROM relationships
+              UNION ALL
+              SELECT entity2_id FROM relationships) r
+        JOIN clinical_trials t ON t.trial_id = r.id
+        GROUP BY t.trial_id
+        ORDER BY connections DESC
+        LIMIT 1
+    """).fetchone()
+    countries = sorted({row[0] for row in conn.execute("""
+        SELECT country FROM clinical_trials WHERE country IS NOT NULL AND country != ''
+        UNION
+        SELECT country FROM institutions WHERE country IS NOT NULL AND country != ''
+    """)})
+    status = conn.execute("""
+        SELECT
+          SUM(CASE WHEN status IN ('Recruiting', 'Active', 'Ongoing') THEN 1 ELSE 0 END),
+          SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END)
+        FROM clinical_trials
+    """).fetchone()
+    return {
+        'totalEntities': entities,
+        'totalConnections': connections,
+        'subSaharanCountries': sum(map(is_sub_saharan, countries)),
+        'avgConnections': round(connections * 2 / entities, 1) if entities else 0,
+        'mostConnectedEntity': ({'name': top[0], 'connections': top[1]}
+                                if top else None),
+        'entityBreakdown': breakdown,
+        'connectionTypes': connection_types,
+        'activeTrials': status[0] or 0,
+        'completedTrials': status[1] or 0,
+        'countries': countries,
+    }
+
+
+ROUTES = {
+    '/api/trials': query_trials,
+    '/api/institutions': query_institutions,
+    '/api/funders': query_funders,
+    '/api/network': query_network,
+    '/api/stats': query_stats,
+}
+
+
+# --- Server ------------------------------------------------------------------
+
+def create_app(db_path=DB_PATH, pool_size=POOL_SIZE, cache_size=CACHE_SIZE):
+    """aiohttp application serving ROUTES from db_path"""
+    db_path = Path(db_path)
+    pool = ConnectionPool(db_path, pool_size)
+    cache = ResponseCache(cache_size)
+    executor = ThreadPoolExecutor(max_workers=pool_size,
+                                  thread_name_prefix='query')
+    pending = {}
+
+    def run_query(func, query):
+        with pool.connection() as conn:
+            payload = func(conn, query)
+        payload = {**payload, 'lastUpdated': datetime.fromtimestamp(
+            os.stat(db_path).st_mtime, timezone.utc).isoformat()}
+        return json.dumps(payload, separators=(',', ':'), default=str).encode()
+
+    async def handle(request):
+        func = ROUTES[request.path]
+        try:
+            version = database_version(db_path)
+        except FileNotFoundError:
+            return web.json_response({'error': 'Database not available'},
+                                     status=503)
+        if cache.validate(version):
+            pool.reset()
+        key = (request.path, tuple(sorted(request.query.items())))
+        entry = cache.get(key)
+        if entry is None:
+            # Concurrent misses on one key share a single query
+            if (key, version) not in pending:
+                pending[(key, version)] = asyncio.get_running_loop().run_in_executor(
+                    executor, run_query, func, dict(request.query))
+            future = pending[(key, version)]
+            try:
+                body = await asyncio.shield(future)
+            except sqlite3.Error as e:
+                return web.json_response(
+                    {'error': f'Failed to query {request.path}',
+                     'details': str(e)}, status=500)
+            finally:
+                if pending.get((key, version)) is future:
+                    del pending[(key, version)]
+            entry = cache.put(key, version, body)
+        etag, body = entry
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('If-None-Match', ''):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json',
+                            headers=headers)
+
+    async def health(request):
+        return web.json_response({
+            'database': str(db_path), 'version': cache.version,
+            'cache': {'entries': len(cache), 'hits': cache.hits,
+                      'misses': cache.misses,
+                      'invalidations': cache.invalidations}})
+
+    async def shutdown(app):
+        executor.shutdown(wait=True)
+        pool.close()
+
+    app = web.Application()
+    for path in ROUTES:
+        app.router.add_get(path, handle)
+    app.router.add_get('/health', health)
+    app.on_cleanup.append(shutdown)
+    app['cache'] = cache
+    app['pool'] = pool
+    return app
+
+
+async def start_service(app, host='127.0.0.1', port=0):
+    """Start the app; returns (runner, base URL)"""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    port = runner.addresses[0][1]
+    return runner, f'http://{host}:{port}'
+
+
+# --- Load test ---------------------------------------------------------------
+
+DEFAULT_MIX = ['/api/stats', '/api/trials', '/api/institutions',
+               '/api/funders', '/api/network', '/api/trials?country=Kenya']
+
+
+async def load_test(base_url, paths=DEFAULT_MIX, requests=2000, concurrency=16,
+                    conditional=0.5, seed=0):
+    """Fire requests at base_url and return per-path latency percentiles
+
+    A `conditional` share of requests repeats the last ETag seen for its
+    path in If-None-Match, as a revalidating browser would.
+    """
+    rng = np.random.default_rng(seed)
+    plan = rng.choice(len(paths), requests)
+    revalidate = rng.random(requests) < conditional
+    etags, samples = {}, []
+    cursor = iter(range(requests))
+
+    async def worker(session):
+        for i in cursor:
+            path = paths[plan[i]]
+            headers = {}
+            if revalidate[i] and path in etags:
+                headers['If-None-Match'] = etags[path]
+            start = time.perf_counter()
+            async with session.get(base_url + path, headers=headers) as resp:
+                await resp.read()
+                elapsed = time.perf_counter() - start
+                if 'ETag' in resp.headers:
+                    etags[path] = resp.headers['ETag']
+                samples.append((path, resp.status, elapsed))
+
+    started = time.perf_counter()
+    connector = TCPConnector(limit=concurrency)
+    async with ClientSession(connector=connector) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    report = []
+    for path in [None] + list(paths):
+        chosen = [s for s in samples if path is None or s[0] == path]
+        if not chosen:
+            continue
+        ms = np.array([s[2] for s in chosen]) * 1000
+        statuses = Counter(s[1] for s in chosen)
+        report.append({
+            'path': path or 'all',
+            'requests': len(chosen),
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p99_ms': float(np.percentile(ms, 99)),
+            'max_ms': float(ms.max()),
+            'not_modified': statuses.get(304, 0),
+            'errors': sum(n for code, n in statuses.items() if code >= 400),
+        })
+    return report, requests / wall
+
+
+def print_report(report, throughput):
+    print(f"{'path':32} {'n':>6} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'304':>6} {'err':>4}")
+    for row in report:
+        print(f"{row['path']:32} {row['requests']:6d} {row['p50_ms']:8.2f} "
+              f"{row['p99_ms']:8.2f} {row['max_ms']:8.2f} "
+              f"{row['not_modified']:6d} {row['errors']:4d}")
+    print(f'Throughput: {throughput:.0f} requests/s')
+
+
+async def _run_load_test(args):
+    if args.url:
+        report, throughput = await load_test(
+            args.url.rstrip('/'), requests=args.requests,
+            concurrency=args.concurrency, conditional=args.conditional)
+    else:
+        app = create_app(args.db, args.pool_size, args.cache_size)
+        runner, url = await start_service(app)
+        try:
+            report, throughput = await load_test(
+                url, requests=args.requests, concurrency=args.concurrency,
+                conditional=args.conditional)
+        finally:
+            await runner.cleanup()
+        cache = app['cache']
+        print(f'Cache: {cache.hits} hits, {cache.misses} misses')
+    print_report(report, throughput)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=str(DB_PATH), help='SQLite database')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pool-size', type=int, default=POOL_SIZE,
+                        help='read-only connections (and query threads)')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help='responses kept in the LRU cache')
+    parser.add_argument('--load-test', action='store_true',
+                        help='benchmark an in-process server (or --url)')
+    parser.add_argument('--url', default=None,
+                        help='base URL of a running service to load-test')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--conditional', type=float, default=0.5,
+                        help='share of load-test requests sent with If-None-Match')
+    args = parser.parse_args()
+
+    if args.load_test:
+        asyncio.run(_run_load_test(args))
+        return
+    if not Path(args.db).exists():
+        parser.error(f'{args.db} not found (run scripts/create-database-n11.py)')
+    web.run_app(create_app(args.db, args.pool_size, args.cache_size),
+                host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1006 @@
+#!/usr/bin/env python3
+"""
+Query-pattern benchmark and index advisor for network.db
+Replays the query shapes of the data scripts and API routes against a scaled
+synthetic database, records EXPLAIN QUERY PLAN and latency, and works out
+which covering and partial indexes the hot queries need
+
+The synthetic database uses the schema and the index list of
+create-database-n11.py. Each query is marked hot when it runs per request or
+per entity (API routes, query_service.py, the per-node lookups of
+process-sqlite-data-n11.js); batch statistics and the full-table reads of
+the data scripts are measured and reported but not tuned. A hot query whose
+plan scans a table without an index fails the benchmark (exit status 1).
+
+Exemption: the unfiltered listing routes (/api/clinical-trials, /api/network,
+...) are hot but return every row of their table, so a top-level scan of it
+is expected and does not fail. A scan nested inside another loop still
+fails, and their sorts are still tuned by the advisor.
+
+Advisor: for each hot query that scans or sorts, candidate indexes are
+derived from the columns it filters, joins, groups and orders on (plus
+covering and partial variants) and all created; candidates are then dropped
+one at a time, widest first, as long as the query's plan does not get worse,
+so what remains is a small set SQLite's planner actually uses. The whole
+set, baseline indexes included, is pruned the same way against every
+replayed query. --apply builds the advised indexes into an existing database.
+
+    python scripts/benchmark-network-db.py
+    python scripts/benchmark-network-db.py --trials 50000 --report bench.json
+    python scripts/benchmark-network-db.py --apply data/network.db
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import random
+import re
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import namedtuple
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+
+Query = namedtuple("Query", "source name sql params hot listing", defaults=(False,))
+
+QUERIES = [
+    # process-sqlite-data-n11.js: once per node
+    Query(
+        "process-sqlite-data-n11.js",
+        "participation date",
+        """SELECT start_date
+           FROM relationships
+           WHERE (entity1_type = ? AND entity1_id = ?)
+              OR (entity2_type = ? AND entity2_id = ?)
+              AND start_date IS NOT NULL
+           ORDER BY start_date ASC
+           LIMIT 1""",
+        "entity",
+        True,
+    ),
+    Query(
+        "process-sqlite-data-n11.js",
+        "trial start date",
+        "SELECT start_date FROM clinical_trials WHERE trial_id = ?",
+        "trial_id",
+        True,
+    ),
+    Query(
+        "process-sqlite-data-n11.js",
+        "all institutions",
+        "SELECT * FROM institutions",
+        None,
+        False,
+    ),
+    Query(
+        "process-sqlite-data-n11.js",
+        "all relationships",
+        "SELECT * FROM relationships",
+        None,
+        False,
+    ),
+    # calculate-network-metrics.js: one batch run
+    Query(
+        "calculate-network-metrics.js",
+        "technology types",
+        """SELECT technology_type, ai_algorithm_type, COUNT(*) as count
+           FROM clinical_trials
+           WHERE technology_type IS NOT NULL
+           GROUP BY technology_type, ai_algorithm_type
+           ORDER BY count DESC""",
+        None,
+        False,
+    ),
+    Query(
+        "calculate-network-metrics.js",
+        "conditions",
+        """SELECT target_condition, COUNT(*) as count
+           FROM clinical_trials
+           WHERE target_condition IS NOT NULL
+           GROUP BY target_condition
+           ORDER BY count DESC""",
+        None,
+        False,
+    ),
+    Query(
+        "calculate-network-metrics.js",
+        "trial countries",
+        """SELECT country, COUNT(*) as count
+           FROM clinical_trials
+           WHERE country IS NOT NULL
+           GROUP BY country
+           ORDER BY count DESC""",
+        None,
+        False,
+    ),
+    Query(
+        "calculate-network-metrics.js",
+        "funding mechanisms",
+        """SELECT fr.funding_type, fs.type as funder_type, COUNT(*) as count,
+                  AVG(fr.amount_usd) as avg_amount, SUM(fr.amount_usd) as total_amount
+           FROM funding_relationships fr
+           JOIN funding_sources fs ON fr.funder_id = fs.funding_id
+           WHERE fr.recipient_type = 'trial'
+           GROUP BY fr.funding_type, fs.type
+           ORDER BY count DESC""",
+        None,
+        False,
+    ),
+    Query(
+        "calculate-network-metrics.js",
+        "entity connections",
+        """SELECT entity_id, entity_type, COUNT(*) as connections
+           FROM (
+             SELECT entity1_id as entity_id, entity1_type as entity_type FROM relationships
+             UNION ALL
+             SELECT entity2_id as entity_id, entity2_type as entity_type FROM relationships
+           ) combined
+           GROUP BY entity_id, entity_type
+           ORDER BY connections DESC""",
+        None,
+        False,
+    ),
+    Query(
+        "calculate-network-metrics.js",
+        "strong relationships",
+        "SELECT COUNT(*) as count FROM relationships WHERE strength = 'Strong'",
+        None,
+        False,
+    ),
+    Query(
+        "calculate-network-metrics.js",
+        "institutions per trial",
+        """SELECT AVG(inst_count) as avg_institutions
+           FROM (
+             SELECT trial_id, COUNT(DISTINCT institution_id) as inst_count
+             FROM (
+               SELECT r.entity1_id as trial_id, r.entity2_id as institution_id
+               FROM relationships r
+               WHERE r.entity1_type = 'trial' AND r.entity2_type = 'institution'
+               UNION
+               SELECT r.entity2_id as trial_id, r.entity1_id as institution_id
+               FROM relationships r
+               WHERE r.entity2_type = 'trial' AND r.entity1_type = 'institution'
+             ) trial_institutions
+             GROUP BY trial_id
+           ) counts""",
+        None,
+        False,
+    ),
+    # Next.js API routes (src/app/api): once per request. The unfiltered
+    # listings read their whole table (listing=True, see the module docstring)
+    Query(
+        "api/clinical-trials",
+        "trials by start date",
+        "SELECT * FROM clinical_trials ORDER BY start_date DESC",
+        None,
+        True,
+        True,
+    ),
+    Query(
+        "api/institutions",
+        "institutions by name",
+        "SELECT * FROM institutions ORDER BY name",
+        None,
+        True,
+        True,
+    ),
+    Query(
+        "api/funders",
+        "funders by name",
+        "SELECT * FROM funding_sources ORDER BY name",
+        None,
+        True,
+        True,
+    ),
+    Query(
+        "api/network",
+        "funding links",
+        """SELECT fr.*, fs.name as funder_name
+           FROM funding_relationships fr
+           JOIN funding_sources fs ON fr.funder_id = fs.funding_id""",
+        None,
+        True,
+        True,
+    ),
+    Query(
+        "api/network",
+        "non-funding links",
+        "SELECT * FROM relationships WHERE relationship_type != 'funding'",
+        None,
+        True,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "trial count",
+        "SELECT COUNT(*) as count FROM clinical_trials",
+        None,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "relationship count",
+        "SELECT COUNT(*) as count FROM relationships",
+        None,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "connection types",
+        """SELECT relationship_type as type, COUNT(*) as count
+           FROM relationships
+           GROUP BY relationship_type
+           ORDER BY count DESC""",
+        None,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "most connected trial",
+        """SELECT t.trial_id, t.title, COUNT(r.relationship_id) as connection_count
+           FROM clinical_trials t
+           LEFT JOIN relationships r ON (r.entity1_id = t.trial_id OR r.entity2_id = t.trial_id)
+           GROUP BY t.trial_id, t.title
+           ORDER BY connection_count DESC
+           LIMIT 1""",
+        None,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "trial countries",
+        """SELECT DISTINCT country FROM clinical_trials
+           WHERE country IS NOT NULL AND country != ''""",
+        None,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "institution countries",
+        """SELECT DISTINCT country FROM institutions
+           WHERE country IS NOT NULL AND country != ''""",
+        None,
+        True,
+    ),
+    Query(
+        "api/stats",
+        "status counts",
+        """SELECT
+             SUM(CASE WHEN status IN ('Recruiting', 'Active', 'Ongoing') THEN 1 ELSE 0 END) as active,
+             SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) as completed
+           FROM clinical_trials""",
+        None,
+        True,
+    ),
+    # query_service.py: filtered routes and the stats join
+    Query(
+        "query_service.py",
+        "trials by country",
+        "SELECT * FROM clinical_trials WHERE country = ? ORDER BY start_date DESC",
+        "country",
+        True,
+    ),
+    Query(
+        "query_service.py",
+        "trials by status",
+        "SELECT * FROM clinical_trials WHERE status = ? ORDER BY start_date DESC",
+        "status",
+        True,
+    ),
+    Query(
+        "query_service.py",
+        "trials by country and status",
+        """SELECT * FROM clinical_trials WHERE country = ? AND status = ?
+           ORDER BY start_date DESC""",
+        "country_status",
+        True,
+    ),
+    Query(
+        "query_service.py",
+        "institutions by country",
+        "SELECT * FROM institutions WHERE country = ? ORDER BY name",
+        "country",
+        True,
+    ),
+    Query(
+        "query_service.py",
+        "institutions by sector",
+        "SELECT * FROM institutions WHERE sector = ? ORDER BY name",
+        "sector",
+        True,
+    ),
+    Query(
+        "query_service.py",
+        "most connected trial",
+        """SELECT t.title, COUNT(*) AS connections
+           FROM (SELECT entity1_id AS id FROM relationships
+                 UNION ALL
+                 SELECT entity2_id FROM relationships) r
+           JOIN clinical_trials t ON t.trial_id = r.id
+           GROUP BY t.trial_id
+           ORDER BY connections DESC
+           LIMIT 1""",
+        None,
+        True,
+    ),
+]
+
+COUNTRIES = [
+    "South Africa",
+    "Kenya",
+    "Nigeria",
+    "Uganda",
+    "Tanzania",
+    "Ghana",
+    "Ethiopia",
+    "Malawi",
+    "Zambia",
+    "Zimbabwe",
+    "Rwanda",
+    "Mozambique",
+    "Botswana",
+    "Lesotho",
+    "Cameroon",
+    "Senegal",
+    "Mali",
+    "Burkina Faso",
+    "USA",
+    "UK",
+    "Germany",
+    "Switzerland",
+    "Netherlands",
+    "Belgium",
+    "India",
+]
+STATUSES = [
+    "Completed",
+    "Recruiting",
+    "Active",
+    "Ongoing",
+    "Not yet recruiting",
+    "Terminated",
+]
+PHASES = ["Phase 1", "Phase 2", "Phase 3", "Phase 4", "Not Applicable"]
+SECTORS = ["Academia", "Healthcare", "Government", "Industry", "Funder", "NGO"]
+RELATIONSHIP_TYPES = [
+    "collaboration",
+    "funding",
+    "government_partner",
+    "industry_partner",
+]
+TECHNOLOGIES = [
+    "CAD4TB",
+    "qXR",
+    "Deep learning retinal screening",
+    "Smartphone microscopy",
+    "Ultrasound AI",
+    "ECG AI",
+]
+CONDITIONS = [
+    "Tuberculosis",
+    "Diabetic retinopathy",
+    "Malaria",
+    "Cervical cancer",
+    "HIV",
+    "Pneumonia",
+]
+
+# Plan score weights: a table scan outweighs any number of sorts, and a full
+# walk of an index (e.g. one chosen only for its ORDER BY) costs more than
+# the index search it displaces
+SCAN_COST = 100
+SORT_COST = 10
+INDEX_SCAN_COST = 1
+
+
+def load_create_database():
+    """create-database-n11.py as a module (its file name is not importable)"""
+    spec = importlib.util.spec_from_file_location(
+        "create_database_n11", SCRIPT_DIR / "create-database-n11.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _date(rng):
+    return (
+        f"{rng.randint(2010, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    )
+
+
+def build_synthetic_database(path, trials, seed=42):
+    """network.db with the N=11 schema and indexes, scaled to `trials` trials
+
+    Institutions, funders and links per trial follow skewed distributions
+    (a few countries and institutions take most of the trials).
+    """
+    schema = load_create_database()
+    schema.DB_PATH = Path(path)
+    conn = schema.create_database()
+    rng = random.Random(seed)
+    n_institutions = max(trials // 2, 10)
+    n_funders = max(trials // 100, 5)
+    country_weights = [1 / (i + 1) for i in range(len(COUNTRIES))]
+
+    institutions = [f"INST_{i:06d}" for i in range(n_institutions)]
+    conn.executemany(
+        "INSERT INTO institutions (institution_id, name, type, country, city, "
+        "founding_year, size_category, sector) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                inst,
+                f"Institution {i}",
+                rng.choice(SECTORS),
+                rng.choices(COUNTRIES, country_weights)[0],
+                f"City {rng.randint(1, 500)}",
+                rng.randint(1900, 2020),
+                rng.choice(["Small", "Medium", "Large"]),
+                rng.choice(SECTORS),
+            )
+            for i, inst in enumerate(institutions)
+        ),
+    )
+
+    trial_ids = [f"TRIAL_{i:07d}" for i in range(trials)]
+    starts = {}
+    for trial in trial_ids:
+        starts[trial] = _date(rng) if rng.random() > 0.05 else None
+    conn.executemany(
+        "INSERT INTO clinical_trials (trial_id, registry_source, title, status, "
+        "start_date, end_date, phase, sample_size, target_condition, "
+        "technology_type, country, ai_algorithm_type, urban_rural, "
+        "results_published) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                trial,
+                rng.choice(["ClinicalTrials.gov", "PACTR", "ISRCTN"]),
+                f"Synthetic trial {i}",
+                rng.choice(STATUSES),
+                starts[trial],
+                _date(rng) if starts[trial] else None,
+                rng.choice(PHASES),
+                rng.randint(20, 5000),
+                rng.choice(CONDITIONS),
+                rng.choice(TECHNOLOGIES),
+                rng.choices(COUNTRIES, country_weights)[0],
+                rng.choice(["CNN", "Gradient boosting", None]),
+                rng.choice(["Urban", "Rural", "Mixed"]),
+                rng.random() < 0.3,
+            )
+            for i, trial in enumerate(trial_ids)
+        ),
+    )
+
+    # Sites per trial: mostly 1-4, a long tail of large multicentre trials;
+    # partners drawn with a preference for low (popular) institution numbers
+    links = []
+    for trial in trial_ids:
+        sites = min(1 + int(rng.expovariate(1 / 2.5)), 60)
+        for _ in range(sites):
+            inst = institutions[int(n_institutions * rng.random() ** 2)]
+            links.append((trial, inst))
+    conn.executemany(
+        "INSERT INTO relationships (relationship_id, entity1_type, entity1_id, "
+        "entity2_type, entity2_id, relationship_type, start_date, strength) "
+        "VALUES (?, 'clinical_trial', ?, 'institution', ?, ?, ?, ?)",
+        (
+            (
+                f"REL_{i:08d}",
+                trial,
+                inst,
+                rng.choices(RELATIONSHIP_TYPES, [70, 15, 8, 7])[0],
+                starts[trial] if rng.random() < 0.5 else None,
+                rng.choice(["medium", "Strong", "weak"]),
+            )
+            for i, (trial, inst) in enumerate(links)
+        ),
+    )
+
+    funders = [f"FUND_{i:05d}" for i in range(n_funders)]
+    conn.executemany(
+        "INSERT INTO funding_sources (funding_id, name, headquarters_country, "
+        "funder_type) VALUES (?, ?, ?, ?)",
+        (
+            (
+                funder,
+                f"Funder {i}",
+                rng.choice(COUNTRIES),
+                rng.choice(["Government", "Private Foundation", "Industry"]),
+            )
+            for i, funder in enumerate(funders)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO funding_relationships (funding_relationship_id, funder_id, "
+        "recipient_type, recipient_id, funding_type) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f"FREL_{i:07d}",
+                rng.choice(funders),
+                "clinical_trial",
+                trial,
+                rng.choice(["Research Grant", "Contract", "In-kind"]),
+            )
+            for i, trial in enumerate(trial_ids)
+            if rng.random() < 0.6
+        ),
+    )
+    conn.commit()
+    schema.create_indexes(conn)
+    conn.close()
+    # No statement cache: a cached EXPLAIN QUERY PLAN keeps the plan it was
+    # prepared with after indexes change
+    return sqlite3.connect(path, cached_statements=0)
+
+
+def sample_params(conn, seed=42, count=50):
+    """Parameter lists for each parameterised query shape"""
+    rng = random.Random(seed)
+
+    def pick(sql):
+        values = [row[0] for row in conn.execute(sql)]
+        return [rng.choice(values) for _ in range(count)] if values else []
+
+    institutions = pick("SELECT institution_id FROM institutions")
+    trials = pick("SELECT trial_id FROM clinical_trials")
+    countries = pick("SELECT country FROM clinical_trials")
+    statuses = pick("SELECT status FROM clinical_trials")
+    entities = [("institution", i) for i in institutions[: count // 2]] + [
+        ("clinical_trial", t) for t in trials[: count // 2]
+    ]
+    return {
+        "entity": [(kind, key, kind, key) for kind, key in entities],
+        "trial_id": [(t,) for t in trials],
+        "country": [(c,) for c in countries],
+        "status": [(s,) for s in statuses],
+        "country_status": list(zip(countries, statuses)),
+        "sector": [(s,) for s in pick("SELECT sector FROM institutions")],
+    }
+
+
+# --- Plans ------------------------------------------------------------------
+
+TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|LEFT|INNER|ON|"
+    r"GROUP|ORDER|LIMIT|UNION)\b)(\w+))?",
+    re.IGNORECASE,
+)
+
+
+def table_aliases(sql):
+    """{name or alias: table} for the tables the statement reads"""
+    aliases = {}
+    for table, alias in TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def explain(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN rows as (id, parent, detail)"""
+    return [
+        (row[0], row[1], row[3])
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    ]
+
+
+def plan_problems(plan, sql, conn, listing=False):
+    """(tables scanned, temp b-tree sorts) in a plan
+
+    A table counts as scanned when it is read without an index, or when any
+    scan of it (even of a covering index) runs inside another loop of the
+    same statement, i.e. once per outer row. For a listing query, top-level
+    scans are expected and not counted.
+    """
+    tables = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    aliases = {k: v for k, v in table_aliases(sql).items() if v in tables}
+    scans, sorts, loops = [], 0, set()
+    for _, parent, detail in plan:
+        match = re.match(r"(SCAN|SEARCH) (\w+)", detail)
+        if match:
+            nested = parent in loops
+            if (
+                match.group(1) == "SCAN"
+                and match.group(2) in aliases
+                and (" USING " not in detail or nested)
+                and (nested or not listing)
+            ):
+                scans.append(aliases[match.group(2)])
+            loops.add(parent)
+        if detail.startswith("USE TEMP B-TREE"):
+            sorts += 1
+    return scans, sorts
+
+
+def plan_score(conn, query, params):
+    try:
+        plan = explain(conn, query.sql, params)
+    except sqlite3.Error:
+        return None
+    scans, sorts = plan_problems(plan, query.sql, conn, query.listing)
+    index_scans = sum(bool(re.match(r"SCAN \w+ USING ", row[2])) for row in plan)
+    return SCAN_COST * len(scans) + SORT_COST * sorts + INDEX_SCAN_COST * index_scans
+
+
+def time_query(conn, query, params, repeat, timeout):
+    """Latencies in ms (stops early past the time budget) or an error string"""
+    deadline = [0.0]
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline[0], 10000)
+    timings = []
+    budget = time.perf_counter() + timeout * 2
+    try:
+        for i in range(repeat):
+            args = params[i % len(params)] if params else ()
+            start = time.perf_counter()
+            deadline[0] = start + timeout
+            try:
+                conn.execute(query.sql, args).fetchall()
+            except sqlite3.OperationalError as e:
+                if "interrupted" in str(e):
+                    return timings, f"timeout (> {timeout:g}s)"
+                return timings, str(e)
+            timings.append((time.perf_counter() - start) * 1000)
+            if time.perf_counter() > budget:
+                break
+    except sqlite3.Error as e:
+        return timings, str(e)
+    finally:
+        conn.set_progress_handler(None, 0)
+    return timings, None
+
+
+def run_queries(conn, params, repeat, timeout):
+    """Plan and latency of every query"""
+    results = []
+    for query in QUERIES:
+        args = params.get(query.params, []) if query.params else []
+        row = {
+            "source": query.source,
+            "name": query.name,
+            "hot": query.hot,
+            "listing": query.listing,
+        }
+        try:
+            row["plan"] = explain(conn, query.sql, args[0] if args else ())
+        except sqlite3.Error as e:
+            row.update(plan=[], scans=[], sorts=0, error=str(e))
+            results.append(row)
+            continue
+        row["scans"], row["sorts"] = plan_problems(
+            row["plan"], query.sql, conn, query.listing
+        )
+        timings, row["error"] = time_query(conn, query, args, repeat, timeout)
+        if timings:
+            row["p50_ms"] = statistics.median(timings)
+            row["p95_ms"] = sorted(timings)[int(0.95 * (len(timings) - 1))]
+        results.append(row)
+    return results
+
+
+def failures(results):
+    return [
+        r
+        for r in results
+        if r["hot"]
+        and (r["scans"] or (r["error"] and r["error"].startswith("timeout")))
+    ]
+
+
+def print_results(results):
+    for row in results:
+        flag = "LIST" if row["listing"] else "HOT " if row["hot"] else "    "
+        if row["error"] and not row["plan"]:
+            status = f"skipped: {row['error']}"
+        else:
+            parts = [
+                (
+                    f"p50 {row['p50_ms']:8.2f} ms, p95 {row['p95_ms']:8.2f} ms"
+                    if "p50_ms" in row
+                    else "no timing"
+                )
+            ]
+            if row["scans"]:
+                parts.append("SCAN " + ", ".join(row["scans"]))
+            if row["sorts"]:
+                parts.append(f"{row['sorts']} temp b-tree")
+            if row["error"]:
+                parts.append(row["error"])
+            status = "; ".join(parts)
+        print(f"  {flag}{row['source'][:28]:28} {row['name'][:30]:30} {status}")
+
+
+# --- Advisor -----------------------------------------------------------------
+
+
+def read_columns(conn, sql):
+    """{table: columns} the statement reads, from the authorizer callback"""
+    columns = {}
+
+    def authorize(action, table, column, *_):
+        if action == sqlite3.SQLITE_READ and table and column:
+            columns.setdefault(table, []).append(column)
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorize)
+    try:
+        conn.execute(f"EXPLAIN {sql}", [None] * sql.count("?"))
+    finally:
+        conn.set_authorizer(None)
+    return {t: list(dict.fromkeys(c)) for t, c in columns.items()}
+
+
+def column_roles(sql, columns):
+    """Split columns into equality, range, grouping/ordering and partial
+    predicates by how the statement uses them"""
+    eq, rng, order, partial = [], [], [], []
+    clauses = " ".join(
+        re.findall(
+            r"(?:GROUP|ORDER)\s+BY\s+([\w\s.,]+?)(?:\)|LIMIT|ORDER|$)",
+            sql,
+            re.IGNORECASE | re.DOTALL,
+        )
+    )
+    for column in columns:
+        ref = rf"(?:\w+\.)?\b{column}\b"
+        if re.search(
+            rf"{ref}\s*(?:=(?!=)|\bIN\s*\()|(?:=|\bON\s*\(?)\s*{ref}",
+            sql,
+            re.IGNORECASE,
+        ):
+            eq.append(column)
+        if re.search(
+            rf"{ref}\s*(?:<|>|!=|<>|\bBETWEEN\b|\bLIKE\b)", sql, re.IGNORECASE
+        ):
+            rng.append(column)
+        if re.search(ref, clauses, re.IGNORECASE):
+            order.append(column)
+        for predicate in re.findall(
+            rf"{ref}\s*(?:IS NOT NULL|=\s*'[^']*')", sql, re.IGNORECASE
+        ):
+            partial.append(re.sub(r"^\w+\.", "", predicate))
+    return eq, rng, order, partial
+
+
+def candidate_indexes(conn, sql):
+    """CREATE INDEX bodies (table, columns, where) worth offering the planner"""
+    candidates = set()
+    for table, columns in read_columns(conn, sql).items():
+        eq, rng, order, partial = column_roles(sql, columns)
+        keys = set()
+        for k in range(0, 3):
+            for prefix in itertools.permutations(eq, k):
+                keys.add(prefix)
+                if order:
+                    keys.add(prefix + tuple(c for c in order if c not in prefix))
+                for column in rng:
+                    if column not in prefix:
+                        keys.add(prefix + (column,))
+        for key in filter(None, keys):
+            key = tuple(dict.fromkeys(key))[:4]
+            candidates.add((table, key, None))
+            rest = [c for c in columns if c not in key]
+            if rest and len(key) + len(rest) <= 5:
+                candidates.add((table, key + tuple(rest), None))
+            for predicate in partial:
+                candidates.add((table, key, predicate))
+    return candidates
+
+
+def index_sql(name, table, columns, where):
+    sql = f"CREATE INDEX {name} ON {table}({', '.join(columns)})"
+    return f"{sql} WHERE {where}" if where else sql
+
+
+def _definition(sql):
+    """Comparable "table(columns) where" part of a CREATE INDEX statement"""
+    return re.sub(r"\s+", "", sql.split(" ON ", 1)[1]).lower()
+
+
+def existing_indexes(conn):
+    """{name: CREATE INDEX statement} for the explicit indexes"""
+    return dict(
+        conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        )
+    )
+
+
+def _eliminate(conn, indexes, worse):
+    """Drop the indexes one at a time, widest first, putting back each one
+    whose removal makes worse() true; returns the indexes left"""
+    left = dict(indexes)
+    for name, sql in sorted(indexes.items(), key=lambda item: -len(item[1])):
+        conn.execute(f"DROP INDEX {name}")
+        if worse():
+            conn.execute(sql)
+        else:
+            del left[name]
+    return left
+
+
+def advise(conn, params):
+    """Indexes for the hot queries that scan or sort with the current set
+
+    Returns (indexes created, baseline indexes no replayed query needs); the
+    connection's database is left with the advised set.
+    """
+    first = {q: (params.get(q.params) or [()])[0] if q.params else () for q in QUERIES}
+    baseline = existing_indexes(conn)
+    for query in QUERIES:
+        score = plan_score(conn, query, first[query])
+        if not query.hot or not score:
+            continue
+        existing = {_definition(sql) for sql in existing_indexes(conn).values()}
+        created = {}
+        for table, columns, where in sorted(
+            candidate_indexes(conn, query.sql), key=str
+        ):
+            name = _index_name(table, columns, where)
+            sql = index_sql(name, table, columns, where)
+            if name in created or _definition(sql) in existing:
+                continue
+            try:
+                conn.execute(sql)
+            except sqlite3.Error:
+                continue
+            created[name] = sql
+
+        # The planner does not always pick the best subset when offered every
+        # candidate, so the score may still improve while candidates go
+        best = [plan_score(conn, query, first[query])]
+
+        def worse():
+            current = plan_score(conn, query, first[query])
+            best[0] = min(best[0], current)
+            return current > best[0]
+
+        kept = _eliminate(conn, created, worse)
+        if best[0] >= score:
+            for name in kept:
+                conn.execute(f"DROP INDEX {name}")
+
+    # Prune the whole set: no replayed query may plan worse than it does now
+    def scores():
+        return [plan_score(conn, q, first[q]) for q in QUERIES]
+
+    reference = scores()
+    final = _eliminate(
+        conn,
+        existing_indexes(conn),
+        lambda: any(
+            a is not None and r is not None and a > r
+            for a, r in zip(scores(), reference)
+        ),
+    )
+    added = {n: s for n, s in final.items() if n not in baseline}
+    unused = {n: s for n, s in baseline.items() if n not in final}
+    return added, unused
+
+
+def _index_name(table, columns, where):
+    name = f"idx_{table}_{'_'.join(columns)}"
+    if where:
+        name += "_" + re.sub(r"\W+", "_", where.lower()).strip("_")
+    return name[:60]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--trials",
+        type=int,
+        default=20000,
+        help="synthetic database size in trials (default 20000)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="executions per query (default 20)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="seconds before one execution is abandoned",
+    )
+    parser.add_argument("--report", type=Path, help="write the results as JSON")
+    parser.add_argument(
+        "--apply",
+        type=Path,
+        metavar="DB",
+        help="create the advised indexes missing from this database",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "network.db"
+        print(f"Building synthetic network.db ({args.trials} trials)...")
+        conn = build_synthetic_database(path, args.trials, args.seed)
+        for table in (
+            "clinical_trials",
+            "institutions",
+            "relationships",
+            "funding_relationships",
+        ):
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  -> {table}: {count} rows")
+        params = sample_params(conn, args.seed)
+
+        print("\n=== Baseline (create_indexes) ===")
+        before = run_queries(conn, params, args.repeat, args.timeout)
+        print_results(before)
+
+        print("\n=== Index advisor ===")
+        added, unused = advise(conn, params)
+        for sql in added.values():
+            print(f"  + {sql}")
+        for sql in unused.values():
+            print(f"  - {sql}  (no replayed query needs it)")
+        if not added and not unused:
+            print("  No changes")
+
+        print("\n=== With advised indexes ===")
+        after = run_queries(conn, params, args.repeat, args.timeout)
+        print_results(after)
+        advised = existing_indexes(conn)
+        conn.close()
+
+    if args.report:
+        args.report.write_text(
+            json.dumps(
+                {
+                    "trials": args.trials,
+                    "baseline": before,
+                    "advised": after,
+                    "create": list(added.values()),
+                    "unused": list(unused.values()),
+                },
+                indent=2,
+            )
+        )
+        print(f"\nReport written to {args.report}")
+
+    if args.apply:
+        # Everything in the advised set the target lacks, so databases built
+        # with an older create_indexes() catch up too
+        with sqlite3.connect(args.apply) as target:
+            present = existing_indexes(target)
+            definitions = {_definition(sql) for sql in present.values()}
+            missing = [
+                sql
+                for name, sql in advised.items()
+                if name not in present and _definition(sql) not in definitions
+            ]
+            for sql in missing:
+                target.execute(sql)
+        print(f"\nCreated {len(missing)} indexes in {args.apply}")
+
+    failed = failures(before)
+    if failed:
+        print("\nFAILED: hot queries scan a table with the create_indexes() set:")
+        for row in failed:
+            print(
+                f"  {row['source']}: {row['name']} "
+                f"({', '.join(row['scans']) or row['error']})"
+            )
+        still = failures(after)
+        if still:
+            print(
+                "Still scanning with the advised indexes: "
+                + ", ".join(r["name"] for r in still)
+            )
+        raise SystemExit(1)
+    print("\nPASSED: no hot query scans a table")
+
+
+if __name__ == "__main__":
+    main()
@@ -357,12 +357,24 @@ def create_indexes(conn):
     """Create indexes for better query performance"""
     cursor = conn.cursor()
 
+    # Checked against the replayed query shapes by benchmark-network-db.py
     indexes = [
         "CREATE INDEX idx_relationships_entity1 ON relationships(entity1_type, entity1_id)",
         "CREATE INDEX idx_relationships_entity2 ON relationships(entity2_type, entity2_id)",
+        # Either-end joins (ON entity1_id = ? OR entity2_id = ?) without a type
+        "CREATE INDEX idx_relationships_entity1_id ON relationships(entity1_id)",
+        "CREATE INDEX idx_relationships_entity2_id ON relationships(entity2_id)",
+        "CREATE INDEX idx_relationships_type ON relationships(relationship_type)",
         "CREATE INDEX idx_trials_dates ON clinical_trials(start_date, end_date)",
-        "CREATE INDEX idx_institutions_country ON institutions(country)",
-        "CREATE INDEX idx_trials_country ON clinical_trials(country)",
+        "CREATE INDEX idx_trials_id_title ON clinical_trials(trial_id, title)",
+        # Filtered and full lists come back in their ORDER BY without a sort
+        "CREATE INDEX idx_trials_country_start ON clinical_trials(country, start_date)",
+        "CREATE INDEX idx_trials_status_start ON clinical_trials(status, start_date)",
+        "CREATE INDEX idx_institutions_country_name ON institutions(country, name)",
+        "CREATE INDEX idx_institutions_sector_name ON institutions(sector, name)",
+        "CREATE INDEX idx_institutions_name ON institutions(name)",
+        "CREATE INDEX idx_funding_sources_name ON funding_sources(name)",
+        # Foreign key child column and recipient lookups
         "CREATE INDEX idx_funding_relationships_funder ON funding_relationships(funder_id)",
         "CREATE INDEX idx_funding_relationships_recipient ON funding_relationships(recipient_type, recipient_id)",
     ]
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Exports the network from network.db as sharded, precompressed JSON
+Streams nodes and links straight from SQLite to disk instead of building one
+network-data.json in memory
+
+Output (default public/data/network/):
+    manifest.json                  metadata and the list of shards
+    nodes.<hash>.json              every node, compact
+    country/<slug>.<hash>.json     one country's nodes and links, plus the
+                                   partner nodes those links reach
+    layer/<type>.<hash>.json       the links of one relationship type
+
+Node and link records have the same fields as process-sqlite-data-n11.js;
+nodes also carry the ForceAtlas2 "layout" position that forceatlas2.py adds
+to network-data.json (--no-layout skips it).
+Shard names carry a content hash, so they can be cached as immutable and only
+manifest.json needs revalidating. Each file gets .gz (and, with the brotli
+package installed, .br) siblings for nginx gzip_static / brotli_static;
+a variant that is not smaller than the original is dropped. The export is
+built in a temporary directory and swapped in whole.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from forceatlas2 import node_layouts  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # gzip variants only
+    brotli = None
+
+DB_PATH = Path(__file__).parent.parent / "data" / "network.db"
+OUTPUT_DIR = Path(__file__).parent.parent / "public" / "data" / "network"
+SEPARATORS = (",", ":")
+CHUNK = 1 << 16
+
+
+def slug(text):
+    """File-name-safe key for a country or relationship type"""
+    text = unicodedata.normalize("NFKD", text or "unknown")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "unknown"
+
+
+class ShardWriter:
+    """Writes one JSON object with array members record by record
+
+    The file is hashed while it is written and renamed to <name>.<hash>.json
+    on close.
+    """
+
+    def __init__(self, directory, name, header):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self.tmp = directory / f".{name}.json.tmp"
+        self.file = open(self.tmp, "wb", buffering=CHUNK)
+        self.hash = hashlib.sha256()
+        self.counts = {}
+        self._array = None
+        self._write(json.dumps(header, separators=SEPARATORS)[:-1])
+
+    def _write(self, text):
+        data = text.encode("utf-8")
+        self.hash.update(data)
+        self.file.write(data)
+
+    def array(self, name):
+        """Start the member array `name` (closing the previous one)"""
+        self._write(f'{"]" if self._array else ""},"{name}":[')
+        self._array = name
+        self.counts[name] = 0
+
+    def add(self, record):
+        self._write(
+            ("," if self.counts[self._array] else "")
+            + json.dumps(record, separators=SEPARATORS, ensure_ascii=False)
+        )
+        self.counts[self._array] += 1
+
+    def close(self):
+        """Finish and publish the file; returns its manifest entry"""
+        self._write("]}" if self._array else "}")
+        self.file.close()
+        digest = self.hash.hexdigest()
+        path = self.directory / f"{self.name}.{digest[:10]}.json"
+        os.replace(self.tmp, path)
+        return {
+            "path": path,
+            "bytes": path.stat().st_size,
+            "sha256": digest,
+            **self.counts,
+        }
+
+
+def participation_years(conn):
+    """(entity_type, entity_id) -> year of the earliest dated relationship"""
+    rows = conn.execute("""
+        SELECT entity_type, entity_id, MIN(start_date)
+        FROM (SELECT entity1_type AS entity_type, entity1_id AS entity_id,
+                     start_date FROM relationships
+              UNION ALL
+              SELECT entity2_type, entity2_id, start_date FROM relationships)
+        WHERE start_date IS NOT NULL
+        GROUP BY entity_type, entity_id
+    """)
+    return {
+        (kind, key): int(date[:4]) for kind, key, date in rows if date[:4].isdigit()
+    }
+
+
+def _year(date, default=2020):
+    return int(date[:4]) if date and date[:4].isdigit() else default
+
+
+def iter_nodes(conn, years):
+    """Node records in the id order of process-sqlite-data-n11.js"""
+    number = 0
+    for row in conn.execute("SELECT * FROM institutions"):
+        number += 1
+        yield ("institution", row["institution_id"]), {
+            "id": f"N{number}",
+            "originalId": row["institution_id"],
+            "title": row["name"],
+            "type": "institution",
+            "country": row["country"] or "",
+            "city": row["city"] or "",
+            "year": years.get(("institution", row["institution_id"]), 2020),
+            "foundingYear": row["founding_year"],
+            "category": row["type"] or row["sector"] or "Institution",
+            "specialization": row["specialization"] or "",
+            "size": row["size_category"] or "Medium",
+            "sector": row["sector"] or "",
+        }
+    for row in conn.execute("SELECT * FROM clinical_trials"):
+        number += 1
+        yield ("clinical_trial", row["trial_id"]), {
+            "id": f"N{number}",
+            "originalId": row["trial_id"],
+            "title": row["title"],
+            "type": "clinical_trial",
+            "country": row["country"] or "",
+            "year": _year(row["start_date"]),
+            "category": row["phase"] or "Not Specified",
+            "status": row["status"] or "Unknown",
+            "condition": row["target_condition"] or "",
+            "technology": row["technology_type"] or "",
+            "sampleSize": row["sample_size"] or 0,
+            "startDate": row["start_date"],
+            "endDate": row["end_date"],
+            "registrySource": row["registry_source"] or "",
+            "studyDesign": row["study_design"] or "",
+            "trialUrl": row["trial_url"] or "",
+            "resultsPublished": row["results_published"] == 1,
+            "publicationUrl": row["publication_url"] or "",
+        }
+
+
+def iter_links(conn, ids):
+    """Link records for relationships whose two endpoints are nodes"""
+    for row in conn.execute("SELECT * FROM relationships"):
+        source = ids.get((row["entity1_type"], row["entity1_id"]))
+        target = ids.get((row["entity2_type"], row["entity2_id"]))
+        if source is None or target is None:
+            continue
+        yield {
+            "source": source,
+            "target": target,
+            "type": row["relationship_type"] or "collaboration",
+            "strength": row["strength"] or "medium",
+            "fundingAmount": row["funding_amount_usd"] or 0,
+            "fundingType": row["funding_type"] or "",
+            "hasPersonnelExchange": row["has_personnel_exchange"] == 1,
+            "hasTechTransfer": row["technology_transfer"] == 1,
+            "startDate": row["start_date"],
+            "endDate": row["end_date"],
+        }
+
+
+def export_shards(conn, out, layout=True):
+    """Write all shards into out; returns the manifest"""
+    conn.row_factory = sqlite3.Row
+    years = participation_years(conn)
+
+    # Layout pass: node ids and link endpoints only, so every shard a node
+    # appears in carries the same position
+    ids = {key: node["id"] for key, node in iter_nodes(conn, years)}
+    layouts = {}
+    if layout:
+        index = {node_id: i for i, node_id in enumerate(ids.values())}
+        pairs = [
+            (index[link["source"]], index[link["target"]])
+            for link in iter_links(conn, ids)
+        ]
+        layouts = dict(zip(index, node_layouts(len(index), pairs)))
+
+    # Pass 1: all nodes; keep only id and country per node
+    country_of, types, node_years = {}, Counter(), []
+    nodes = ShardWriter(out, "nodes", {"shard": "nodes"})
+    nodes.array("nodes")
+    for key, node in iter_nodes(conn, years):
+        if layouts:
+            node["layout"] = layouts[node["id"]]
+        country_of[node["id"]] = node["country"]
+        types[node["type"]] += 1
+        if 1900 < node["year"] < 2030:
+            node_years.append(node["year"])
+        nodes.add(node)
+    nodes = nodes.close()
+
+    # Pass 2: links into their layer and into the countries of both ends;
+    # remember which partner nodes each country shard has to include
+    countries = {}
+    layers = {}
+    partners = defaultdict(set)
+    for link in iter_links(conn, ids):
+        kind = link["type"]
+        if kind not in layers:
+            layers[kind] = ShardWriter(out / "layer", slug(kind), {"layer": kind})
+            layers[kind].array("links")
+        layers[kind].add(link)
+        ends = {country_of[link["source"]], country_of[link["target"]]}
+        for country in ends:
+            if country not in countries:
+                countries[country] = ShardWriter(
+                    out / "country", slug(country), {"country": country}
+                )
+                countries[country].array("links")
+            countries[country].add(link)
+            partners[link["source"]].add(country)
+            partners[link["target"]].add(country)
+
+    # Pass 3: nodes again, into their own country and wherever they are a
+    # partner
+    for country in set(country_of.values()) - set(countries):
+        countries[country] = ShardWriter(
+            out / "country", slug(country), {"country": country}
+        )
+        countries[country].array("links")
+    for writer in countries.values():
+        writer.array("nodes")
+    for _, node in iter_nodes(conn, years):
+        if layouts:
+            node["layout"] = layouts[node["id"]]
+        for country in partners.get(node["id"], set()) | {node["country"]}:
+            countries[country].add(node)
+
+    shards = {
+        "nodes": nodes,
+        "countries": {c: w.close() for c, w in sorted(countries.items())},
+        "layers": {k: w.close() for k, w in sorted(layers.items())},
+    }
+    return {
+        "metadata": {
+            "totalNodes": nodes["nodes"],
+            "totalLinks": sum(s["links"] for s in shards["layers"].values()),
+            "nodeTypes": {
+                "institutions": types["institution"],
+                "companies": types["company"],
+                "trials": types["clinical_trial"],
+                "funders": types["funder"],
+            },
+            "yearRange": {
+                "min": min(node_years, default=None),
+                "max": max(node_years, default=None),
+            },
+            "countries": sorted(c for c in countries if c),
+            "layout": "forceatlas2" if layouts else None,
+            "dataSource": "N=11 AI Diagnostic Trials Dataset",
+            "datasetVersion": "N11",
+            "generatedAt": datetime.now(timezone.utc).isoformat(),
+        },
+        "shards": shards,
+    }
+
+
+def precompress(path, encodings):
+    """Write compressed siblings of path; returns the encodings kept"""
+    kept = []
+    size = path.stat().st_size
+    for encoding in encodings:
+        target = path.with_name(path.name + (".gz" if encoding == "gzip" else ".br"))
+        with open(path, "rb") as src, open(target, "wb") as dst:
+            if encoding == "gzip":
+                with gzip.GzipFile(
+                    fileobj=dst, mode="wb", compresslevel=9, mtime=0
+                ) as gz:
+                    shutil.copyfileobj(src, gz, CHUNK)
+            else:
+                compressor = brotli.Compressor(quality=11, mode=brotli.MODE_TEXT)
+                for block in iter(lambda: src.read(CHUNK), b""):
+                    dst.write(compressor.process(block))
+                dst.write(compressor.finish())
+        if target.stat().st_size < size:
+            kept.append(encoding)
+        else:
+            target.unlink()
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database")
+    parser.add_argument(
+        "--out", type=Path, default=OUTPUT_DIR, help="export directory (replaced)"
+    )
+    parser.add_argument(
+        "--no-compress", action="store_true", help="skip the .gz/.br variants"
+    )
+    parser.add_argument(
+        "--no-layout", action="store_true", help="skip the ForceAtlas2 positions"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        parser.error(f"{args.db} not found (run scripts/create-database-n11.py)")
+    encodings = [] if args.no_compress else ["gzip"] + (["br"] if brotli else [])
+    if not args.no_compress and brotli is None:
+        print("Warning: brotli package not installed, writing gzip variants only")
+
+    out = args.out
+    build = out.with_name(out.name + ".tmp")
+    shutil.rmtree(build, ignore_errors=True)
+    build.mkdir(parents=True)
+
+    print(f"Exporting {args.db} to {out}")
+    uri = f"{args.db.resolve().as_uri()}?mode=ro"
+    with sqlite3.connect(uri, uri=True) as conn:
+        manifest = export_shards(conn, build, layout=not args.no_layout)
+
+    shards = manifest["shards"]
+    entries = [
+        shards["nodes"],
+        *shards["countries"].values(),
+        *shards["layers"].values(),
+    ]
+    raw = compressed = 0
+    for entry in entries:
+        entry["encodings"] = precompress(entry["path"], encodings)
+        raw += entry["bytes"]
+        compressed += min(
+            [entry["bytes"]]
+            + [
+                entry["path"].with_name(entry["path"].name + suffix).stat().st_size
+                for suffix, enc in ((".br", "br"), (".gz", "gzip"))
+                if enc in entry["encodings"]
+            ]
+        )
+        entry["path"] = entry["path"].relative_to(build).as_posix()
+
+    manifest_path = build / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    precompress(manifest_path, encodings)
+
+    # Swap the finished export in
+    old = out.with_name(out.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if out.exists():
+        os.replace(out, old)
+    os.replace(build, out)
+    shutil.rmtree(old, ignore_errors=True)
+
+    meta = manifest["metadata"]
+    print(f"  -> {meta['totalNodes']} nodes, {meta['totalLinks']} links")
+    print(
+        f"  -> {len(shards['countries'])} country shards, "
+        f"{len(shards['layers'])} layer shards"
+    )
+    print(
+        f"  -> {raw / 1024:.1f} KiB raw, {compressed / 1024:.1f} KiB "
+        f"smallest encodings ({', '.join(encodings) or 'none'})"
+    )
+
+
+if __name__ == "__main__":
+    main()
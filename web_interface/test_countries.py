@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for country name normalization (run with pytest)"""
+
+import pytest
+
+from countries import SUB_SAHARAN_AFRICA, normalize_country, split_countries
+from graph_metrics import MetricGraph
+
+
+@pytest.mark.parametrize('value, key', [
+    ('Sao Tome and Principe', 'sao tome and principe'),
+    ('São Tomé and Príncipe', 'sao tome and principe'),
+    ('Trinidad and Tobago', 'trinidad and tobago'),
+    ('Bosnia and Herzegovina', 'bosnia and herzegovina'),
+    ('Saint Vincent and the Grenadines', 'saint vincent and the grenadines'),
+])
+def test_names_containing_and_stay_whole(value, key):
+    assert split_countries(value) == [key]
+    assert normalize_country(value) == key
+
+
+@pytest.mark.parametrize('value, key', [
+    ('Korea, Republic of', 'south korea'),
+    ('Gambia, The', 'gambia'),
+    ('Iran, Islamic Republic of', 'iran'),
+    ('Tanzania, United Republic of', 'tanzania'),
+    ('Congo, Democratic Republic of the', 'democratic republic of the congo'),
+])
+def test_comma_inverted_names(value, key):
+    assert split_countries(value) == [key]
+    assert normalize_country(value) == key
+
+
+@pytest.mark.parametrize('value, keys', [
+    ('Kenya; Uganda', ['kenya', 'uganda']),
+    ('Kenya, Uganda', ['kenya', 'uganda']),
+    ('Lesotho and South Africa', ['lesotho', 'south africa']),
+    ('Kenya, Uganda and Tanzania', ['kenya', 'uganda', 'tanzania']),
+    ('Sao Tome and Principe / Gabon', ['sao tome and principe', 'gabon']),
+    ('Kenya; kenya ', ['kenya']),
+])
+def test_multi_country_fields(value, keys):
+    assert split_countries(value) == keys
+
+
+def test_unknown_names_are_not_split():
+    assert split_countries('Atlantis, Lemuria') == ['atlantis, lemuria']
+    assert split_countries('Kenya and Atlantis') == ['kenya and atlantis']
+
+
+def test_missing_values():
+    assert split_countries(None) == []
+    assert split_countries(float('nan')) == []
+    assert normalize_country(None) == ''
+
+
+def test_niger_is_not_nigeria():
+    assert split_countries('Nigeria') == ['nigeria']
+    assert 'niger' in SUB_SAHARAN_AFRICA and 'nigeria' in SUB_SAHARAN_AFRICA
+
+
+def test_country_nodes_match_whole_names():
+    G = MetricGraph()
+    G.add_node('A', country='Sao Tome and Principe')
+    G.add_node('B', country='Korea, Republic of')
+    G.add_node('C', country='Kenya; Uganda')
+    assert G.country_nodes('Sao Tome and Principe') == ['A']
+    assert G.country_nodes('São Tomé and Príncipe') == ['A']
+    assert G.country_nodes('South Korea') == ['B']
+    assert G.country_nodes('Uganda') == ['C']
+    assert G.country_nodes('Principe') == []
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for the memoized metric graph (run with pytest)"""
+
+import copy
+import pickle
+
+import networkx as nx
+
+from graph_metrics import MetricGraph
+
+
+def _graph():
+    G = MetricGraph()
+    G.add_node('A', country='Kenya')
+    G.add_node('B', country='Uganda')
+    G.add_edge('A', 'B')
+    return G
+
+
+def test_metrics_are_memoized_per_version():
+    G = _graph()
+    first = G.metric('degree_centrality')
+    assert G.metric('degree_centrality') is first
+    G.add_edge('B', 'C')
+    assert G.metric('degree_centrality') is not first
+
+
+def test_node_attribute_edits_invalidate_country_index():
+    G = _graph()
+    assert G.country_nodes('Kenya') == ['A']
+    G.nodes['A']['country'] = 'Sao Tome and Principe'
+    assert G.country_nodes('Kenya') == []
+    assert G.country_nodes('Sao Tome and Principe') == ['A']
+    nx.set_node_attributes(G, {'B': 'Kenya'}, 'country')
+    assert G.country_nodes('Kenya') == ['B']
+
+
+def test_subgraph_views_follow_attribute_edits():
+    G = _graph()
+    sub = G.subgraph(['A'])
+    assert sub.country_nodes('Kenya') == ['A']
+    G.nodes['A']['country'] = 'Rwanda'
+    assert sub.country_nodes('Kenya') == []
+
+
+def test_edge_attribute_edits_bump_version():
+    G = _graph()
+    version = G.version
+    G.edges['A', 'B']['weight'] = 2
+    assert G.version > version
+
+
+def test_copies_track_their_own_attributes():
+    G = _graph()
+    for H in (G.copy(), copy.deepcopy(G), pickle.loads(pickle.dumps(G))):
+        assert H.country_nodes('Kenya') == ['A']
+        H.nodes['A']['country'] = 'Rwanda'
+        assert H.country_nodes('Rwanda') == ['A']
+    assert G.country_nodes('Kenya') == ['A']
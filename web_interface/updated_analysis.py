@@ -9,6 +9,9 @@ This script creates professional visualizations suitable for academic publicatio
 with proper color schemes, typography, and formatting standards.
 """
 
+import argparse
+import re
+import sys
 from pathlib import Path
 
 import matplotlib.patches as mpatches
@@ -18,6 +21,15 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 
+from countries import normalize_country
+from graph_metrics import MetricGraph
+from network_layout import cached_layout
+from network_render import draw_network
+
+# Process-pool helper shared with the analysis pipeline
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'analysis'))
+from parallel import parallel_map  # noqa: E402
+
 # Set publication-ready style
 plt.rcParams.update({
     'font.size': 10,
@@ -69,7 +81,7 @@ def load_data():
 
 def build_network(data):
     """Construct a NetworkX graph from the relationship data"""
-    G = nx.Graph()
+    G = MetricGraph()
     
     # Add trial nodes
     for _, trial in data['trials'].iterrows():
@@ -133,7 +145,8 @@ def visualize_main_network(G, filename='figure1_main_network.png'):
     
     # Node colors and sizes
     node_colors = [COLORS[G.nodes[node]['type']] for node in G.nodes()]
-    node_sizes = [400 * nx.degree_centrality(G)[node] + 80 for node in G.nodes()]
+    degree_cent = G.metric('degree_centrality')
+    node_sizes = [400 * degree_cent[node] + 80 for node in G.nodes()]
     
     # Edge colors
     edge_colors = []
@@ -147,18 +160,15 @@ def visualize_main_network(G, filename='figure1_main_network.png'):
         else:
             edge_colors.append(COLORS['edge_default'])
     
-    # Layout with improved positioning
-    pos = nx.spring_layout(G, k=0.8, iterations=100, seed=42)
+    # Layout with improved positioning (cached; new nodes placed incrementally)
+    pos = cached_layout(G, 'main', k=0.8, iterations=100, seed=42)
     
-    # Draw network
-    nx.draw_networkx_nodes(G, pos, node_color=node_colors, 
-                          node_size=node_sizes, alpha=0.8, ax=ax)
-    nx.draw_networkx_edges(G, pos, edge_color=edge_colors, 
-                          width=0.8, alpha=0.6, ax=ax)
+    # Draw network (batched layers; dense layers rasterized)
+    draw_network(ax, G, pos, node_colors, node_sizes, edge_colors=edge_colors,
+                 edge_width=0.8, edge_alpha=0.6)
     
     # Add labels for top nodes only
-    top_nodes = sorted(nx.degree_centrality(G).items(), 
-                      key=lambda x: x[1], reverse=True)[:8]
+    top_nodes = G.top_nodes('degree_centrality', 8)
     labels = {node[0]: node[0] for node in top_nodes}
     nx.draw_networkx_labels(G, pos, labels=labels, font_size=8, 
                            font_weight='bold', ax=ax)
@@ -183,9 +193,8 @@ def visualize_main_network(G, filename='figure1_main_network.png'):
 
 def visualize_country_network(G, data, country, filename):
     """Create country-specific network visualization"""
-    # Filter nodes for the country
-    country_nodes = [node for node in G.nodes() 
-                    if country.lower() in str(G.nodes[node].get('country', '')).lower()]
+    # Nodes for the country, from the index built once per graph version
+    country_nodes = G.country_nodes(country)
     
     if not country_nodes:
         print(f"No nodes found for {country}")
@@ -200,17 +209,16 @@ def visualize_country_network(G, data, country, filename):
                    for node in country_graph.nodes()]
     
     # Adjust node sizes for smaller network
-    centrality = nx.degree_centrality(country_graph)
+    centrality = country_graph.metric('degree_centrality')
     node_sizes = [500 * centrality[node] + 150 for node in country_graph.nodes()]
     
-    # Layout
-    pos = nx.spring_layout(country_graph, k=1.5, iterations=100, seed=42)
+    # Layout (cached; new nodes placed incrementally)
+    pos = cached_layout(country_graph, f'country_{country}', k=1.5,
+                        iterations=100, seed=42)
     
-    # Draw network
-    nx.draw_networkx_nodes(country_graph, pos, node_color=node_colors, 
-                          node_size=node_sizes, alpha=0.8, ax=ax)
-    nx.draw_networkx_edges(country_graph, pos, width=1.2, alpha=0.6, 
-                          edge_color='#666666', ax=ax)
+    # Draw network (batched layers; dense layers rasterized)
+    draw_network(ax, country_graph, pos, node_colors, node_sizes,
+                 edge_colors='#666666', edge_width=1.2, edge_alpha=0.6)
     
     # Add all labels for country network
     labels = {}
@@ -232,6 +240,44 @@ def visualize_country_network(G, data, country, filename):
     plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
     plt.close()
 
+# Graph shared with forked render workers (copy-on-write, never pickled)
+_BATCH_GRAPH = None
+
+def _render_country(job):
+    country, filename = job
+    visualize_country_network(_BATCH_GRAPH, None, country, filename)
+    return filename
+
+def render_country_networks(G, countries=None, output_dir='country_networks',
+                            workers=None):
+    """Render one subnetwork figure per country across a process pool
+
+    countries defaults to every country in the graph's country index. Each
+    country costs only its own rendering; node lookup uses the shared index.
+    Returns the written filenames.
+    """
+    global _BATCH_GRAPH
+    index = G.metric('country_index')
+    if countries is None:
+        countries = sorted(index, key=lambda c: (-len(index[c]), c))
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for country in countries:
+        if not G.country_nodes(country):
+            print(f"No nodes found for {country}")
+            continue
+        slug = re.sub(r'[^a-z0-9]+', '_', normalize_country(country)).strip('_')
+        jobs.append((country.title() if country.islower() else country,
+                     str(output_dir / f'{slug}_network.png')))
+
+    _BATCH_GRAPH = G
+    try:
+        return parallel_map(_render_country, jobs, workers)
+    finally:
+        _BATCH_GRAPH = None
+
 def create_temporal_evolution_plot(data, filename='figure4_temporal_evolution.png'):
     """Create temporal evolution visualization - Figure 4"""
     trials = data['trials'].copy()
@@ -405,7 +451,7 @@ def analyze_network_metrics(G):
     print(f"Network Composition:")
     print(f"  Total nodes: {G.number_of_nodes()}")
     print(f"  Total edges: {G.number_of_edges()}")
-    print(f"  Network density: {nx.density(G):.3f}")
+    print(f"  Network density: {G.metric('density'):.3f}")
     
     # Node type breakdown
     node_types = {}
@@ -418,8 +464,7 @@ def analyze_network_metrics(G):
         print(f"  {node_type.title()}: {count}")
     
     # Top central nodes
-    degree_cent = nx.degree_centrality(G)
-    top_nodes = sorted(degree_cent.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_nodes = G.top_nodes('degree_centrality', 10)
     
     print(f"\nMost Central Institutions (Degree Centrality):")
     for i, (node, centrality) in enumerate(top_nodes, 1):
@@ -429,6 +474,13 @@ def analyze_network_metrics(G):
 
 def main():
     """Main analysis pipeline"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--all-countries', action='store_true',
+                        help='also render a subnetwork figure for every country')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes for --all-countries (default: CPU count)')
+    args = parser.parse_args()
+
     print("AI Diagnostic Innovation Network Analysis")
     print("Loading data...")
     data = load_data()
@@ -448,6 +500,11 @@ def main():
     print("  - Kenya network (Figure 2)...")
     visualize_country_network(G, data, 'Kenya', 'figure2_kenya_network.png')
     
+    if args.all_countries:
+        print("  - Per-country networks...")
+        rendered = render_country_networks(G, workers=args.workers)
+        print(f"    {len(rendered)} figures in country_networks/")
+    
     print("  - Technology specialization heatmap (Figure 3)...")
     create_technology_specialization_heatmap(data, 'figure3_tech_specialization.png')
     
@@ -468,4 +525,4 @@ def main():
     print("  - disease_focus_areas.png")
 
 if __name__ == "__main__":
-    main()    main()    main()
\ No newline at end of file
+    main()